@@ -0,0 +1,261 @@
+import os
+import random
+import threading
+import numpy as np
+from ga.individual import Individual
+from ga.population import Population
+
+
+class SearchState(object):
+
+    def __init__(self, generation, population, best_individual, best_individuals, gens_to_sol,
+                 total_local_evaluations, real_evaluations, evaluations, solved, rng_state=None):
+        """
+        Estado de la búsqueda al terminar una generación.
+
+        Contiene todo lo necesario para continuar la búsqueda desde la generación indicada y obtener exactamente el mismo
+        resultado que si no se hubiera interrumpido.
+
+        :param generation: siguiente generación que se ejecuta
+        :param population: población actual
+        :param best_individual: mejor individuo de la última generación
+        :param best_individuals: lista con los fitness de los mejores individuos de cada generación
+        :param gens_to_sol: número de generaciones necesarias hasta encontrar una solución
+        :param total_local_evaluations: evaluaciones realizadas durante la búsqueda local hasta encontrar una solución
+        :param real_evaluations: número de evaluaciones reales hasta encontrar una solución
+        :param evaluations: número de evaluaciones reales realizadas hasta el momento
+        :param solved: si ya se ha encontrado una solución
+        :param rng_state: estado de los generadores aleatorios de random y NumPy (por defecto, el estado actual)
+        """
+        self.generation = generation
+        self.population = population
+        self.best_individual = best_individual
+        self.best_individuals = best_individuals
+        self.gens_to_sol = gens_to_sol
+        self.total_local_evaluations = total_local_evaluations
+        self.real_evaluations = real_evaluations
+        self.evaluations = evaluations
+        self.solved = solved
+        self.rng_state = rng_state or (random.getstate(), np.random.get_state())
+
+    def restore_rng(self):
+        """
+        Restauración del estado de los generadores aleatorios de random y NumPy.
+
+        """
+        random.setstate(self.rng_state[0])
+        np.random.set_state(self.rng_state[1])
+
+
+class CheckpointWriter(object):
+
+    def __init__(self, path):
+        """
+        Escritura de checkpoints en segundo plano.
+
+        Los arrays del checkpoint se copian en el hilo principal y el fichero se escribe en un hilo aparte, de forma que
+        la búsqueda continúa mientras se comprime y se escribe. Solo hay una escritura pendiente a la vez: antes de
+        comenzar una nueva se espera a que termine la anterior.
+
+        :param path: nombre del fichero del checkpoint
+        """
+        self.path = path
+        self.thread = None
+        self.error = None
+
+    def write(self, state, config):
+        """
+        Escritura de un checkpoint sin bloquear la búsqueda.
+
+        :param state: estado de la búsqueda
+        :param config: configuración de la ejecución
+        """
+        self.wait()
+        arrays = pack_state(state, config)
+        self.thread = threading.Thread(target=self._save, args=(arrays,))
+        self.thread.start()
+
+    def _save(self, arrays):
+        try:
+            save_arrays(self.path, arrays)
+        except Exception as error:
+            self.error = error
+
+    def wait(self):
+        """
+        Espera a que termine la escritura pendiente.
+
+        Si la escritura ha fallado, se lanza la excepción que la ha interrumpido.
+
+        """
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+
+    def discard(self):
+        """
+        Eliminación del checkpoint al terminar la búsqueda, para que no se reanude una búsqueda ya completada.
+
+        """
+        self.wait()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def pack_state(state, config):
+    """
+    Conversión del estado de la búsqueda a un diccionario de arrays.
+
+    Los arrays son copias independientes de la población, por lo que la búsqueda puede seguir modificándola mientras
+    se escribe el checkpoint.
+
+    Una lista de individuos puede contener el mismo objeto Individual varias veces (por ejemplo, el elitismo de
+    age_based_replacement coloca al mejor descendiente en la posición del peor) y el mejor individuo es normalmente uno
+    de los de la población. Para cada posición se guarda la primera posición en la que aparece el mismo objeto, y para
+    el mejor individuo su posición en la población (-1 si no pertenece a ella), de forma que al recuperar el checkpoint
+    se comparten los mismos objetos.
+
+    :param state: estado de la búsqueda
+    :param config: configuración de la ejecución
+    :return: diccionario de arrays
+    """
+    arrays = {}
+    population = state.population
+    array_population = isinstance(population, Population)
+    first_positions = {}
+    if array_population:
+        arrays["population_aliases"] = np.arange(len(population), dtype=np.int64)
+    else:
+        arrays["population_aliases"] = np.array([first_positions.setdefault(id(individual), index)
+                                                 for index, individual in enumerate(population)], dtype=np.int64)
+        population = Population.from_individuals(population, config)
+    arrays["best_alias"] = np.array(first_positions.get(id(state.best_individual), -1), dtype=np.int64)
+    best_individual = Population.from_individuals([state.best_individual], config)
+    for prefix, individuals in (("population_", population), ("best_", best_individual)):
+        arrays[prefix + "genomes"] = individuals.genomes.copy()
+        arrays[prefix + "lengths"] = individuals.lengths.copy()
+        arrays[prefix + "fitness"] = np.array(individuals.fitness, dtype=np.float64)
+        arrays[prefix + "hits"] = np.array(individuals.hits, dtype=np.int64)
+        arrays[prefix + "mutation_rate"] = np.array(individuals.mutation_rate, dtype=np.float64)
+        arrays[prefix + "lifetime"] = np.array(individuals.lifetime, dtype=np.float64)
+        # Los individuos inválidos no tienen fenotipo: se guardan como cadena vacía junto a una máscara
+        arrays[prefix + "valid"] = np.array([phenotype is not None for phenotype in individuals.phenotypes])
+        arrays[prefix + "phenotypes"] = np.array([phenotype or "" for phenotype in individuals.phenotypes], dtype=str)
+
+    python_state, numpy_state = state.rng_state
+    arrays["python_rng"] = np.array(python_state[1], dtype=np.uint64)
+    arrays["python_gauss"] = np.array([python_state[2] is not None,
+                                       python_state[2] if python_state[2] is not None else 0.])
+    arrays["numpy_rng"] = np.array(numpy_state[1], dtype=np.uint32)
+    arrays["numpy_gauss"] = np.array([numpy_state[2], numpy_state[3], numpy_state[4]], dtype=np.float64)
+
+    arrays["best_individuals"] = np.array(state.best_individuals, dtype=np.float64)
+    arrays["counters"] = np.array([state.generation, state.gens_to_sol, state.total_local_evaluations,
+                                   state.real_evaluations, state.evaluations, state.solved, array_population],
+                                  dtype=np.int64)
+
+    return arrays
+
+
+def save_arrays(path, arrays):
+    """
+    Escritura atómica de un checkpoint en formato npz comprimido.
+
+    El fichero se escribe con otro nombre en el mismo directorio y se renombra al terminar, de forma que una
+    interrupción durante la escritura nunca deja un checkpoint incompleto.
+
+    :param path: nombre del fichero del checkpoint
+    :param arrays: diccionario de arrays
+    """
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as file:
+        np.savez_compressed(file, **arrays)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary, path)
+
+
+def save_checkpoint(path, state, config):
+    """
+    Escritura de un checkpoint en el hilo actual.
+
+    :param path: nombre del fichero del checkpoint
+    :param state: estado de la búsqueda
+    :param config: configuración de la ejecución
+    """
+    save_arrays(path, pack_state(state, config))
+
+
+def load_checkpoint(path):
+    """
+    Lectura de un checkpoint.
+
+    La población se recupera con la misma representación con la que se guardó (lista de individuos o población
+    basada en arrays). Los generadores aleatorios no se modifican hasta que se reanuda la búsqueda.
+
+    :param path: nombre del fichero del checkpoint
+    :return: estado de la búsqueda
+    """
+    with np.load(path) as data:
+        arrays = {name: data[name] for name in data.files}
+
+    generation, gens_to_sol, total_local_evaluations, real_evaluations, evaluations, solved, array_population = \
+        arrays["counters"].tolist()
+    population = unpack_population(arrays, "population_")
+    best_individual = individuals(unpack_population(arrays, "best_"))[0]
+    if not array_population:
+        population = individuals(population)
+        # Las posiciones que compartían objeto vuelven a compartirlo
+        population = [population[alias] for alias in arrays["population_aliases"].tolist()]
+        if arrays["best_alias"] >= 0:
+            best_individual = population[int(arrays["best_alias"])]
+
+    has_gauss, gauss = arrays["python_gauss"].tolist()
+    python_state = (3, tuple(arrays["python_rng"].tolist()), gauss if has_gauss else None)
+    has_gauss, cached_gaussian = arrays["numpy_gauss"][1:].tolist()
+    numpy_state = ("MT19937", arrays["numpy_rng"], int(arrays["numpy_gauss"][0]), int(has_gauss), cached_gaussian)
+
+    return SearchState(generation, population, best_individual, arrays["best_individuals"].tolist(), gens_to_sol,
+                       total_local_evaluations, real_evaluations, evaluations, bool(solved),
+                       (python_state, numpy_state))
+
+
+def unpack_population(arrays, prefix):
+    """
+    Reconstrucción de una población basada en arrays a partir de los arrays de un checkpoint.
+
+    :param arrays: diccionario de arrays del checkpoint
+    :param prefix: prefijo de los arrays de la población
+    :return: población basada en arrays
+    """
+    phenotypes = np.empty(len(arrays[prefix + "lengths"]), dtype=object)
+    phenotypes[:] = [str(phenotype) if valid else None
+                     for phenotype, valid in zip(arrays[prefix + "phenotypes"], arrays[prefix + "valid"])]
+
+    return Population(arrays[prefix + "genomes"], arrays[prefix + "lengths"], arrays[prefix + "fitness"],
+                      arrays[prefix + "hits"], arrays[prefix + "mutation_rate"], arrays[prefix + "lifetime"],
+                      phenotypes)
+
+
+def individuals(population):
+    """
+    Conversión de una población basada en arrays a una lista de objetos Individual con atributos nativos de Python.
+
+    :param population: población basada en arrays
+    :return: lista de individuos
+    """
+    result = []
+    for index in range(len(population)):
+        individual = Individual.__new__(Individual)
+        individual.genome = bytearray(population.genome(index))
+        individual.fitness = float(population.fitness[index])
+        individual.hits = int(population.hits[index])
+        individual.mutation_rate = float(population.mutation_rate[index])
+        individual.lifetime = float(population.lifetime[index])
+        individual.phenotype = population.phenotypes[index]
+        result.append(individual)
+
+    return result
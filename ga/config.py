@@ -0,0 +1,144 @@
+import zlib
+import itertools
+import ga.params as params
+
+
+class RunConfig(object):
+
+    def __init__(self, **overrides):
+        """
+        Configuración inmutable de una ejecución.
+
+        Contiene todos los parámetros en mayúsculas de ga.params, tomando sus valores actuales por defecto y
+        sustituyendo los indicados. La configuración se pasa explícitamente a la búsqueda, los operadores, la gramática
+        y la evaluación, de forma que en un mismo proceso pueden ejecutarse experimentos con configuraciones distintas
+        sin modificar ga.params. Las listas se convierten en tuplas para que la configuración pueda usarse como clave.
+
+        Si se modifica MIN_LIFETIME o MAX_LIFETIME sin indicar ETA, ETA se recalcula a partir de ellos.
+
+        :param overrides: parámetros cuyo valor se sustituye
+        """
+        values = default_values()
+        unknown = set(overrides) - set(values)
+        if unknown:
+            raise ValueError("Unknown parameters:", sorted(unknown))
+        values.update(overrides)
+        if "ETA" not in overrides and ("MIN_LIFETIME" in overrides or "MAX_LIFETIME" in overrides):
+            values["ETA"] = 0.5 * (values["MAX_LIFETIME"] - values["MIN_LIFETIME"])
+
+        for name, value in values.items():
+            if isinstance(value, list):
+                value = tuple(tuple(item) if isinstance(item, list) else item for item in value)
+            object.__setattr__(self, name, value)
+
+    def replace(self, **changes):
+        """
+        Copia de la configuración con algunos parámetros modificados.
+
+        :param changes: parámetros cuyo valor se sustituye
+        :return: nueva configuración
+        """
+        values = dict(self.items())
+        values.update(changes)
+        if "ETA" not in changes and ("MIN_LIFETIME" in changes or "MAX_LIFETIME" in changes):
+            values["ETA"] = 0.5 * (values["MAX_LIFETIME"] - values["MIN_LIFETIME"])
+        return RunConfig(**values)
+
+    def with_problem(self, problem):
+        """
+        Copia de la configuración para resolver otro problema.
+
+        :param problem: tupla (FUNCTION, A, B, SOL) con la función objetivo, el intervalo y la derivada real
+        :return: nueva configuración
+        """
+        function, a, b, sol = problem
+        return self.replace(FUNCTION=function, A=a, B=b, SOL=sol)
+
+    def items(self):
+        """
+        Parámetros de la configuración.
+
+        :return: tupla de pares (nombre, valor) ordenados por nombre
+        """
+        return tuple(sorted(self.__dict__.items()))
+
+    def changes(self):
+        """
+        Parámetros cuyo valor difiere del de ga.params.
+
+        :return: diccionario con los parámetros modificados
+        """
+        defaults = RunConfig()
+        return {name: value for name, value in self.items() if getattr(defaults, name) != value}
+
+    def identifier(self):
+        """
+        Identificador estable de la configuración, igual en todos los procesos y ejecuciones.
+
+        RESUME no forma parte del identificador, ya que no cambia el resultado: una ejecución reanudada utiliza los
+        mismos ficheros que la original.
+
+        :return: cadena hexadecimal de 8 caracteres
+        """
+        items = tuple(item for item in self.items() if item[0] != "RESUME")
+        return "{:08x}".format(zlib.crc32(repr(items).encode()))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("RunConfig is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("RunConfig is immutable")
+
+    def __eq__(self, other):
+        return isinstance(other, RunConfig) and self.items() == other.items()
+
+    def __hash__(self):
+        return hash(self.items())
+
+    def __reduce__(self):
+        return _restore, (self.items(),)
+
+    def __str__(self):
+        return "RunConfig(" + ", ".join("{}={!r}".format(name, value) for name, value in self.changes().items()) + ")"
+
+
+def _restore(items):
+    config = RunConfig.__new__(RunConfig)
+    for name, value in items:
+        object.__setattr__(config, name, value)
+    return config
+
+
+def default_values():
+    """
+    Valores actuales de los parámetros de ga.params.
+
+    :return: diccionario con el valor de cada parámetro en mayúsculas
+    """
+    return {name: getattr(params, name) for name in dir(params) if name.isupper()}
+
+
+def default_config():
+    """
+    Configuración con los valores actuales de ga.params.
+
+    Se utiliza cuando no se indica una configuración explícitamente.
+
+    :return: configuración por defecto
+    """
+    return RunConfig()
+
+
+def config_grid(base=None, **axes):
+    """
+    Producto cartesiano de valores de parámetros a partir de una configuración base.
+
+    Por ejemplo, config_grid(POPULATION_SIZE=[100, 200], MUTATION_RATE=[0.05, 0.1]) genera cuatro configuraciones.
+
+    :param base: configuración base (por defecto, la de ga.params)
+    :param axes: lista de valores de cada parámetro que se varía
+    :return: lista de configuraciones
+    """
+    base = base or default_config()
+    names = list(axes)
+    return [base.replace(**dict(zip(names, values))) for values in itertools.product(*(axes[name] for name in names))]
@@ -1,10 +1,9 @@
 import random
 import numpy as np
 import copy
-from ga.params import MAX_GENOME_LENGTH, DUPLICATION_RATE
 
 
-def duplication(individual):
+def duplication(individual, config):
     """
     Operador de duplicación.
 
@@ -15,17 +14,52 @@ def duplication(individual):
     antes del último codón de la cadena.
 
     :param individual: individuo al que se le aplica la duplicación
+    :param config: configuración de la ejecución
     :return: nuevo individuo tras haberse aplicado la duplicación
     """
-    if random.random() < DUPLICATION_RATE:
+    if random.random() < config.DUPLICATION_RATE:
         genome = copy.copy(individual.genome)
         codons2duplicate = random.randint(1, len(genome))
         start = random.randint(0, len(genome)-codons2duplicate)
         end = start+codons2duplicate
         output = np.insert(genome, -1, genome[start:end])
 
-        if len(output) <= MAX_GENOME_LENGTH:
-            individual.genome = list(output)
+        if len(output) <= config.MAX_GENOME_LENGTH:
+            individual.genome = bytearray(output)
 
     return individual
 
+
+def batch_duplication(population, config):
+    """
+    Operador de duplicación aplicado a la vez a todos los individuos de una población basada en arrays.
+
+    Para cada individuo duplicado, la posición j del nuevo genoma toma el codón j si está antes del último codón, el
+    codón start + (j - (l - 1)) si pertenece a la sección duplicada y el codón j - k en otro caso.
+
+    :param population: población basada en arrays a la que se le aplica la duplicación
+    :param config: configuración de la ejecución
+    :return: población tras haberse aplicado la duplicación
+    """
+    lengths = population.lengths
+    max_length = population.genomes.shape[1]
+    size = len(lengths)
+    codons2duplicate = (np.random.random(size) * lengths).astype(np.int64) + 1
+    start = (np.random.random(size) * (lengths - codons2duplicate + 1)).astype(np.int64)
+    selected = (np.random.random(size) < config.DUPLICATION_RATE) & (lengths + codons2duplicate <= max_length)
+    if not selected.any():
+        return population
+
+    rows = np.flatnonzero(selected)
+    last = (lengths[rows] - 1)[:, None]
+    k = codons2duplicate[rows][:, None]
+    positions = np.arange(max_length)
+    source = np.where(positions < last, positions,
+                      np.where(positions < last + k, start[rows][:, None] + positions - last, positions - k))
+    source = np.clip(source, 0, max_length - 1)
+    genomes = np.take_along_axis(population.genomes[rows], source, axis=1)
+    lengths[rows] += codons2duplicate[rows]
+    genomes[positions >= lengths[rows][:, None]] = 0
+    population.genomes[rows] = genomes
+
+    return population
@@ -1,31 +1,54 @@
 import math
-import ga.params as params
+import types
+import functools
+import numpy as np
+from ga.config import default_config
 
+# Número de intervalos, paso de la diferencia finita, umbral de acierto y pesos del error
+N = 50
+H = 10 ** -5
+U = 10 ** -1
+K0 = 1
+K1 = 10
+# Penalización asignada a los individuos cuya expresión no puede evaluarse en algún punto
+PENALTY = 100000
+# Separación entre los puntos de la primera etapa de la evaluación vectorizada con umbral
+RACING_STRIDE = 5
 
-def fitness_function(g_hat):
+# Sustituto del módulo math para evaluar las expresiones sobre vectores de NumPy
+NUMPY_MATH = types.SimpleNamespace(sin=np.sin, cos=np.cos, exp=np.exp, log=np.log)
+
+
+def fitness_function(g_hat, config=None):
     """
     Función de evaluación de nivel de adaptación (fitness) de cada individuo.
 
+    Si VECTORIZED_FITNESS está activado se evalúa la expresión sobre todos los puntos a la vez. Las funciones de NumPy
+    pueden diferir en el último bit de las del módulo math, y en expresiones mal condicionadas (senos y cosenos de
+    argumentos muy grandes, exponenciales anidadas...) esa diferencia se amplifica hasta cambiar el fitness e incluso
+    los hits, por lo que la evaluación escalar es la opción por defecto.
+
     :param g_hat: fenotipo del individuo del que se desea calcular el nivel de adaptación.
+    :param config: configuración de la ejecución con el problema a resolver
     :return: valor de fitness del individuo,
             número de hits (51 hits significa que se ha alcanzado una solución)
     """
-    N = 50
-    h = 10 ** -5
-    U = 10 ** -1
-    K0 = 1
-    K1 = 10
-    hits = 0
+    config = config or default_config()
+    if config.VECTORIZED_FITNESS:
+        return vectorized_fitness_function(g_hat, config)
+
+    x, f_p = target_samples(config)
+    if f_p is None:
+        return PENALTY, 0
 
+    hits = 0
     expression = []
-    delta = (params.B - params.A) / N
-    for i in range(0, N+1):
+    for x_i, f_p_i in zip(x.tolist(), f_p.tolist()):
         try:
-            f_p = (eval(params.FUNCTION.replace("X", str(params.A + i*delta + h))) - eval(params.FUNCTION.replace("X", str(params.A+i*delta))))/h
-            expr = abs(f_p - eval(g_hat.replace("X", str(params.A + i * delta))))
+            expr = abs(f_p_i - eval(g_hat.replace("X", str(x_i))))
         except (ValueError, ZeroDivisionError, OverflowError):
             # return math.inf, 0
-            return 100000, 0
+            return PENALTY, 0
 
         if expr <= U:
             w = K0
@@ -37,6 +60,183 @@ def fitness_function(g_hat):
     return (1/(N+1))*sum(expression), hits
 
 
+def racing_fitness_function(g_hat, cutoff, config=None):
+    """
+    Función de evaluación del nivel de adaptación con umbral de abandono.
+
+    Todos los términos del error ponderado son positivos, por lo que la suma parcial es una cota inferior del fitness.
+    En cuanto esta cota alcanza el umbral, el individuo ya no puede mejorarlo y la evaluación se detiene, devolviendo la
+    cota y marcando el resultado como truncado.
+    En la versión vectorizada se evalúa primero uno de cada RACING_STRIDE puntos y, si la cota obtenida no alcanza
+    el umbral, se completa la evaluación sobre todos los puntos.
+
+    :param g_hat: fenotipo del individuo del que se desea calcular el nivel de adaptación.
+    :param cutoff: umbral de fitness (por ejemplo, el del peor superviviente o el del individuo actual en la búsqueda
+                   local)
+    :param config: configuración de la ejecución con el problema a resolver
+    :return: valor de fitness del individuo (o cota inferior si se ha truncado),
+            número de hits (obtenidos hasta el momento si se ha truncado),
+            True si la evaluación se ha truncado
+    """
+    config = config or default_config()
+    if config.VECTORIZED_FITNESS:
+        return vectorized_racing_fitness_function(g_hat, cutoff, config)
+
+    x, f_p = target_samples(config)
+    if f_p is None:
+        return PENALTY, 0, False
+
+    hits = 0
+    total = 0
+    for i, (x_i, f_p_i) in enumerate(zip(x.tolist(), f_p.tolist())):
+        try:
+            expr = abs(f_p_i - eval(g_hat.replace("X", str(x_i))))
+        except (ValueError, ZeroDivisionError, OverflowError):
+            return PENALTY, 0, False
+
+        if expr <= U:
+            w = K0
+            hits += 1
+        else:
+            w = K1
+        total += w*expr
+        if i < N and (1/(N+1))*total >= cutoff:
+            return (1/(N+1))*total, hits, True
+
+    return (1/(N+1))*total, hits, False
+
+
+def vectorized_racing_fitness_function(g_hat, cutoff, config=None):
+    """
+    Versión vectorizada de la función de evaluación con umbral de abandono.
+
+    :param g_hat: fenotipo del individuo del que se desea calcular el nivel de adaptación.
+    :param cutoff: umbral de fitness
+    :param config: configuración de la ejecución con el problema a resolver
+    :return: valor de fitness del individuo (o cota inferior si se ha truncado),
+            número de hits (obtenidos en los puntos evaluados si se ha truncado),
+            True si la evaluación se ha truncado
+    """
+    x, f_p = target_samples(config)
+    if f_p is None:
+        return PENALTY, 0, False
+
+    sample = slice(0, N+1, RACING_STRIDE)
+    try:
+        y = evaluate_expression(g_hat, x[sample])
+    except (FloatingPointError, ValueError, ZeroDivisionError, OverflowError):
+        return PENALTY, 0, False
+
+    with np.errstate(all="ignore"):
+        error = np.abs(f_p[sample] - y)
+        if not np.all(np.isfinite(error)):
+            return PENALTY, 0, False
+        hit_mask = error <= U
+        bound = (1/(N+1))*float(np.sum(np.where(hit_mask, K0, K1) * error))
+    if bound >= cutoff:
+        return bound, int(np.count_nonzero(hit_mask)), True
+
+    return vectorized_fitness_function(g_hat, config) + (False,)
+
+
+def target_samples(config=None):
+    """
+    Puntos de muestreo y valores objetivo de la derivada del problema de una configuración.
+
+    Los valores se calculan una única vez por problema y se comparten entre todos los individuos y ejecuciones. La caché
+    se indexa por (FUNCTION, A, B, N, H), por lo que al cambiar el problema se recalculan automáticamente.
+
+    :param config: configuración de la ejecución con el problema a resolver
+    :return: vector de puntos x,
+            vector con la aproximación por diferencias finitas de la derivada en cada punto (None si la función
+            objetivo no puede evaluarse en algún punto)
+    """
+    config = config or default_config()
+    return _compute_target(config.FUNCTION, config.A, config.B, N, H)
+
+
+@functools.lru_cache(maxsize=8)
+def _compute_target(function, a, b, n, h):
+    delta = (b - a) / n
+    x = np.array([a + i*delta for i in range(0, n+1)])
+    x.setflags(write=False)
+    f_p = []
+    for x_i in x.tolist():
+        try:
+            f_p.append((eval(function.replace("X", str(x_i + h))) - eval(function.replace("X", str(x_i))))/h)
+        except (ValueError, ZeroDivisionError, OverflowError):
+            return x, None
+    f_p = np.array(f_p)
+    f_p.setflags(write=False)
+
+    return x, f_p
+
+
+def clear_target_cache():
+    """
+    Eliminación de los valores objetivo almacenados en caché.
+
+    """
+    _compute_target.cache_clear()
+
+
+def evaluate_expression(expression, x):
+    """
+    Evaluación vectorizada de una expresión sobre un conjunto de puntos.
+
+    La expresión se compila una única vez y se evalúa sobre todo el vector x, sustituyendo las funciones del módulo
+    math por sus equivalentes de NumPy. Los desbordamientos, errores de dominio y divisiones por cero se detectan
+    mediante np.errstate y se notifican con una única excepción FloatingPointError para todo el vector, en lugar de
+    una excepción por punto.
+
+    :param expression: expresión matemática con la variable X y funciones del módulo math
+    :param x: vector de puntos en los que se evalúa la expresión
+    :return: vector con el valor de la expresión en cada punto
+    """
+    code = compile(expression, "<expression>", "eval")
+    with np.errstate(divide="raise", over="raise", invalid="raise", under="ignore"):
+        y = eval(code, {"math": NUMPY_MATH}, {"X": x})
+    # Las expresiones constantes devuelven un escalar que se extiende a todos los puntos
+    return np.broadcast_to(np.asarray(y, dtype=np.float64), x.shape)
+
+
+def vectorized_fitness_function(g_hat, config=None):
+    """
+    Versión vectorizada de la función de evaluación de nivel de adaptación (fitness).
+
+    Se evalúa el fenotipo sobre todos los puntos de la malla en una única llamada y se calculan
+    el error ponderado y el número de hits mediante operaciones sobre vectores. Si la expresión no es finita en algún
+    punto, se asigna la misma penalización que en la versión escalar.
+
+    :param g_hat: fenotipo del individuo del que se desea calcular el nivel de adaptación.
+    :param config: configuración de la ejecución con el problema a resolver
+    :return: valor de fitness del individuo,
+            número de hits (51 hits significa que se ha alcanzado una solución)
+    """
+    x, f_p = target_samples(config)
+    if f_p is None:
+        return PENALTY, 0
+
+    try:
+        y = evaluate_expression(g_hat, x)
+    # Las subexpresiones constantes se evalúan con floats de Python, que sí lanzan excepciones propias
+    except (FloatingPointError, ValueError, ZeroDivisionError, OverflowError):
+        return PENALTY, 0
+
+    with np.errstate(all="ignore"):
+        error = np.abs(f_p - y)
+    if not np.all(np.isfinite(error)):
+        return PENALTY, 0
+
+    hit_mask = error <= U
+    weights = np.where(hit_mask, K0, K1)
+    # Los errores muy grandes pueden desbordarse al ponderarse, igual que en la versión escalar
+    with np.errstate(over="ignore"):
+        fitness = (1/(N+1))*float(np.sum(weights * error))
+
+    return fitness, int(np.count_nonzero(hit_mask))
+
+
 def phenotypeToExpression(phenotype):
     """
     Función utilizada para poder evaluar con eval() la expresión matemática que define el fenotipo de un individuo.
@@ -0,0 +1,161 @@
+from collections import OrderedDict
+from ga.params import FITNESS_CACHE_SIZE
+from ga.config import default_config
+from ga.fitness import fitness_function, racing_fitness_function, phenotypeToExpression
+from ga.interpreter import compile_program, batch_fitness_function
+
+
+class FitnessCache(object):
+
+    def __init__(self, max_size):
+        """
+        Inicialización de la caché de fitness.
+
+        Se almacena el par (fitness, hits) de cada fenotipo evaluado, de forma que los individuos repetidos (copias de
+        los padres cuando no se produce el cruce, individuos que no han sido mutados...) no se vuelvan a evaluar.
+        Cuando se supera el tamaño máximo se elimina la entrada utilizada hace más tiempo (LRU). El tamaño máximo se
+        ajusta al valor de FITNESS_CACHE_SIZE de la configuración de cada evaluación.
+
+        :param max_size: número máximo inicial de fenotipos almacenados (0 desactiva la caché)
+        """
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        # Evaluaciones resueltas con la caché y evaluaciones reales de la función de fitness
+        self.hits = 0
+        self.misses = 0
+        # Evaluaciones reales abandonadas al alcanzar el umbral
+        self.truncated = 0
+
+    def evaluate(self, phenotype, cutoff=None, config=None):
+        """
+        Cálculo del fitness de un fenotipo, reutilizando el valor almacenado si ya se ha evaluado previamente.
+
+        La clave incluye el problema de la configuración y el modo de evaluación, para que los valores obtenidos con
+        distintas configuraciones no se mezclen.
+        Si se indica un umbral, la evaluación se abandona en cuanto el fenotipo no puede mejorarlo y se devuelve una
+        cota inferior de su fitness, que no se almacena en la caché.
+
+        :param phenotype: fenotipo del individuo
+        :param cutoff: umbral de fitness opcional
+        :param config: configuración de la ejecución con el problema a resolver
+        :return: valor de fitness del individuo (o cota inferior si la evaluación se ha truncado),
+                número de hits
+        """
+        config = config or default_config()
+        self.resize(config.FITNESS_CACHE_SIZE)
+        key = (phenotype, config.FUNCTION, config.A, config.B, config.VECTORIZED_FITNESS)
+        result = self.entries.get(key)
+        if result is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+        self.misses += 1
+        if cutoff is None:
+            result = fitness_function(phenotypeToExpression(phenotype), config)
+        else:
+            fitness, hits, truncated = racing_fitness_function(phenotypeToExpression(phenotype), cutoff, config)
+            result = fitness, hits
+            if truncated:
+                self.truncated += 1
+                return result
+        if self.max_size > 0:
+            self.entries[key] = result
+            if len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+        return result
+
+    def evaluate_batch(self, phenotypes, config=None):
+        """
+        Cálculo del fitness de un conjunto de fenotipos con el intérprete por lotes.
+
+        Los fenotipos que no están en la caché se traducen a programas en notación postfija y se evalúan todos a la vez,
+        sin utilizar eval(). Los fenotipos repetidos dentro del conjunto solo se evalúan una vez y se contabilizan como
+        aciertos de la caché, igual que al evaluarlos uno a uno.
+
+        :param phenotypes: lista de fenotipos
+        :param config: configuración de la ejecución con el problema a resolver
+        :return: lista con el valor de fitness y el número de hits de cada fenotipo
+        """
+        config = config or default_config()
+        self.resize(config.FITNESS_CACHE_SIZE)
+        results = [None] * len(phenotypes)
+        missing = {}
+        for i, phenotype in enumerate(phenotypes):
+            key = (phenotype, config.FUNCTION, config.A, config.B, config.VECTORIZED_FITNESS)
+            result = self.entries.get(key)
+            if result is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                results[i] = result
+            elif key in missing:
+                self.hits += 1
+                missing[key].append(i)
+            else:
+                self.misses += 1
+                missing[key] = [i]
+
+        keys = list(missing)
+        programs = [compile_program(key[0]) for key in keys]
+        compiled = [j for j, program in enumerate(programs) if program is not None]
+        batch_results = dict(zip(compiled, batch_fitness_function([programs[j] for j in compiled], config))) if compiled else {}
+        for j, key in enumerate(keys):
+            # Los fenotipos con símbolos que el intérprete no soporta se evalúan con eval()
+            result = batch_results[j] if j in batch_results else fitness_function(phenotypeToExpression(key[0]), config)
+            for i in missing[key]:
+                results[i] = result
+            if self.max_size > 0:
+                self.entries[key] = result
+                if len(self.entries) > self.max_size:
+                    self.entries.popitem(last=False)
+
+        return results
+
+    def resize(self, max_size):
+        """
+        Cambio del tamaño máximo de la caché, eliminando las entradas utilizadas hace más tiempo que no caben.
+
+        :param max_size: número máximo de fenotipos almacenados (0 desactiva la caché)
+        """
+        if max_size == self.max_size:
+            return
+        self.max_size = max_size
+        while len(self.entries) > max(max_size, 0):
+            self.entries.popitem(last=False)
+
+    @property
+    def evaluations(self):
+        """
+        Número de evaluaciones lógicas realizadas (resueltas con la caché o no).
+
+        :return: número de evaluaciones lógicas
+        """
+        return self.hits + self.misses
+
+    def hit_rate(self):
+        """
+        Proporción de evaluaciones resueltas con la caché.
+
+        :return: tasa de aciertos de la caché
+        """
+        if self.evaluations == 0:
+            return 0.
+        return self.hits / self.evaluations
+
+    def clear(self):
+        """
+        Eliminación de las entradas almacenadas y reinicio de los contadores.
+
+        """
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.truncated = 0
+
+    def __str__(self):
+        return "Fitness cache: {} hits; {} misses; {} truncated; {:.2%} hit rate; {} entries".format(
+            self.hits, self.misses, self.truncated, self.hit_rate(), len(self.entries))
+
+
+fitness_cache = FitnessCache(FITNESS_CACHE_SIZE)
@@ -1,45 +1,78 @@
 import math
+import time
 import random
-import itertools
-from ga.params import FIX_LENGTH, OFFSPRING_SIZE, POPULATION_SIZE, MAX_GENOME_LENGTH, GENERATIONS, VARIABLE_POPULATION_SIZE, MIN_LIFETIME, MAX_LIFETIME, ETA, SELF_ADAPTATION, FITNESS_BASED_REPLACEMENT, UNIFORM_CROSSOVER, AGE_BASED_REPLACEMENT
+import heapq
+import numpy as np
+from ga.config import default_config
 from ga.individual import Individual
-from ga.parent_selection import tournament_selection
-from ga.recombination import one_point_crossover, uniform_crossover
-from ga.mutation import random_resetting
+from ga.population import Population, best, best_position
+from ga.parent_selection import select_parents
+from ga.recombination import one_point_crossover, uniform_crossover, batch_one_point_crossover, batch_uniform_crossover
+from ga.mutation import random_resetting, batch_random_resetting
 from ga.survivor_selection import fitness_based_replacement, age_based_replacement, mu_lambda_selection, check_lifetime
-from ga.duplication import duplication
-from ga.fitness import fitness_function, phenotypeToExpression, average_fitness
+from ga.duplication import duplication, batch_duplication
+from ga.fitness import average_fitness
+from ga.fitness_cache import fitness_cache
+from ga.parallel import parallel_evaluator
 from ga.local_search import local_search
+from ga.checkpoint import SearchState, CheckpointWriter, load_checkpoint
+from ga.telemetry import TelemetrySink, generation_record
+from ga.profiling import profiler
 
 
-def initialization():
+def initialization(config=None, grammar=None):
     """
     Inicialización de la población: se crean POPULATION_SIZE individuos con una longitud de genoma aleatoria entre 1 y MAX_GENOME_LENGTH.
 
+    Si SENSIBLE_INITIALIZATION está activado y se indica la gramática, cada genoma codifica una derivación válida que
+    ocupa como máximo su longitud (Grammar.generate_genome), por lo que ningún individuo inicial necesita wrapping ni
+    reparación.
+    Si ARRAY_POPULATION está activado, la población se almacena en arrays de NumPy.
+
+    :param config: Configuración de la ejecución
+    :param grammar: Gramática utilizada para generar los genomas con SENSIBLE_INITIALIZATION
     :return: Población inicial
     """
-    if FIX_LENGTH:
-        return [Individual(None, MAX_GENOME_LENGTH) for _ in range(POPULATION_SIZE)]
+    config = config or default_config()
+    if config.SENSIBLE_INITIALIZATION and grammar is not None:
+        # Las longitudes se escogen igual que en la inicialización aleatoria, sin bajar del mínimo de la gramática
+        min_length = grammar.min_codons[grammar.start_id] + 1
+        # Las poblaciones basadas en arrays y la evaluación paralela reservan MAX_GENOME_LENGTH codones por individuo
+        if min_length > config.MAX_GENOME_LENGTH:
+            raise ValueError("MAX_GENOME_LENGTH too short for the grammar, at least:", min_length)
+        population = []
+        for _ in range(config.POPULATION_SIZE):
+            length = config.MAX_GENOME_LENGTH if config.FIX_LENGTH else random.randint(1, config.MAX_GENOME_LENGTH)
+            population.append(Individual(grammar.generate_genome(max(min_length, length)), None, config))
+        if config.ARRAY_POPULATION:
+            return Population.from_individuals(population, config)
+        return population
+    if config.ARRAY_POPULATION:
+        return Population.random(config.POPULATION_SIZE, config)
+    if config.FIX_LENGTH:
+        return [Individual(None, config.MAX_GENOME_LENGTH, config) for _ in range(config.POPULATION_SIZE)]
     else:
-        return [Individual(None, random.randint(1, MAX_GENOME_LENGTH)) for _ in range(POPULATION_SIZE)]
+        return [Individual(None, random.randint(1, config.MAX_GENOME_LENGTH), config)
+                for _ in range(config.POPULATION_SIZE)]
 
 
-def define_model():
+def define_model(config):
     """
     Según los parámetros especificados se asigna un operador de recombinación y un método de selección de supervivientes.
 
+    :param config: Configuración de la ejecución
     :return: Funciones escogidas para recombinación y selección de supervivientes
     """
-    if UNIFORM_CROSSOVER:
+    if config.UNIFORM_CROSSOVER:
         crossover = uniform_crossover
     else:
         crossover = one_point_crossover
 
-    if AGE_BASED_REPLACEMENT:
+    if config.AGE_BASED_REPLACEMENT:
         survivor_selection = age_based_replacement
-    elif SELF_ADAPTATION:
+    elif config.SELF_ADAPTATION:
         survivor_selection = mu_lambda_selection
-    elif VARIABLE_POPULATION_SIZE or FITNESS_BASED_REPLACEMENT:
+    elif config.VARIABLE_POPULATION_SIZE or config.FITNESS_BASED_REPLACEMENT:
         survivor_selection = fitness_based_replacement
     else:
         survivor_selection = age_based_replacement
@@ -47,51 +80,192 @@ def define_model():
     return crossover, survivor_selection
 
 
-def search(population, grammar):
+def search(population, grammar, migrate=None, config=None, state=None, telemetry=None):
     """
     Ejecución del algoritmo de búsqueda, en este caso un algoritmo genético.
 
+    Si CHECKPOINT_INTERVAL es mayor que 0, cada CHECKPOINT_INTERVAL generaciones se guarda en CHECKPOINT_FILE el
+    estado de la búsqueda, sin detener el bucle de generaciones mientras se escribe. El checkpoint solo se conserva si
+    la búsqueda se interrumpe: al terminar (también por terminación anticipada) se elimina.
+
+    Si PROFILING está activado, el tiempo de cada fase y los contadores de cada generación se acumulan en
+    ga.profiling.profiler.
+
+    Al terminar cada generación se añade un registro con el mejor, el fitness medio y el peor fitness, las evaluaciones
+    y los tiempos a telemetry o, si no se indica, al fichero TELEMETRY_FILE.
+
+    La búsqueda termina antes de GENERATIONS generaciones si se cumple alguno de los criterios de terminación activados
+    (STOP_ON_SOLUTION, STAGNATION_GENERATIONS, MAX_EVALUATIONS, MAX_TIME). En ese caso la lista de fitness de los
+    mejores individuos se completa con el último valor, de forma que siempre tiene GENERATIONS elementos.
+
     :param population: Población inicial
     :param grammar: Objeto con la gramática BNF especificada y métodos necesarios para generar el fenotipo de un individuo
+    :param migrate: Función opcional migrate(generation, population) que se llama al final de cada generación y devuelve
+                    la población tras intercambiar individuos con otras poblaciones (modelo de islas)
+    :param config: Configuración de la ejecución (por defecto, la de la gramática)
+    :param state: Estado desde el que se reanuda la búsqueda (en ese caso se ignora population)
+    :param telemetry: Registro de telemetría (TelemetrySink) en el que se añaden los registros de cada generación
     :return: Individuo con mejor fitness de la población tras completar la búsqueda,
             número de generaciones necesarias hasta encontrar una solución,
             lista con los fitness de los mejores individuos de cada generación,
-            número de evaluaciones de fitness realizadas durante las búsquedas locales en cada generación
+            número de evaluaciones de fitness realizadas durante las búsquedas locales en cada generación,
+            número de evaluaciones de fitness reales (no resueltas con la caché) hasta encontrar una solución
+    """
+    config = config or grammar.config
+    profiler.start_run(config.PROFILING)
+    start_time = time.perf_counter()
+    start_hits = fitness_cache.hits
+    if state is None:
+        # Evaluaciones reales realizadas antes de comenzar la búsqueda
+        start_evaluations = fitness_cache.misses
+
+        # Evaluación del fitness de la población inicial
+        evaluate_fitness(population, grammar, config=config)
+
+        # Cálculo del tiempo de vida de la población inicial
+        if config.VARIABLE_POPULATION_SIZE:
+            compute_lifetime(population, config)
+
+        # Almacenamiento del mejor individuo de la población inicial
+        best_individual = best(population)
+
+        start_generation = 0
+        first = True
+        gens_to_sol = 0
+        real_evaluations = 0
+
+        best_individuals = []
+        total_local_evaluations = 0
+        # Los tiempos de la evaluación de la población inicial se entregan como generación -1
+        profiler.end_generation(-1)
+    else:
+        # Reanudación desde un checkpoint: las evaluaciones reales ya realizadas se descuentan del contador de la caché
+        state.restore_rng()
+        start_evaluations = fitness_cache.misses - state.evaluations
+        population, best_individual = state.population, state.best_individual
+        start_generation = state.generation
+        first = not state.solved
+        gens_to_sol = state.gens_to_sol
+        real_evaluations = state.real_evaluations
+        best_individuals = list(state.best_individuals)
+        total_local_evaluations = state.total_local_evaluations
+
+    writer = CheckpointWriter(config.CHECKPOINT_FILE) if config.CHECKPOINT_INTERVAL > 0 else None
+    own_telemetry = telemetry is None and bool(config.TELEMETRY_FILE)
+    if own_telemetry:
+        telemetry = TelemetrySink(config.TELEMETRY_FILE, config.TELEMETRY_BUFFER, config=config.identifier())
+    # Mejor fitness alcanzado y generaciones transcurridas desde que se alcanzó
+    best_so_far = min(best_individuals, default=math.inf)
+    stagnant = generations_without_improvement(best_individuals)
+    # Se escogen los operadores de cruce y selección de supervivientes según los parámetros definidos
+    crossover, survivor_selection = define_model(config)
+    # Ejecución del algoritmo de búsqueda durante un número GENERATIONS de generaciones
+    try:
+        for generation in range(start_generation, config.GENERATIONS):
+            generation_start = time.perf_counter()
+            population, best_individual, local_evaluations = search_step(population, grammar, generation, crossover,
+                                                                         survivor_selection, config)
+            best_individuals.append(best_individual.fitness)
+            if best_individual.fitness < best_so_far:
+                best_so_far, stagnant = best_individual.fitness, 0
+            else:
+                stagnant += 1
+            # Si se alcanza una solución, se guarda el número de evaluaciones realizadas durante la búsqueda local y
+            # la generación en la que se ha obtenido.
+            if first and best_individual.hits == 51:
+                total_local_evaluations += local_evaluations
+                gens_to_sol = generation
+                real_evaluations = fitness_cache.misses - start_evaluations
+                first = False
+            if migrate is not None:
+                population = migrate(generation, population)
+            profiler.end_generation(generation)
+            if telemetry is not None:
+                now = time.perf_counter()
+                telemetry.write(generation_record(generation, population, best_individual,
+                                                  fitness_cache.misses - start_evaluations, local_evaluations,
+                                                  fitness_cache.hits - start_hits, now - generation_start,
+                                                  now - start_time))
+            # Los criterios de terminación se comprueban antes del checkpoint, de forma que nunca se guarda el estado
+            # de una búsqueda que ya ha terminado
+            if termination_criterion(config, not first, stagnant, fitness_cache.misses - start_evaluations,
+                                     time.perf_counter() - start_time) is not None:
+                break
+            if writer is not None and (generation + 1) % config.CHECKPOINT_INTERVAL == 0:
+                writer.write(SearchState(generation + 1, population, best_individual, best_individuals, gens_to_sol,
+                                         total_local_evaluations, real_evaluations,
+                                         fitness_cache.misses - start_evaluations, not first), config)
+    finally:
+        # Si la búsqueda se interrumpe, se completa la escritura del último checkpoint para poder reanudarla
+        if writer is not None:
+            writer.wait()
+        if own_telemetry:
+            telemetry.close()
+    if writer is not None:
+        writer.discard()
+
+    # Con terminación anticipada, la curva se completa con el último valor para que tenga GENERATIONS elementos
+    if best_individuals:
+        best_individuals.extend([best_individuals[-1]] * (config.GENERATIONS - len(best_individuals)))
+
+    return best_individual, gens_to_sol, best_individuals, total_local_evaluations, real_evaluations
+
+
+def termination_criterion(config, solved, stagnant, evaluations, elapsed):
     """
+    Comprobación de los criterios de terminación anticipada.
+
+    :param config: Configuración de la ejecución
+    :param solved: si ya se ha encontrado una solución
+    :param stagnant: generaciones transcurridas sin mejorar el mejor fitness
+    :param evaluations: evaluaciones reales de fitness realizadas
+    :param elapsed: tiempo de ejecución en segundos
+    :return: nombre del criterio que se cumple ("solution", "stagnation", "evaluations" o "time") o None
+    """
+    if config.STOP_ON_SOLUTION and solved:
+        return "solution"
+    if 0 < config.STAGNATION_GENERATIONS <= stagnant:
+        return "stagnation"
+    if 0 < config.MAX_EVALUATIONS <= evaluations:
+        return "evaluations"
+    if 0 < config.MAX_TIME <= elapsed:
+        return "time"
+    return None
+
+
+def generations_without_improvement(best_individuals):
+    """
+    Generaciones transcurridas desde la última mejora del mejor fitness, a partir de la curva de progreso.
 
-    # Evaluación del fitness de la población inicial
-    evaluate_fitness(population, grammar)
+    :param best_individuals: lista con los fitness de los mejores individuos de cada generación
+    :return: número de generaciones sin mejora
+    """
+    best_fitness, last_improvement = math.inf, -1
+    for generation, fitness in enumerate(best_individuals):
+        if fitness < best_fitness:
+            best_fitness, last_improvement = fitness, generation
 
-    # Cálculo del tiempo de vida de la población inicial
-    if VARIABLE_POPULATION_SIZE:
-        compute_lifetime(population)
+    return len(best_individuals) - 1 - last_improvement
 
-    # Almacenamiento del mejor individuo de la población inicial
-    best_individual = max(population)
-    population.sort(reverse=True)
 
-    first = True
-    gens_to_sol = 0
+def resume(checkpoint_file, grammar, migrate=None, config=None, telemetry=None):
+    """
+    Reanudación de la búsqueda desde un checkpoint.
 
-    best_individuals = []
-    total_local_evaluations = 0
-    # Se escogen los operadores de cruce y selección de supervivientes según los parámetros definidos
-    crossover, survivor_selection = define_model()
-    # Ejecución del algoritmo de búsqueda durante un número GENERATIONS de generaciones
-    for generation in range(0, GENERATIONS):
-        population, best_individual, local_evaluations = search_step(population, grammar, generation, crossover, survivor_selection)
-        best_individuals.append(best_individual.fitness)
-        # Si se alcanza una solución, se guarda el número de evaluaciones realizadas durante la búsqueda local y la
-        # generación en la que se ha obtenido.
-        if first and best_individual.hits == 51:
-            total_local_evaluations += local_evaluations
-            gens_to_sol = generation
-            first = False
+    La configuración debe ser la misma con la que se guardó el checkpoint. La continuación es idéntica a la de la
+    búsqueda sin interrumpir, salvo el número de evaluaciones reales, ya que las cachés no se guardan.
 
-    return best_individual, gens_to_sol, best_individuals, total_local_evaluations
+    :param checkpoint_file: nombre del fichero del checkpoint
+    :param grammar: Objeto con la gramática BNF especificada y métodos necesarios para generar el fenotipo de un individuo
+    :param migrate: Función opcional migrate(generation, population) (modelo de islas)
+    :param config: Configuración de la ejecución (por defecto, la de la gramática)
+    :param telemetry: Registro de telemetría en el que se añaden los registros de cada generación
+    :return: los mismos valores que search
+    """
+    return search(None, grammar, migrate, config, load_checkpoint(checkpoint_file), telemetry)
 
 
-def search_step(population, grammar, generation, crossover, survivor_selection):
+def search_step(population, grammar, generation, crossover, survivor_selection, config):
     """
     Ejecución de cada generación de la búsqueda.
 
@@ -100,71 +274,182 @@ def search_step(population, grammar, generation, crossover, survivor_selection):
     :param generation: Número de la generación actual
     :param crossover: Método seleccionado para realizar la recombinación
     :param survivor_selection: Método seleccionado para realizar la selección de supervivientes
+    :param config: Configuración de la ejecución
     :return: nueva población generada tras aplicar el proceso de búsqueda,
             individuo con mejor fitness de la población,
             número de evaluaciones de fitness realizadas durante el proceso de búsqueda local
     """
+    decoding = grammar.counters() if profiler.enabled else None
+    mark = profiler.clock()
 
     # Selección de padres
-    mating_pool = tournament_selection(population)
-
-    # Recombinación
-    offspring = []
-    while len(offspring) < OFFSPRING_SIZE:
-        offspring.extend(crossover(*random.sample(mating_pool, 2), generation))
-
-    # Mutación
-    offspring = list(map(random_resetting, offspring, itertools.repeat(generation, len(offspring))))
-
-    # Duplicación
-    offspring = list(map(duplication, offspring))
-
-    # Evaluación del fitness de la descendencia
-    evaluate_fitness(offspring, grammar)
+    mating_pool = select_parents(population, config)
+    mark = profiler.lap("selection", mark)
+
+    if config.BATCHED_VARIATION:
+        offspring = batch_variation(mating_pool, generation, config)
+        mark = profiler.clock()
+        # La descendencia se almacena con la misma representación que la población
+        if not isinstance(population, Population):
+            offspring = offspring.to_individuals()
+            mark = profiler.lap("conversion", mark)
+    else:
+        # Recombinación
+        offspring = []
+        while len(offspring) < config.OFFSPRING_SIZE:
+            offspring.extend(crossover(*random.sample(mating_pool, 2), generation, config))
+        mark = profiler.lap("crossover", mark)
+
+        # Mutación
+        offspring = [random_resetting(individual, generation, config) for individual in offspring]
+        mark = profiler.lap("mutation", mark)
+
+        # Duplicación
+        offspring = [duplication(individual, config) for individual in offspring]
+        mark = profiler.lap("duplication", mark)
+
+        # La descendencia se almacena con la misma representación que la población
+        if isinstance(population, Population):
+            offspring = Population.from_individuals(offspring, config)
+            mark = profiler.lap("conversion", mark)
+
+    # Evaluación del fitness de la descendencia. En el esquema (mu, lambda) solo sobreviven los POPULATION_SIZE mejores
+    # descendientes, por lo que con RACING se abandona la evaluación de los que no pueden llegar a estar entre ellos
+    racing = config.RACING and survivor_selection is mu_lambda_selection and not config.VARIABLE_POPULATION_SIZE
+    evaluate_fitness(offspring, grammar, racing, config)
+    mark = profiler.clock()
 
     # Búsqueda local
-    offspring, local_evaluations = local_search(offspring, grammar)
+    offspring, local_evaluations = local_search(offspring, grammar, config)
+    mark = profiler.lap("local_search", mark)
+    profiler.count("local_evaluations", local_evaluations)
 
     # Cálculo del tiempo de vida de la descendencia
-    if VARIABLE_POPULATION_SIZE:
-        compute_lifetime(offspring)
+    if config.VARIABLE_POPULATION_SIZE:
+        compute_lifetime(offspring, config)
+        mark = profiler.lap("lifetime", mark)
 
     # Selección de supervivientes
-    population = survivor_selection(offspring, population)
+    population = survivor_selection(offspring, population, config)
+    mark = profiler.lap("survivor_selection", mark)
 
     # Decremento del tiempo de vida de la población y eliminación de individuos a los que se le haya terminado
-    if VARIABLE_POPULATION_SIZE:
+    if config.VARIABLE_POPULATION_SIZE:
         population = decrease_lifetime(population)
         population = check_lifetime(population)
+        profiler.lap("lifetime", mark)
+
+    # Derivaciones, wraps y reparaciones realizadas durante la generación
+    if decoding is not None:
+        for name, value in grammar.counters().items():
+            profiler.count(name, value - decoding[name])
 
-    return population, max(population), local_evaluations
+    return population, best(population), local_evaluations
 
 
-def evaluate_fitness(population, grammar):
+def batch_variation(mating_pool, generation, config):
+    """
+    Aplicación de los operadores de variación a toda la descendencia a la vez.
+
+    Se generan tantas parejas de padres como en la recombinación individual y se aplican la recombinación, la mutación
+    y la duplicación sobre las matrices de codones de toda la descendencia.
+
+    :param mating_pool: individuos seleccionados como padres
+    :param generation: Número de la generación actual
+    :param config: Configuración de la ejecución
+    :return: descendencia como población basada en arrays
+    """
+    if not isinstance(mating_pool, Population):
+        mating_pool = Population.from_individuals(mating_pool, config)
+
+    pairs = math.ceil(config.OFFSPRING_SIZE / 2)
+    mark = profiler.clock()
+    if config.UNIFORM_CROSSOVER:
+        offspring = batch_uniform_crossover(mating_pool, pairs, generation, config)
+    else:
+        offspring = batch_one_point_crossover(mating_pool, pairs, generation, config)
+    mark = profiler.lap("crossover", mark)
+    offspring = batch_random_resetting(offspring, generation, config)
+    mark = profiler.lap("mutation", mark)
+    offspring = batch_duplication(offspring, config)
+    profiler.lap("duplication", mark)
+
+    return offspring
+
+
+def evaluate_fitness(population, grammar, racing=False, config=None):
     """
     Cálculo del fitness de cada individuo de la población.
 
+    Si PARALLEL_EVALUATION está activado y la población es suficientemente grande, la evaluación se reparte entre un
+    conjunto de procesos. Si BATCHED_INTERPRETER está activado, los fenotipos se evalúan como programas en notación
+    postfija con el intérprete por lotes.
+
+    Con racing, el umbral de cada evaluación es el fitness del peor de los POPULATION_SIZE mejores individuos evaluados
+    hasta el momento: los individuos que no pueden superarlo reciben una cota inferior de su fitness en lugar del
+    valor exacto. Solo se aplica en la evaluación en serie.
+
     :param population: Población actual
     :param grammar: Objeto con la gramática BNF especificada y métodos necesarios para generar el fenotipo de un individuo
+    :param racing: Abandonar la evaluación de los individuos que no pueden estar entre los POPULATION_SIZE mejores
+    :param config: Configuración de la ejecución (por defecto, la de la gramática)
 
     """
+    config = config or grammar.config
+    mark = profiler.clock()
+    if parallel_evaluator.accepts(len(population), config):
+        # La decodificación y el fitness se calculan en los procesos, por lo que se miden juntos
+        parallel_evaluator.evaluate(population, grammar, config)
+        profiler.lap("parallel_evaluation", mark)
+        return
+
+    # Decodificación de toda la población antes de evaluarla
+    valid = []
     for individual in population:
         individual.phenotype = grammar.decode(individual.genome)
         if individual.phenotype is not None:
-            individual.fitness, individual.hits = fitness_function(phenotypeToExpression(individual.phenotype))
+            valid.append(individual)
         # En caso de que el individuo sea inválido y no se realice reparación, se le asigna un fitness infinito
         else:
             individual.fitness = math.inf
-
-
-def compute_lifetime(population):
+    profiler.count("invalid", len(population) - len(valid))
+    mark = profiler.lap("decoding", mark)
+
+    # Evaluación de todos los individuos a la vez con el intérprete por lotes, sin utilizar eval()
+    if config.BATCHED_INTERPRETER:
+        results = fitness_cache.evaluate_batch([individual.phenotype for individual in valid], config)
+        for individual, (fitness, hits) in zip(valid, results):
+            individual.fitness, individual.hits = fitness, hits
+        profiler.lap("fitness", mark)
+        return
+
+    # Montículo con el fitness (cambiado de signo) de los POPULATION_SIZE mejores individuos evaluados
+    survivors = []
+    for individual in valid:
+        cutoff = -survivors[0] if racing and len(survivors) == config.POPULATION_SIZE else None
+        individual.fitness, individual.hits = fitness_cache.evaluate(individual.phenotype, cutoff, config)
+        if racing:
+            if len(survivors) < config.POPULATION_SIZE:
+                heapq.heappush(survivors, -individual.fitness)
+            elif individual.fitness < -survivors[0]:
+                heapq.heapreplace(survivors, -individual.fitness)
+    profiler.lap("fitness", mark)
+
+
+def compute_lifetime(population, config):
     """
     Cálculo del tiempo de vida inicial de cada individuo (en caso de utilizar tamaño de población variable).
 
     :param population: Individuos de los que se desea calcular el tiempo de vida.
+    :param config: Configuración de la ejecución
 
     """
-    population.sort(reverse=True)
+    if isinstance(population, Population):
+        compute_lifetime_arrays(population, config)
+        return
+
+    min_lifetime, max_lifetime, eta = config.MIN_LIFETIME, config.MAX_LIFETIME, config.ETA
+
     avg_fitness = average_fitness(population)
     best_fitness = max(population).fitness
     worst_fitness = min(population).fitness
@@ -175,12 +460,36 @@ def compute_lifetime(population):
         # Bi-linear allocation
         if avg_fitness <= individual.fitness:
             try:
-                individual.lifetime = MIN_LIFETIME + ETA * ((worst_fitness - individual.fitness)/(worst_fitness - avg_fitness))
+                individual.lifetime = min_lifetime + eta * ((worst_fitness - individual.fitness)/(worst_fitness - avg_fitness))
             except ZeroDivisionError:
-                individual.lifetime = MAX_LIFETIME
+                individual.lifetime = max_lifetime
 
         elif avg_fitness > individual.fitness:
-            individual.lifetime = 0.5 * (MIN_LIFETIME + MAX_LIFETIME) + ETA * ((avg_fitness - individual.fitness)/(avg_fitness - best_fitness))
+            individual.lifetime = 0.5 * (min_lifetime + max_lifetime) + eta * ((avg_fitness - individual.fitness)/(avg_fitness - best_fitness))
+
+
+def compute_lifetime_arrays(population, config):
+    """
+    Cálculo vectorizado del tiempo de vida inicial de cada individuo de una población basada en arrays.
+
+    :param population: Individuos de los que se desea calcular el tiempo de vida.
+    :param config: Configuración de la ejecución
+
+    """
+    fitness = population.fitness
+    avg_fitness = np.mean(fitness)
+    best_fitness = np.min(fitness)
+    worst_fitness = np.max(fitness)
+
+    # Bi-linear allocation
+    with np.errstate(all="ignore"):
+        if worst_fitness - avg_fitness == 0:
+            below_average = np.full(len(population), float(config.MAX_LIFETIME))
+        else:
+            below_average = config.MIN_LIFETIME + config.ETA * ((worst_fitness - fitness)/(worst_fitness - avg_fitness))
+        above_average = 0.5 * (config.MIN_LIFETIME + config.MAX_LIFETIME) + \
+            config.ETA * ((avg_fitness - fitness)/(avg_fitness - best_fitness))
+    population.lifetime[:] = np.where(avg_fitness <= fitness, below_average, above_average)
 
 
 def decrease_lifetime(population):
@@ -191,8 +500,15 @@ def decrease_lifetime(population):
     :param population: Población actual
     :return: Población actualizada
     """
-    population.sort(reverse=True)
-    for ind in population[1:]:
-        ind.lifetime -= 1
+    elite = best_position(population)
+    if isinstance(population, Population):
+        decrement = np.ones(len(population))
+        decrement[elite] = 0
+        population.lifetime -= decrement
+        return population
+
+    for index, ind in enumerate(population):
+        if index != elite:
+            ind.lifetime -= 1
 
     return population
@@ -1,36 +1,59 @@
 import random
-from ga.params import CODON_SIZE, MUTATION_RATE, SELF_ADAPTATION
+from ga.config import default_config
 
 
 class Individual(object):
 
-    def __init__(self, genome, length):
+    __slots__ = ("genome", "fitness", "phenotype", "hits", "mutation_rate", "lifetime")
+
+    def __init__(self, genome, length, config=None):
         """
         Inicialización de un individuo.
 
         Se calcula cada codón del individuo de forma aleatoria, salvo que se especifique una secuencia concreta.
+        El genoma se almacena como un bytearray (un byte por codón) y los atributos se declaran en __slots__ para
+        reducir la memoria ocupada por cada individuo.
 
         :param genome: secuencia de codones del individuo
         :param length: longitud de la secuencia de codones
+        :param config: configuración de la ejecución
         """
+        config = config or default_config()
         if genome is None:
-            self.genome = [random.randint(0, CODON_SIZE) for _ in range(length)]
+            self.genome = bytearray(random.randint(0, config.CODON_SIZE) for _ in range(length))
         else:
-            self.genome = genome
+            self.genome = bytearray(genome)
 
         self.fitness = 0
         self.phenotype = None
         self.hits = 0
-        if SELF_ADAPTATION:
+        if config.SELF_ADAPTATION:
             self.mutation_rate = 1/len(self.genome)
         else:
-            self.mutation_rate = MUTATION_RATE
+            self.mutation_rate = config.MUTATION_RATE
         self.lifetime = 0
 
+    def clone(self):
+        """
+        Copia del individuo.
+
+        Sustituye a copy.deepcopy: solo es necesario copiar el genoma, ya que el resto de atributos son inmutables.
+
+        :return: nuevo individuo con los mismos atributos
+        """
+        clone = Individual.__new__(Individual)
+        clone.genome = self.genome[:]
+        clone.fitness = self.fitness
+        clone.phenotype = self.phenotype
+        clone.hits = self.hits
+        clone.mutation_rate = self.mutation_rate
+        clone.lifetime = self.lifetime
+
+        return clone
+
     def __lt__(self, other):
         return self.fitness > other.fitness
 
     def __str__(self):
-        return "Individual: " + str(self.genome) + "; " + str(self.phenotype) + "; " + str(self.fitness) + "; " \
+        return "Individual: " + str(list(self.genome)) + "; " + str(self.phenotype) + "; " + str(self.fitness) + "; " \
                + str(self.hits) + "; " + str(self.mutation_rate) + "; " + str(self.lifetime)
-
@@ -0,0 +1,183 @@
+import re
+import functools
+import numpy as np
+from ga.fitness import target_samples, N, U, K0, K1, PENALTY
+
+# Códigos de operación de los programas en notación postfija. Los códigos a partir de OP_CONST apilan la constante
+# CONSTANTS[código - OP_CONST].
+OP_X = 0
+OP_ADD = 1
+OP_SUB = 2
+OP_MUL = 3
+OP_DIV = 4
+OP_SIN = 5
+OP_COS = 6
+OP_EXP = 7
+OP_LN = 8
+OP_CONST = 16
+
+BINARY_OPERATORS = {"+": OP_ADD, "-": OP_SUB, "*": OP_MUL, "/": OP_DIV}
+FUNCTIONS = {"sin": OP_SIN, "cos": OP_COS, "exp": OP_EXP, "ln": OP_LN}
+# Precedencia de los operadores binarios, la misma que utiliza Python al evaluar el fenotipo
+PRECEDENCE = {OP_ADD: 1, OP_SUB: 1, OP_MUL: 2, OP_DIV: 2}
+
+# Tabla de constantes numéricas que aparecen en los fenotipos
+CONSTANTS = []
+_constant_ids = {}
+
+# Número máximo de programas evaluados a la vez, para limitar la memoria de la pila
+BATCH_SIZE = 1024
+
+TOKEN_PATTERN = re.compile(r"\d+\.?\d*|\.\d+|[A-Za-z_]\w*|\S")
+
+
+def constant_opcode(value):
+    """
+    Código de operación que apila una constante numérica.
+
+    :param value: valor de la constante
+    :return: código de operación
+    """
+    if value not in _constant_ids:
+        _constant_ids[value] = len(CONSTANTS)
+        CONSTANTS.append(value)
+    return OP_CONST + _constant_ids[value]
+
+
+@functools.lru_cache(maxsize=100000)
+def compile_program(phenotype):
+    """
+    Traducción del fenotipo de un individuo a un programa en notación postfija.
+
+    Se utiliza el algoritmo shunting-yard con la misma precedencia y asociatividad que Python, de forma que el
+    programa calcula exactamente la misma expresión que eval() sobre el fenotipo.
+
+    :param phenotype: fenotipo de un individuo
+    :return: tupla con los códigos de operación del programa y profundidad máxima de su pila,
+            o None si el fenotipo contiene algún símbolo no soportado
+    """
+    program = []
+    operators = []
+    depth = max_depth = 0
+    for token in TOKEN_PATTERN.findall(phenotype):
+        if token == "X" or token[0].isdigit() or token[0] == ".":
+            program.append(OP_X if token == "X" else constant_opcode(float(token)))
+            depth += 1
+            max_depth = max(max_depth, depth)
+        elif token in FUNCTIONS or token == "(":
+            operators.append(FUNCTIONS.get(token, token))
+        elif token == ")":
+            while operators and operators[-1] != "(":
+                program.append(operators.pop())
+                depth -= 1
+            if not operators:
+                return None
+            operators.pop()
+            if operators and operators[-1] in (OP_SIN, OP_COS, OP_EXP, OP_LN):
+                program.append(operators.pop())
+        elif token in BINARY_OPERATORS:
+            operator = BINARY_OPERATORS[token]
+            while operators and operators[-1] in PRECEDENCE and PRECEDENCE[operators[-1]] >= PRECEDENCE[operator]:
+                program.append(operators.pop())
+                depth -= 1
+            operators.append(operator)
+        else:
+            return None
+    while operators:
+        operator = operators.pop()
+        if operator not in PRECEDENCE:
+            return None
+        program.append(operator)
+        depth -= 1
+
+    if depth != 1:
+        return None
+    return tuple(program), max_depth
+
+
+def evaluate_programs(programs, x):
+    """
+    Evaluación vectorizada de un conjunto de programas sobre todos los puntos x.
+
+    Los programas se ejecutan a la vez en una máquina de pila por lotes: en cada paso se aplica la instrucción
+    correspondiente de todos los programas, seleccionando con máscaras las filas a las que afecta cada código de
+    operación. Un programa se marca como inválido si alguna de sus operaciones produce un valor no finito, lo que
+    equivale a las excepciones de dominio, desbordamiento y división por cero de la evaluación con eval().
+
+    :param programs: lista de programas (tuplas de códigos de operación y profundidad máxima de la pila)
+    :param x: vector de puntos en los que se evalúan los programas
+    :return: matriz (programas x puntos) con el valor de cada programa en cada punto,
+            vector booleano que indica los programas inválidos
+    """
+    size = len(programs)
+    length = max(len(program) for program, _ in programs)
+    depth = max(max_depth for _, max_depth in programs)
+    # Los programas más cortos se completan con instrucciones vacías (-1)
+    code = np.full((size, length), -1, dtype=np.int64)
+    for i, (program, _) in enumerate(programs):
+        code[i, :len(program)] = program
+
+    stack = np.zeros((size, depth, len(x)))
+    pointer = np.zeros(size, dtype=np.int64)
+    invalid = np.zeros(size, dtype=bool)
+    constants = np.asarray(CONSTANTS, dtype=np.float64)
+
+    with np.errstate(all="ignore"):
+        for step in range(length):
+            ops = code[:, step]
+            rows = np.flatnonzero(ops == OP_X)
+            if len(rows):
+                stack[rows, pointer[rows]] = x
+                pointer[rows] += 1
+            rows = np.flatnonzero(ops >= OP_CONST)
+            if len(rows):
+                stack[rows, pointer[rows]] = constants[ops[rows] - OP_CONST][:, None]
+                pointer[rows] += 1
+            for op, function in ((OP_ADD, np.add), (OP_SUB, np.subtract), (OP_MUL, np.multiply), (OP_DIV, np.divide)):
+                rows = np.flatnonzero(ops == op)
+                if len(rows):
+                    result = function(stack[rows, pointer[rows] - 2], stack[rows, pointer[rows] - 1])
+                    invalid[rows] |= ~np.all(np.isfinite(result), axis=1)
+                    stack[rows, pointer[rows] - 2] = result
+                    pointer[rows] -= 1
+            for op, function in ((OP_SIN, np.sin), (OP_COS, np.cos), (OP_EXP, np.exp), (OP_LN, np.log)):
+                rows = np.flatnonzero(ops == op)
+                if len(rows):
+                    result = function(stack[rows, pointer[rows] - 1])
+                    invalid[rows] |= ~np.all(np.isfinite(result), axis=1)
+                    stack[rows, pointer[rows] - 1] = result
+
+    return stack[:, 0], invalid
+
+
+def batch_fitness_function(programs, config=None):
+    """
+    Cálculo del fitness de un conjunto de programas sin utilizar eval().
+
+    Se evalúan todos los programas sobre la malla de puntos del problema actual, en lotes de BATCH_SIZE, y se calculan
+    el error ponderado y el número de hits de cada uno con las mismas reglas que fitness_function.
+
+    :param programs: lista de programas obtenidos con compile_program
+    :param config: configuración de la ejecución con el problema actual
+    :return: lista con el valor de fitness y el número de hits de cada programa
+    """
+    x, f_p = target_samples(config)
+    if f_p is None:
+        return [(PENALTY, 0)] * len(programs)
+
+    results = []
+    for start in range(0, len(programs), BATCH_SIZE):
+        y, invalid = evaluate_programs(programs[start:start + BATCH_SIZE], x)
+        with np.errstate(all="ignore"):
+            error = np.abs(f_p - y)
+            invalid |= ~np.all(np.isfinite(error), axis=1)
+            hit_mask = error <= U
+            fitness = (1/(N+1))*np.sum(np.where(hit_mask, K0, K1) * error, axis=1)
+        hits = np.count_nonzero(hit_mask, axis=1)
+        for i in range(len(y)):
+            if invalid[i]:
+                results.append((PENALTY, 0))
+            else:
+                results.append((float(fitness[i]), int(hits[i])))
+
+    return results
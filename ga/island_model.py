@@ -0,0 +1,153 @@
+import random
+import multiprocessing
+import numpy as np
+from ga.population import Population, best_positions, worst_positions, take
+from ga.genetic_algorithm import initialization, search
+from ge.grammar import Grammar
+
+
+def topology(island, islands, kind):
+    """
+    Vecinos de una isla según la topología de migración.
+
+    Topología "ring": cada isla envía sus emigrantes a la siguiente y los recibe de la anterior.
+    Topología "full": cada isla envía sus emigrantes a todas las demás y los recibe de todas ellas.
+
+    :param island: índice de la isla
+    :param islands: número de islas
+    :param kind: tipo de topología ("ring" o "full")
+    :return: islas a las que se envían emigrantes,
+            número de islas de las que se reciben inmigrantes
+    """
+    if islands < 2:
+        return [], 0
+    if kind == "ring":
+        return [(island + 1) % islands], 1
+    if kind == "full":
+        return [other for other in range(islands) if other != island], islands - 1
+    raise ValueError("Unknown migration topology:", kind)
+
+
+def pack_migrants(population, count, config):
+    """
+    Selección de los mejores individuos de una isla en formato compacto.
+
+    Se envían únicamente los arrays de codones, longitudes, fitness, hits, probabilidad de mutación y tiempo de vida,
+    en lugar de objetos Individual serializados.
+
+    :param population: población de la isla
+    :param count: número de emigrantes
+    :param config: configuración de la ejecución
+    :return: tupla de arrays con los atributos de los emigrantes
+    """
+    migrants = take(population, best_positions(population, count, ordered=True))
+    if not isinstance(migrants, Population):
+        migrants = Population.from_individuals(migrants, config)
+
+    return migrants.genomes, migrants.lengths, migrants.fitness, migrants.hits, migrants.mutation_rate, migrants.lifetime
+
+
+def integrate_migrants(population, packets, grammar):
+    """
+    Sustitución de los peores individuos de una isla por los inmigrantes recibidos.
+
+    El fenotipo de cada inmigrante se recalcula a partir de su genoma; el fitness y los hits se reutilizan, por lo que
+    no es necesario volver a evaluarlos.
+
+    :param population: población de la isla
+    :param packets: lista de tuplas de arrays recibidas de otras islas
+    :param grammar: objeto con la gramática BNF especificada
+    :return: población con los inmigrantes
+    """
+    immigrants = Population(*(np.concatenate(arrays) for arrays in zip(*packets)))
+    for i in range(len(immigrants)):
+        immigrants.phenotypes[i] = grammar.decode(immigrants.genome(i))
+
+    for k, position in enumerate(worst_positions(population, len(immigrants), ordered=True).tolist()):
+        population[position] = immigrants.individual(k)
+
+    return population
+
+
+def island_worker(island, islands, seed, grammar_file, config, inboxes, results):
+    """
+    Evolución de una isla en su propio proceso.
+
+    Cada MIGRATION_INTERVAL generaciones la isla envía sus MIGRATION_SIZE mejores individuos a sus vecinos y espera
+    a recibir los de las islas de las que es vecina antes de continuar.
+
+    :param island: índice de la isla
+    :param islands: número de islas
+    :param seed: semilla de la isla
+    :param grammar_file: nombre del archivo que contiene la gramática
+    :param config: configuración de la ejecución, con el problema que se resuelve
+    :param inboxes: colas de entrada de todas las islas
+    :param results: cola en la que se deja el resultado de la isla
+    """
+    # Los checkpoints no recogen los inmigrantes pendientes de otras islas, por lo que se desactivan. Tampoco se
+    # termina anticipadamente, ya que las demás islas esperarían indefinidamente a sus emigrantes
+    config = config.replace(CHECKPOINT_INTERVAL=0, STOP_ON_SOLUTION=False, STAGNATION_GENERATIONS=0, MAX_EVALUATIONS=0,
+                            MAX_TIME=0)
+    random.seed(seed)
+    np.random.seed(seed)
+    grammar = Grammar(grammar_file, config)
+    destinations, sources = topology(island, islands, config.MIGRATION_TOPOLOGY)
+    # Paquetes recibidos de cada época de migración (las islas más rápidas pueden adelantarse una época)
+    pending = {}
+
+    def migrate(generation, population):
+        if sources == 0 or (generation + 1) % config.MIGRATION_INTERVAL != 0:
+            return population
+        epoch = (generation + 1) // config.MIGRATION_INTERVAL
+        packet = pack_migrants(population, config.MIGRATION_SIZE, config)
+        for destination in destinations:
+            inboxes[destination].put((epoch, packet))
+        while len(pending.get(epoch, [])) < sources:
+            received_epoch, received = inboxes[island].get()
+            pending.setdefault(received_epoch, []).append(received)
+
+        return integrate_migrants(population, pending.pop(epoch), grammar)
+
+    population = initialization(config, grammar)
+    results.put((island,) + search(population, grammar, migrate, config))
+
+
+def island_search(config, grammar_file, islands=None, seed=0):
+    """
+    Ejecución del algoritmo genético con un modelo de islas.
+
+    Se evolucionan islands subpoblaciones, cada una en su propio proceso, que intercambian periódicamente sus mejores
+    individuos según la topología MIGRATION_TOPOLOGY.
+
+    :param config: configuración de la ejecución, con el problema que se resuelve
+    :param grammar_file: nombre del archivo que contiene la gramática
+    :param islands: número de islas (por defecto, ISLANDS)
+    :param seed: semilla base; cada isla utiliza seed + índice de la isla
+    :return: individuo con mejor fitness entre todas las islas,
+            número de generaciones necesarias hasta que alguna isla encuentra una solución,
+            lista con el mejor fitness global de cada generación,
+            lista con la curva de mejores fitness de cada isla,
+            número de evaluaciones de fitness realizadas durante las búsquedas locales de todas las islas
+    """
+    islands = islands or config.ISLANDS
+    inboxes = [multiprocessing.Queue() for _ in range(islands)]
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=island_worker,
+                                         args=(island, islands, seed + island, grammar_file, config, inboxes, results))
+                 for island in range(islands)]
+    for process in processes:
+        process.start()
+    # Los resultados se recogen antes de esperar a los procesos para no bloquear las colas
+    island_results = sorted(results.get() for _ in range(islands))
+    for process in processes:
+        process.join()
+
+    solutions = [result[1] for result in island_results]
+    island_curves = [result[3] for result in island_results]
+    best_individual = max(solutions)
+    global_curve = np.min(np.asarray(island_curves), axis=0).tolist() if config.GENERATIONS > 0 else []
+    solved = [result[2] for result in island_results if result[1].hits == 51]
+    gens_to_sol = min(solved) if solved else 0
+    local_evaluations = sum(result[4] for result in island_results)
+
+    return best_individual, gens_to_sol, global_curve, island_curves, local_evaluations
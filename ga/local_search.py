@@ -1,37 +1,159 @@
-import copy
 import random
-from ga.fitness import fitness_function, phenotypeToExpression
-from ga.params import CODON_SIZE
+from ga.fitness_cache import fitness_cache
+from ga.population import best as best_individual, best_position, best_positions
+from ga.parallel import parallel_evaluator
+from ge.grammar import NEUTRAL
 
 
-def local_search(offspring, grammar):
+def local_search(offspring, grammar, config):
     """
     Método de búsqueda local.
 
     Se evalúa el fitness de los vecinos del mejor individuo de la descendencia, en caso de que alguno sea mejor,
     se finaliza la búsqueda y se sustituye al individuo por el nuevo.
     Los vecinos de un individuo se calculan aplicando mutación secuencialmente a cada codón del individuo.
+    Cada vecino se decodifica reanudando la derivación del mejor individuo desde el codón modificado, y los vecinos
+    neutros (con el mismo fenotipo que el mejor individuo) se descartan sin evaluarlos.
+    Con PARALLEL_EVALUATION, el vecindario se evalúa en paralelo si tiene al menos PARALLEL_NEIGHBOURHOOD_SIZE vecinos
+    (uno por codón del mejor individuo).
 
     :param offspring: conjunto de individuos que forman la descendencia
     :param grammar: objeto con la gramática BNF especificada y métodos necesarios para generar el fenotipo de un individuo
+    :param config: configuración de la ejecución
     :return: conjunto de individuos de la descendencia,
             número de evaluaciones de fitness realizadas hasta completar la búsqueda
     """
-    best = max(offspring)
+    if config.BEST_IMPROVEMENT:
+        return best_improvement_local_search(offspring, grammar, config)
+
+    best = best_individual(offspring)
+    arities, checkpoints = grammar.derivation_trace(best.genome)
+    if config.PARALLEL_EVALUATION and len(best.genome) >= config.PARALLEL_NEIGHBOURHOOD_SIZE:
+        return parallel_local_search(offspring, best, grammar, arities, checkpoints, config)
     evaluations = 0
 
     for i in range(len(best.genome)):
-        new_best = copy.deepcopy(best)
-        new_best.genome[i] = random.randint(0, CODON_SIZE)
-        new_best.phenotype = grammar.decode(new_best.genome)
-        if new_best.phenotype is None:
+        new_best = best.clone()
+        new_best.genome[i] = random.randint(0, config.CODON_SIZE)
+        new_best.phenotype = grammar.decode_neighbour(new_best.genome, arities, checkpoints, i)
+        if new_best.phenotype is None or new_best.phenotype is NEUTRAL:
             continue
-        new_best.fitness, new_best.hits = fitness_function(phenotypeToExpression(new_best.phenotype))
+        # Con RACING, la evaluación se abandona si el vecino no puede mejorar al individuo actual
+        new_best.fitness, new_best.hits = fitness_cache.evaluate(new_best.phenotype, best.fitness if config.RACING else None,
+                                                                 config)
         evaluations += 1
         if new_best.fitness < best.fitness:
-            offspring.sort(reverse=True)
-            offspring[0] = new_best
+            offspring[best_position(offspring)] = new_best
+            break
+
+    return offspring, evaluations
+
+
+
+def parallel_local_search(offspring, best, grammar, arities, checkpoints, config):
+    """
+    Búsqueda local con evaluación en paralelo del vecindario.
+
+    Se generan a la vez todos los vecinos del mejor individuo y se evalúan en una única llamada al evaluador paralelo.
+    Se selecciona el primer vecino, en el orden de los codones, que mejora al individuo, igual que en la búsqueda
+    secuencial. Los vecinos neutros se descartan antes de la evaluación y se cuentan como evaluaciones todos los
+    vecinos válidos restantes, ya que todos han sido evaluados.
+
+    :param offspring: conjunto de individuos que forman la descendencia
+    :param best: mejor individuo de la descendencia
+    :param grammar: objeto con la gramática BNF especificada y métodos necesarios para generar el fenotipo de un individuo
+    :param arities: aridades de la derivación del mejor individuo
+    :param checkpoints: puntos de control de la derivación del mejor individuo
+    :param config: configuración de la ejecución
+    :return: conjunto de individuos de la descendencia,
+            número de evaluaciones de fitness realizadas hasta completar la búsqueda
+    """
+    neighbours = []
+    for i in range(len(best.genome)):
+        neighbour = best.clone()
+        neighbour.genome[i] = random.randint(0, config.CODON_SIZE)
+        if grammar.decode_neighbour(neighbour.genome, arities, checkpoints, i) is not NEUTRAL:
+            neighbours.append(neighbour)
+    parallel_evaluator.evaluate(neighbours, grammar, config)
+
+    evaluations = sum(1 for neighbour in neighbours if neighbour.phenotype is not None)
+    for neighbour in neighbours:
+        if neighbour.phenotype is not None and neighbour.fitness < best.fitness:
+            offspring[best_position(offspring)] = neighbour
             break
 
     return offspring, evaluations
 
+
+def best_improvement_local_search(offspring, grammar, config):
+    """
+    Búsqueda local por mejor mejora.
+
+    Se genera el vecindario de los LOCAL_SEARCH_TOP_K mejores individuos de la descendencia y se evalúa completo en una
+    única llamada, en paralelo o con el intérprete por lotes. Cada individuo se sustituye por su mejor vecino si este lo
+    mejora. Los vecinos neutros e inválidos se descartan sin evaluarlos.
+
+    :param offspring: conjunto de individuos que forman la descendencia
+    :param grammar: objeto con la gramática BNF especificada y métodos necesarios para generar el fenotipo de un individuo
+    :param config: configuración de la ejecución
+    :return: conjunto de individuos de la descendencia,
+            número de evaluaciones de fitness realizadas (igual al número de vecinos evaluados)
+    """
+    candidates = []
+    neighbours = []
+    for k in best_positions(offspring, config.LOCAL_SEARCH_TOP_K, ordered=True).tolist():
+        individual = offspring[k].clone() if isinstance(offspring, list) else offspring.individual(k)
+        arities, checkpoints = grammar.derivation_trace(individual.genome)
+        for i in range(len(individual.genome)):
+            for value in neighbourhood(individual.genome, arities, i, config):
+                neighbour = individual.clone()
+                neighbour.genome[i] = value
+                neighbour.phenotype = grammar.decode_neighbour(neighbour.genome, arities, checkpoints, i)
+                if neighbour.phenotype is not None and neighbour.phenotype is not NEUTRAL:
+                    candidates.append(k)
+                    neighbours.append(neighbour)
+
+    if not neighbours:
+        return offspring, 0
+
+    if parallel_evaluator.accepts(len(neighbours), config):
+        parallel_evaluator.evaluate(neighbours, grammar, config)
+    else:
+        results = fitness_cache.evaluate_batch([neighbour.phenotype for neighbour in neighbours], config)
+        for neighbour, (fitness, hits) in zip(neighbours, results):
+            neighbour.fitness, neighbour.hits = fitness, hits
+
+    # Mejor vecino de cada individuo (el primero generado en caso de empate)
+    improvements = {}
+    for k, neighbour in zip(candidates, neighbours):
+        if neighbour.fitness < improvements.get(k, offspring[k]).fitness:
+            improvements[k] = neighbour
+    for k, neighbour in improvements.items():
+        offspring[k] = neighbour
+
+    return offspring, len(neighbours)
+
+
+def neighbourhood(genome, arities, position, config):
+    """
+    Valores que se prueban en un codón para generar los vecinos de un individuo.
+
+    Si NEIGHBOURHOOD_SAMPLES es mayor que 0 se prueban ese número de valores aleatorios. En otro caso se prueba un valor
+    por cada producción de la regla en la que se consume el codón, distinta de la seleccionada actualmente.
+
+    :param genome: genotipo del individuo
+    :param arities: número de producciones de la regla en la que se ha utilizado cada codón consumido
+    :param position: posición del codón
+    :param config: configuración de la ejecución
+    :return: lista de valores del codón
+    """
+    if config.NEIGHBOURHOOD_SAMPLES > 0:
+        return [random.randint(0, config.CODON_SIZE) for _ in range(config.NEIGHBOURHOOD_SAMPLES)]
+    if position >= len(arities):
+        return []
+
+    arity = arities[position]
+    codon = genome[position]
+    base = codon - codon % arity
+    return [base + value if base + value <= config.CODON_SIZE else value
+            for value in range(arity) if value != codon % arity]
@@ -1,9 +1,9 @@
 import random
 import math
-from ga.params import MUTATION_RATE, CODON_SIZE, GENERATIONS, GAMMA, SELF_ADAPTATION, DETERMINISTIC, DETERMINISTIC_BASIC1, DETERMINISTIC_BASIC2
+import numpy as np
 
 
-def random_resetting(individual, generation):
+def random_resetting(individual, generation, config):
     """
     Método de mutación "random resetting".
 
@@ -12,27 +12,29 @@ def random_resetting(individual, generation):
 
     :param individual: individuo al que se le aplica el operador de mutación
     :param generation: número de generación actual para adaptar la probabilidad de mutación
+    :param config: configuración de la ejecución
     :return: nuevo individuo tras haberse aplicado la mutación
     """
-    pm = select_mutation_rate(individual, generation)
+    pm = select_mutation_rate(individual, generation, config)
 
     for i in range(len(individual.genome)):
         if random.random() < pm:
-            individual.genome[i] = random.randint(0, CODON_SIZE)
+            individual.genome[i] = random.randint(0, config.CODON_SIZE)
 
     return individual
 
 
-def evolve_mutation_rate(individual):
+def evolve_mutation_rate(individual, config):
     """
     Probabilidad de mutación autoadaptativa.
 
     Se calcula una nueva probabilidad de mutación para el individuo que posteriormente se utiliza para mutar su genoma.
 
     :param individual: individuo para el que se calcula la nueva probabilidad de mutación
+    :param config: configuración de la ejecución
     :return: nueva probabilidad de mutación
     """
-    new_pm = 1/(1 + ((1 - individual.mutation_rate)/individual.mutation_rate) * math.exp(GAMMA * random.random()))
+    new_pm = 1/(1 + ((1 - individual.mutation_rate)/individual.mutation_rate) * math.exp(config.GAMMA * random.random()))
 
     if new_pm < 1/len(individual.genome):
         new_pm = 1/len(individual.genome)
@@ -40,7 +42,7 @@ def evolve_mutation_rate(individual):
     return new_pm
 
 
-def select_mutation_rate(individual, generation):
+def select_mutation_rate(individual, generation, config):
     """
     Selección de la probabilidad de mutación según el esquema utilizado.
 
@@ -53,23 +55,79 @@ def select_mutation_rate(individual, generation):
 
     :param individual: individuo al que se le aplica la mutación
     :param generation: generación actual
+    :param config: configuración de la ejecución
     :return: probabilidad de mutación a utilizar
     """
-    if SELF_ADAPTATION:
-        individual.mutation_rate = evolve_mutation_rate(individual)
+    if config.SELF_ADAPTATION:
+        individual.mutation_rate = evolve_mutation_rate(individual, config)
         pm = individual.mutation_rate
 
-    elif DETERMINISTIC_BASIC1:
-        pm = generation / GENERATIONS
+    elif config.DETERMINISTIC_BASIC1:
+        pm = generation / config.GENERATIONS
 
-    elif DETERMINISTIC_BASIC2:
-        pm = 1 - (generation / GENERATIONS)
+    elif config.DETERMINISTIC_BASIC2:
+        pm = 1 - (generation / config.GENERATIONS)
 
     # Determinista Back and Schutz: pm = 1/(2 + (l-2)/(T-1)*t)
-    elif DETERMINISTIC:
-        pm = 1 / (2 + (len(individual.genome) - 2) / (GENERATIONS - 1) * generation)
+    elif config.DETERMINISTIC:
+        pm = 1 / (2 + (len(individual.genome) - 2) / (config.GENERATIONS - 1) * generation)
 
     else:
-        pm = MUTATION_RATE
+        pm = config.MUTATION_RATE
+
+    return pm
+
+
+def batch_random_resetting(population, generation, config):
+    """
+    Método de mutación "random resetting" aplicado a la vez a todos los individuos de una población basada en arrays.
+
+    Se sortea una matriz de números aleatorios del tamaño de la matriz de codones y se sustituyen los codones cuyo
+    número es menor que la probabilidad de mutación de su individuo.
+
+    :param population: población basada en arrays a la que se le aplica el operador de mutación
+    :param generation: número de generación actual para adaptar la probabilidad de mutación
+    :param config: configuración de la ejecución
+    :return: población tras haberse aplicado la mutación
+    """
+    pm = select_mutation_rates(population, generation, config)
+
+    genomes = population.genomes
+    mask = np.random.random(genomes.shape) < pm[:, None]
+    mask &= np.arange(genomes.shape[1]) < population.lengths[:, None]
+    genomes[mask] = np.random.randint(0, config.CODON_SIZE + 1, size=int(np.count_nonzero(mask)))
+
+    return population
+
+
+def select_mutation_rates(population, generation, config):
+    """
+    Selección vectorizada de la probabilidad de mutación de cada individuo según el esquema utilizado.
+
+    Equivale a aplicar select_mutation_rate a cada individuo de una población basada en arrays.
+
+    :param population: población basada en arrays a la que se le aplica la mutación
+    :param generation: generación actual
+    :param config: configuración de la ejecución
+    :return: array con la probabilidad de mutación de cada individuo
+    """
+    lengths = population.lengths
+    if config.SELF_ADAPTATION:
+        rates = population.mutation_rate
+        new_pm = 1/(1 + ((1 - rates)/rates) * np.exp(config.GAMMA * np.random.random(len(rates))))
+        population.mutation_rate = np.maximum(new_pm, 1/lengths)
+        pm = population.mutation_rate
+
+    elif config.DETERMINISTIC_BASIC1:
+        pm = np.full(len(lengths), generation / config.GENERATIONS)
+
+    elif config.DETERMINISTIC_BASIC2:
+        pm = np.full(len(lengths), 1 - (generation / config.GENERATIONS))
+
+    elif config.DETERMINISTIC:
+        pm = 1 / (2 + (lengths - 2) / (config.GENERATIONS - 1) * generation)
+
+    else:
+        pm = np.full(len(lengths), config.MUTATION_RATE)
 
     return pm
@@ -0,0 +1,212 @@
+import os
+import math
+import atexit
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+from ga.population import Population
+from ga.fitness_cache import fitness_cache
+
+# Estado de cada proceso trabajador: gramática utilizada y bloques de memoria compartida abiertos
+_worker_grammar = None
+_worker_buffers = {}
+
+
+def _init_worker(grammar):
+    """
+    Inicialización de un proceso trabajador.
+
+    :param grammar: objeto con la gramática BNF utilizada para decodificar los genomas
+    """
+    global _worker_grammar
+    _worker_grammar = grammar
+
+
+def _attach_buffer(name):
+    """
+    Acceso desde un proceso trabajador al bloque de memoria compartida con los genomas.
+
+    Se mantiene abierto el último bloque utilizado para no tener que volver a abrirlo en cada tarea.
+
+    :param name: nombre del bloque de memoria compartida
+    :return: bloque de memoria compartida
+    """
+    if name not in _worker_buffers:
+        for buffer in _worker_buffers.values():
+            buffer.close()
+        _worker_buffers.clear()
+        _worker_buffers[name] = shared_memory.SharedMemory(name=name)
+
+    return _worker_buffers[name]
+
+
+def shared_genomes(buffer, shape):
+    """
+    Vistas de NumPy sobre el bloque de memoria compartida con los genomas.
+
+    El bloque contiene la longitud de cada genoma (int64, para admitir cualquier MAX_GENOME_LENGTH) seguida de la
+    matriz de codones, con una fila por genoma.
+
+    :param buffer: memoria del bloque compartido
+    :param shape: número de genomas y número máximo de codones de cada uno
+    :return: vector de longitudes, matriz de codones
+    """
+    size, length = shape
+    lengths = np.ndarray(size, dtype=np.int64, buffer=buffer)
+    genomes = np.ndarray(shape, dtype=np.uint8, buffer=buffer, offset=lengths.nbytes)
+    return lengths, genomes
+
+
+def _evaluate_chunk(name, shape, start, stop, config):
+    """
+    Decodificación y evaluación de un bloque de genomas en un proceso trabajador.
+
+    :param name: nombre del bloque de memoria compartida
+    :param shape: número de genomas y número máximo de codones de cada uno
+    :param start: primera fila del bloque
+    :param stop: fila siguiente a la última del bloque
+    :param config: configuración de la ejecución con el problema a resolver
+    :return: lista con el fenotipo, fitness y hits de cada genoma (fitness infinito y hits None si es inválido),
+            número de aciertos y de fallos de la caché de fitness del trabajador
+    """
+    lengths, genomes = shared_genomes(_attach_buffer(name).buf, shape)
+    cache_hits, cache_misses = fitness_cache.hits, fitness_cache.misses
+
+    results = []
+    for length, genome in zip(lengths[start:stop].tolist(), genomes[start:stop]):
+        phenotype = _worker_grammar.decode(genome[:length].tobytes())
+        if phenotype is None:
+            results.append((None, math.inf, None))
+        else:
+            results.append((phenotype,) + fitness_cache.evaluate(phenotype, config=config))
+
+    return results, fitness_cache.hits - cache_hits, fitness_cache.misses - cache_misses
+
+
+class ParallelEvaluator(object):
+
+    def __init__(self):
+        """
+        Inicialización del evaluador paralelo de fitness.
+
+        Los genomas se copian en un bloque de memoria compartida en lugar de enviarse serializados a cada proceso, y
+        cada tarea solo recibe el rango de filas que debe evaluar. El conjunto de procesos se crea al realizar la
+        primera evaluación y se reutiliza mientras no cambien la gramática ni el número de procesos.
+
+        El número de procesos (PARALLEL_WORKERS), el tamaño mínimo (PARALLEL_MIN_SIZE) y el tamaño de cada tarea
+        (PARALLEL_CHUNK_SIZE) se leen de la configuración de cada evaluación.
+        """
+        self.workers = None
+        self.pool = None
+        self.grammar = None
+        self.buffer = None
+
+    def accepts(self, size, config):
+        """
+        Comprobación de si un conjunto de individuos debe evaluarse en paralelo.
+
+        :param size: número de individuos a evaluar
+        :param config: configuración de la ejecución
+        :return: True si la evaluación paralela está activada y el conjunto es suficientemente grande
+        """
+        return config.PARALLEL_EVALUATION and size >= config.PARALLEL_MIN_SIZE
+
+    def evaluate(self, population, grammar, config):
+        """
+        Evaluación en paralelo del fitness de cada individuo de la población.
+
+        Los resultados se escriben en los individuos en el mismo orden de la población.
+
+        :param population: lista de individuos o población basada en arrays
+        :param grammar: objeto con la gramática BNF especificada y métodos necesarios para generar el fenotipo de un individuo
+        :param config: configuración de la ejecución con el problema a resolver
+        """
+        self._start(grammar, config.PARALLEL_WORKERS or os.cpu_count())
+        size = len(population)
+        shape = (size, config.MAX_GENOME_LENGTH)
+        self._reserve(size * np.dtype(np.int64).itemsize + size * config.MAX_GENOME_LENGTH)
+        lengths, genomes = shared_genomes(self.buffer.buf, shape)
+        if isinstance(population, Population):
+            lengths[:] = population.lengths
+            genomes[:] = population.genomes
+        else:
+            for i, individual in enumerate(population):
+                lengths[i] = len(individual.genome)
+                genomes[i, :len(individual.genome)] = individual.genome
+
+        chunk_size = config.PARALLEL_CHUNK_SIZE or max(1, math.ceil(size / (self.workers * 4)))
+        futures = [self.pool.submit(_evaluate_chunk, self.buffer.name, shape, start, min(start + chunk_size, size),
+                                    config)
+                   for start in range(0, size, chunk_size)]
+
+        index = 0
+        for future in futures:
+            results, cache_hits, cache_misses = future.result()
+            fitness_cache.hits += cache_hits
+            fitness_cache.misses += cache_misses
+            for phenotype, fitness, hits in results:
+                individual = population[index]
+                individual.phenotype = phenotype
+                individual.fitness = fitness
+                if hits is not None:
+                    individual.hits = hits
+                index += 1
+
+    def _start(self, grammar, workers):
+        """
+        Creación del conjunto de procesos trabajadores, o recreación si ha cambiado la gramática, su configuración de
+        decodificación o el número de procesos.
+
+        :param grammar: objeto con la gramática BNF utilizada
+        :param workers: número de procesos trabajadores
+        """
+        if self.pool is not None and (decoding_key(self.grammar) != decoding_key(grammar) or self.workers != workers):
+            self.pool.shutdown()
+            self.pool = None
+        if self.pool is None:
+            self.grammar = grammar
+            self.workers = workers
+            self.pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(grammar,))
+
+    def _reserve(self, size):
+        """
+        Reserva de un bloque de memoria compartida de al menos size bytes.
+
+        El bloque se reutiliza entre evaluaciones y solo se sustituye por uno mayor cuando es necesario.
+
+        :param size: número de bytes necesarios
+        """
+        if self.buffer is not None and self.buffer.size >= size:
+            return
+        self._release_buffer()
+        self.buffer = shared_memory.SharedMemory(create=True, size=size)
+
+    def _release_buffer(self):
+        if self.buffer is not None:
+            self.buffer.close()
+            self.buffer.unlink()
+            self.buffer = None
+
+    def close(self):
+        """
+        Finalización de los procesos trabajadores y liberación de la memoria compartida.
+
+        """
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+        self._release_buffer()
+
+
+def decoding_key(grammar):
+    """
+    Reglas y parámetros de decodificación de una gramática.
+
+    :param grammar: objeto con la gramática BNF
+    :return: tupla que identifica cómo decodifica la gramática los genomas
+    """
+    return grammar.rules, grammar.config.MAX_WRAPS, grammar.config.REPAIR
+
+
+parallel_evaluator = ParallelEvaluator()
+atexit.register(parallel_evaluator.close)
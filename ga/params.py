@@ -8,15 +8,45 @@ FUNCTION, A, B, SOL = None, None, None, None
 # FUNCTION, A, B, SOL = "X * math.log(1 + 2*X)", 0, 5, "math.log(1+(2*X)) + (2*X)/(1 + (2*X))"
 # FUNCTION, A, B, SOL = "math.exp(2*X)*math.sin(X)", -2, 2, "math.exp(2*X)*(2*math.sin(X)+math.cos(X))"
 
+# Problemas resueltos en cada experimento (FUNCTION, A, B, SOL)
+PROBLEMS = [
+    ("X ** 3 + 8", 0, 5, "3 * (X ** 2)"),
+    ("(X-2)/(X+2)", 0, 5, "4 / ((X + 2) ** 2)"),
+    ("(1/5)*(X ** 2 + 1)*(X - 1)", -2, 2, "(1/5)*(3 * (X ** 2) - (2 * X) + 1)"),
+    ("-math.exp(-2 * (X ** 2) + 2)", 0, 3, "4 * X * math.exp(-2*(X ** 2) + 2)"),
+    ("(math.exp(2*X) + math.exp(-6*X))/2", 0, 2, "math.exp(2*X) - 3*math.exp(-6*X)"),
+    ("X * math.log(1 + 2*X)", 0, 5, "math.log(1+(2*X)) + (2*X)/(1 + (2*X))"),
+    ("math.exp(2*X)*math.sin(X)", -2, 2, "math.exp(2*X)*(2*math.sin(X)+math.cos(X))"),
+]
+
 # Variables de ejecución
 GENERATIONS = 200
 RUNS = 10
+SEED = 0 # Semilla base; cada ejecución de cada problema utiliza una semilla derivada de esta
+EXPERIMENT_WORKERS = 1 # Número de procesos entre los que se reparten las ejecuciones (1 las ejecuta en serie)
+# Terminación anticipada (la curva de progreso se completa hasta GENERATIONS con el último valor)
+STOP_ON_SOLUTION = False # Terminar la búsqueda en la generación en la que se encuentra la primera solución
+STAGNATION_GENERATIONS = 0 # Terminar tras este número de generaciones sin mejorar el mejor fitness (0 lo desactiva)
+MAX_EVALUATIONS = 0 # Terminar al alcanzar este número de evaluaciones reales de fitness (0 lo desactiva)
+MAX_TIME = 0 # Terminar al superar este tiempo de ejecución en segundos (0 lo desactiva)
+CHECKPOINT_INTERVAL = 0 # Generaciones entre checkpoints de la búsqueda (0 los desactiva)
+CHECKPOINT_FILE = "checkpoint.npz" # Fichero del checkpoint; las ejecuciones de un experimento añaden el problema y la ejecución
+RESUME = False # Reanudar las ejecuciones de un experimento desde su checkpoint, si existe (se elimina al terminar)
+TELEMETRY_FILE = None # Fichero .jsonl o .csv con un registro por generación (None lo desactiva); igual que CHECKPOINT_FILE en los experimentos
+TELEMETRY_BUFFER = 50 # Registros de telemetría que se acumulan antes de escribirlos
+PLOTS_DIR = None # Directorio en el que se guardan las gráficas de la evaluación de cada problema (None las desactiva)
 
 # Tamaños
 POPULATION_SIZE = 200
 TOURNAMENT_SIZE = 3
 OFFSPRING_SIZE = 200
 
+# Modelo de islas
+ISLANDS = 4 # Número de subpoblaciones, cada una en su propio proceso
+MIGRATION_INTERVAL = 10 # Generaciones entre migraciones
+MIGRATION_SIZE = 2 # Mejores individuos que emigra cada isla
+MIGRATION_TOPOLOGY = "ring" # Topología de migración: "ring" o "full"
+
 # Tamaño variable de población
 VARIABLE_POPULATION_SIZE = False
 MIN_LIFETIME = 1
@@ -29,6 +59,7 @@ FIX_LENGTH = False
 MAX_GENOME_LENGTH = 20
 MAX_WRAPS = 2
 REPAIR = True
+SENSIBLE_INITIALIZATION = False # Inicializar con genomas que codifican derivaciones válidas de tamaño controlado (PTC2)
 
 # Probabilidades de operadores de variación
 DUPLICATION_RATE = 0.01
@@ -42,6 +73,11 @@ DETERMINISTIC_BASIC1 = False
 DETERMINISTIC_BASIC2 = False
 DETERMINISTIC = False
 
+# Selección de padres
+PARENT_SELECTION = "tournament" # Método de selección de padres: "tournament", "rank" o "truncation"
+SELECTION_PRESSURE = 1.5 # Presión selectiva de la selección por rango lineal (entre 1 y 2)
+TRUNCATION_RATE = 0.5 # Fracción de la población entre la que se escogen los padres en la selección por truncamiento
+
 # Selección de supervivientes
 AGE_BASED_REPLACEMENT = True # Cambiar tamaños de población y descendencia (mismo tamaño)
 FITNESS_BASED_REPLACEMENT = False # Cambiar tamaños de población y descendencia (descendencia < población)
@@ -50,5 +86,24 @@ FITNESS_BASED_REPLACEMENT = False # Cambiar tamaños de población y descendenci
 UNIFORM_CROSSOVER = False
 DUPLICATION = False
 LOCAL_SEARCH = True
+BEST_IMPROVEMENT = False # Búsqueda local por mejor mejora, evaluando todo el vecindario en una sola llamada
+LOCAL_SEARCH_TOP_K = 1 # Mejores descendientes a los que se aplica la búsqueda local por mejor mejora
+NEIGHBOURHOOD_SAMPLES = 0 # Valores aleatorios probados en cada codón (0 prueba todas las producciones de su regla)
+
+# Rendimiento
+ARRAY_POPULATION = False # Almacenar la población en arrays de NumPy (poblaciones grandes)
+VECTORIZED_FITNESS = False # Evaluar cada expresión sobre todos los puntos a la vez con NumPy (puede diferir de eval() en expresiones mal condicionadas)
+BATCHED_INTERPRETER = False # Evaluar cada generación con el intérprete de programas postfijos por lotes
+BATCHED_VARIATION = False # Aplicar los operadores de variación a toda la descendencia a la vez sobre arrays
+RACING = False # Abandonar la evaluación de los individuos que no pueden superar al peor superviviente o al individuo actual de la búsqueda local
+FITNESS_CACHE_SIZE = 10000 # Número máximo de fenotipos en la caché de fitness (0 la desactiva)
+DECODE_CACHE_SIZE = 100000 # Número máximo de nodos en la caché de decodificación (0 la desactiva)
+AES_REAL_EVALUATIONS = False # Calcular el AES con las evaluaciones reales (sin contar los aciertos de la caché)
+PARALLEL_EVALUATION = False # Evaluar el fitness en paralelo con un conjunto de procesos
+PARALLEL_WORKERS = None # Número de procesos (None utiliza todos los núcleos)
+PARALLEL_MIN_SIZE = 500 # Número mínimo de individuos para evaluar en paralelo
+PARALLEL_CHUNK_SIZE = None # Individuos por tarea (None lo ajusta según el tamaño de la población)
+PARALLEL_NEIGHBOURHOOD_SIZE = 200 # Número mínimo de vecinos (codones del mejor individuo) para evaluar en paralelo la búsqueda local por primera mejora
+PROFILING = False # Medir el tiempo de cada fase de la búsqueda y contar wraps, reparaciones e individuos inválidos
 
 
@@ -1,8 +1,26 @@
-import random
-from ga.params import OFFSPRING_SIZE, TOURNAMENT_SIZE
+import math
+import numpy as np
+from ga.population import fitness_array, take
 
 
-def tournament_selection(population):
+def select_parents(population, config):
+    """
+    Selección de padres con el método indicado en PARENT_SELECTION.
+
+    :param population: población actual
+    :param config: configuración de la ejecución
+    :return: conjunto de individuos seleccionados como padres
+    """
+    if config.PARENT_SELECTION == "rank":
+        return linear_rank_selection(population, config)
+    elif config.PARENT_SELECTION == "truncation":
+        return truncation_selection(population, config)
+    elif config.PARENT_SELECTION == "tournament":
+        return tournament_selection(population, config)
+    raise ValueError("Unknown parent selection method:", config.PARENT_SELECTION)
+
+
+def tournament_selection(population, config):
     """
     Selección de padres por torneo.
 
@@ -11,13 +29,101 @@ def tournament_selection(population):
     ellos es seleccionado como padre.
 
     :param population: población actual
+    :param config: configuración de la ejecución
+    :return: conjunto de individuos seleccionados como padres
+    """
+    return take(population, tournament_indices(fitness_array(population), config.OFFSPRING_SIZE, config.TOURNAMENT_SIZE))
+
+
+def linear_rank_selection(population, config):
+    """
+    Selección de padres por rango lineal.
+
+    La probabilidad de selección de cada individuo depende linealmente de su posición al ordenar la población por
+    fitness, con una presión selectiva SELECTION_PRESSURE.
+
+    :param population: población actual
+    :param config: configuración de la ejecución
     :return: conjunto de individuos seleccionados como padres
     """
+    return take(population, linear_rank_indices(fitness_array(population), config.OFFSPRING_SIZE,
+                                                config.SELECTION_PRESSURE))
 
-    mating_pool = []
-    while len(mating_pool) < OFFSPRING_SIZE:
-        candidates = random.sample(population, TOURNAMENT_SIZE)
-        candidates.sort(reverse=True)
-        mating_pool.append(candidates[0])
 
-    return mating_pool
+def truncation_selection(population, config):
+    """
+    Selección de padres por truncamiento.
+
+    Los padres se escogen uniformemente entre la fracción TRUNCATION_RATE de la población con mejor fitness.
+
+    :param population: población actual
+    :param config: configuración de la ejecución
+    :return: conjunto de individuos seleccionados como padres
+    """
+    return take(population, truncation_indices(fitness_array(population), config.OFFSPRING_SIZE, config.TRUNCATION_RATE))
+
+
+def tournament_indices(fitness, size, tournament_size):
+    """
+    Sorteo vectorizado de torneos.
+
+    Se sortean a la vez todos los torneos como una matriz de índices (size x tournament_size) y el ganador de cada fila
+    es el de menor fitness (el primero sorteado en caso de empate). Los candidatos de cada torneo son distintos, como
+    con random.sample: las filas con índices repetidos se vuelven a sortear.
+
+    :param fitness: array con el fitness de cada individuo
+    :param size: número de torneos
+    :param tournament_size: número de candidatos de cada torneo
+    :return: posiciones de los ganadores
+    """
+    n = len(fitness)
+    if tournament_size > n:
+        raise ValueError("Sample larger than population")
+    candidates = np.random.randint(0, n, size=(size, tournament_size))
+    if tournament_size > 1:
+        while True:
+            ordered = np.sort(candidates, axis=1)
+            repeated = np.any(ordered[:, 1:] == ordered[:, :-1], axis=1)
+            if not repeated.any():
+                break
+            candidates[repeated] = np.random.randint(0, n, size=(int(repeated.sum()), tournament_size))
+    return candidates[np.arange(size), np.argmin(fitness[candidates], axis=1)]
+
+
+def linear_rank_indices(fitness, size, pressure):
+    """
+    Muestreo vectorizado por rango lineal.
+
+    :param fitness: array con el fitness de cada individuo
+    :param size: número de individuos seleccionados
+    :param pressure: presión selectiva (entre 1 y 2)
+    :return: posiciones de los individuos seleccionados
+    """
+    n = len(fitness)
+    if n == 1:
+        return np.zeros(size, dtype=np.intp)
+    # Posiciones de peor a mejor fitness: el rango 0 corresponde al peor individuo
+    order = np.argsort(fitness, kind="stable")[::-1]
+    ranks = np.arange(n)
+    probabilities = (2 - pressure) / n + 2 * ranks * (pressure - 1) / (n * (n - 1))
+    cumulative = np.cumsum(probabilities)
+    selected = np.searchsorted(cumulative, np.random.random(size) * cumulative[-1], side="right")
+    return order[np.minimum(selected, n - 1)]
+
+
+def truncation_indices(fitness, size, rate):
+    """
+    Muestreo vectorizado por truncamiento.
+
+    Los mejores individuos se obtienen con una selección parcial (argpartition), sin ordenar la población.
+
+    :param fitness: array con el fitness de cada individuo
+    :param size: número de individuos seleccionados
+    :param rate: fracción de la población entre la que se escogen los individuos
+    :return: posiciones de los individuos seleccionados
+    """
+    n = len(fitness)
+    top = min(n, max(1, math.ceil(rate * n)))
+    best = np.argpartition(fitness, top - 1)[:top] if top < n else np.arange(n)
+    return best[np.random.randint(0, top, size=size)]
+
@@ -0,0 +1,396 @@
+from collections.abc import Sequence
+import numpy as np
+from ga.config import default_config
+from ga.individual import Individual
+
+
+class IndividualView(object):
+
+    __slots__ = ("population", "index")
+
+    def __init__(self, population, index):
+        """
+        Vista de un individuo almacenado en una población basada en arrays.
+
+        Los atributos se leen y escriben directamente sobre los arrays de la población, de forma que la vista puede
+        utilizarse en lugar de un objeto Individual. El genoma se devuelve como una lista independiente; para
+        modificarlo debe asignarse de nuevo.
+
+        :param population: población que contiene al individuo
+        :param index: posición del individuo en la población
+        """
+        self.population = population
+        self.index = index
+
+    @property
+    def genome(self):
+        return self.population.genome(self.index)
+
+    @genome.setter
+    def genome(self, genome):
+        self.population.set_genome(self.index, genome)
+
+    @property
+    def fitness(self):
+        return self.population.fitness[self.index]
+
+    @fitness.setter
+    def fitness(self, fitness):
+        self.population.fitness[self.index] = fitness
+
+    @property
+    def hits(self):
+        return self.population.hits[self.index]
+
+    @hits.setter
+    def hits(self, hits):
+        self.population.hits[self.index] = hits
+
+    @property
+    def mutation_rate(self):
+        return self.population.mutation_rate[self.index]
+
+    @mutation_rate.setter
+    def mutation_rate(self, mutation_rate):
+        self.population.mutation_rate[self.index] = mutation_rate
+
+    @property
+    def lifetime(self):
+        return self.population.lifetime[self.index]
+
+    @lifetime.setter
+    def lifetime(self, lifetime):
+        self.population.lifetime[self.index] = lifetime
+
+    @property
+    def phenotype(self):
+        return self.population.phenotypes[self.index]
+
+    @phenotype.setter
+    def phenotype(self, phenotype):
+        self.population.phenotypes[self.index] = phenotype
+
+    def __lt__(self, other):
+        return self.fitness > other.fitness
+
+    def __str__(self):
+        return "Individual: " + str(self.genome) + "; " + str(self.phenotype) + "; " + str(self.fitness) + "; " \
+               + str(self.hits) + "; " + str(self.mutation_rate) + "; " + str(self.lifetime)
+
+
+class Population(Sequence):
+
+    def __init__(self, genomes, lengths, fitness=None, hits=None, mutation_rate=None, lifetime=None, phenotypes=None,
+                 config=None):
+        """
+        Inicialización de una población basada en arrays.
+
+        Los genomas se almacenan en una matriz de codones uint8 rellena con ceros hasta MAX_GENOME_LENGTH, junto a un
+        vector con la longitud de cada genoma. El resto de atributos de los individuos se almacenan en arrays paralelos,
+        de forma que la selección, la ordenación y el reemplazo se realizan mediante índices en lugar de comparaciones
+        entre objetos.
+
+        :param genomes: matriz (individuos x MAX_GENOME_LENGTH) con los codones de cada individuo
+        :param lengths: longitud del genoma de cada individuo
+        :param fitness: valor de fitness de cada individuo
+        :param hits: número de hits de cada individuo
+        :param mutation_rate: probabilidad de mutación de cada individuo
+        :param lifetime: tiempo de vida de cada individuo
+        :param phenotypes: fenotipo de cada individuo
+        :param config: configuración de la ejecución, utilizada para calcular la probabilidad de mutación inicial si
+                       no se indica
+        """
+        size = len(lengths)
+        self.genomes = genomes
+        self.lengths = lengths
+        self.fitness = np.zeros(size) if fitness is None else fitness
+        self.hits = np.zeros(size, dtype=np.int64) if hits is None else hits
+        if mutation_rate is None:
+            config = config or default_config()
+            if config.SELF_ADAPTATION:
+                mutation_rate = 1 / lengths
+            else:
+                mutation_rate = np.full(size, config.MUTATION_RATE, dtype=np.float64)
+        self.mutation_rate = mutation_rate
+        self.lifetime = np.zeros(size) if lifetime is None else lifetime
+        self.phenotypes = np.full(size, None, dtype=object) if phenotypes is None else phenotypes
+
+    @classmethod
+    def random(cls, size, config=None):
+        """
+        Creación de una población de individuos aleatorios.
+
+        Cada genoma tiene una longitud aleatoria entre 1 y MAX_GENOME_LENGTH, salvo que FIX_LENGTH esté activado.
+
+        :param size: número de individuos
+        :param config: configuración de la ejecución
+        :return: población creada
+        """
+        config = config or default_config()
+        max_length = config.MAX_GENOME_LENGTH
+        if config.FIX_LENGTH:
+            lengths = np.full(size, max_length, dtype=np.int64)
+        else:
+            lengths = np.random.randint(1, max_length + 1, size=size).astype(np.int64)
+        genomes = np.random.randint(0, config.CODON_SIZE + 1, size=(size, max_length)).astype(np.uint8)
+        # Los codones posteriores a la longitud de cada genoma se mantienen a cero
+        genomes[np.arange(max_length) >= lengths[:, None]] = 0
+
+        return cls(genomes, lengths, config=config)
+
+    @classmethod
+    def from_individuals(cls, individuals, config=None):
+        """
+        Creación de una población a partir de una lista de objetos Individual.
+
+        :param individuals: individuos que forman la población
+        :param config: configuración de la ejecución
+        :return: población creada
+        """
+        config = config or default_config()
+        size = len(individuals)
+        genomes = np.zeros((size, config.MAX_GENOME_LENGTH), dtype=np.uint8)
+        lengths = np.zeros(size, dtype=np.int64)
+        for i, individual in enumerate(individuals):
+            lengths[i] = len(individual.genome)
+            genomes[i, :lengths[i]] = individual.genome
+
+        fitness = np.array([individual.fitness for individual in individuals], dtype=np.float64)
+        hits = np.array([individual.hits for individual in individuals], dtype=np.int64)
+        mutation_rate = np.array([individual.mutation_rate for individual in individuals], dtype=np.float64)
+        lifetime = np.array([individual.lifetime for individual in individuals], dtype=np.float64)
+        phenotypes = np.empty(size, dtype=object)
+        phenotypes[:] = [individual.phenotype for individual in individuals]
+
+        return cls(genomes, lengths, fitness, hits, mutation_rate, lifetime, phenotypes)
+
+    def genome(self, index):
+        """
+        Genoma de un individuo como lista de codones.
+
+        :param index: posición del individuo
+        :return: lista con los codones del individuo
+        """
+        return self.genomes[index, :self.lengths[index]].tolist()
+
+    def set_genome(self, index, genome):
+        """
+        Sustitución del genoma de un individuo.
+
+        :param index: posición del individuo
+        :param genome: nueva secuencia de codones
+        """
+        self.genomes[index] = 0
+        self.genomes[index, :len(genome)] = genome
+        self.lengths[index] = len(genome)
+
+    def individual(self, index):
+        """
+        Copia independiente de un individuo de la población.
+
+        :param index: posición del individuo
+        :return: objeto Individual con los atributos del individuo
+        """
+        individual = Individual.__new__(Individual)
+        individual.genome = bytearray(self.genome(index))
+        individual.fitness = self.fitness[index]
+        individual.hits = self.hits[index]
+        individual.mutation_rate = self.mutation_rate[index]
+        individual.lifetime = self.lifetime[index]
+        individual.phenotype = self.phenotypes[index]
+
+        return individual
+
+    def to_individuals(self):
+        """
+        Conversión de la población en una lista de objetos Individual.
+
+        :return: lista de individuos
+        """
+        return [self.individual(i) for i in range(len(self))]
+
+    def take(self, indices):
+        """
+        Creación de una nueva población con los individuos de las posiciones indicadas.
+
+        :param indices: posiciones (o máscara booleana) de los individuos seleccionados
+        :return: nueva población
+        """
+        return Population(self.genomes[indices], self.lengths[indices], self.fitness[indices], self.hits[indices],
+                          self.mutation_rate[indices], self.lifetime[indices], self.phenotypes[indices])
+
+    def copy_from(self, index, individual):
+        """
+        Copia de los atributos de un individuo en una posición de la población.
+
+        :param index: posición de la población que se sobrescribe
+        :param individual: objeto Individual o vista cuyos atributos se copian
+        """
+        self.set_genome(index, individual.genome)
+        self.fitness[index] = individual.fitness
+        self.hits[index] = individual.hits
+        self.mutation_rate[index] = individual.mutation_rate
+        self.lifetime[index] = individual.lifetime
+        self.phenotypes[index] = individual.phenotype
+
+    def order(self):
+        """
+        Orden de los individuos de mejor a peor fitness.
+
+        Se utiliza una ordenación estable, de forma que los individuos con el mismo fitness mantienen su posición
+        relativa, igual que al ordenar una lista de individuos.
+
+        :return: posiciones de los individuos ordenadas de mejor a peor fitness
+        """
+        return np.argsort(self.fitness, kind="stable")
+
+    def sort(self, reverse=False):
+        """
+        Ordenación de la población en el mismo sentido que una lista de objetos Individual.
+
+        :param reverse: si es True, los individuos se ordenan de mejor a peor fitness
+        """
+        order = self.order()
+        if not reverse:
+            order = order[::-1]
+        for name in ("genomes", "lengths", "fitness", "hits", "mutation_rate", "lifetime", "phenotypes"):
+            setattr(self, name, getattr(self, name)[order])
+
+    def best_index(self):
+        """
+        Posición del individuo con mejor fitness.
+
+        :return: posición del mejor individuo
+        """
+        return int(np.argmin(self.fitness))
+
+    def extend(self, other):
+        """
+        Adición de los individuos de otra población al final de la actual.
+
+        :param other: población cuyos individuos se añaden
+        """
+        for name in ("genomes", "lengths", "fitness", "hits", "mutation_rate", "lifetime", "phenotypes"):
+            setattr(self, name, np.concatenate((getattr(self, name), getattr(other, name))))
+
+    def _position(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("population index out of range")
+        return index
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.take(index)
+        return IndividualView(self, self._position(index))
+
+    def __setitem__(self, index, individual):
+        self.copy_from(self._position(index), individual)
+
+
+def best(population):
+    """
+    Mejor individuo de una población, ya sea una lista de objetos Individual o una población basada en arrays.
+
+    En el caso de una población basada en arrays se devuelve una copia independiente del individuo.
+
+    :param population: población actual
+    :return: individuo con mejor fitness
+    """
+    if isinstance(population, Population):
+        return population.individual(population.best_index())
+    return max(population)
+
+
+def best_position(population):
+    """
+    Posición del individuo con mejor fitness (el primero en caso de empate).
+
+    :param population: lista de individuos o población basada en arrays
+    :return: posición del mejor individuo
+    """
+    return int(np.argmin(fitness_array(population)))
+
+
+def best_positions(population, count, ordered=False):
+    """
+    Posiciones de los count individuos con mejor fitness.
+
+    Se obtienen con una selección parcial (argpartition), sin ordenar la población completa.
+
+    :param population: lista de individuos o población basada en arrays
+    :param count: número de individuos
+    :param ordered: si es True, las posiciones se devuelven de mejor a peor fitness; en otro caso, en el orden en que
+                    aparecen los individuos en la población
+    :return: array con las posiciones
+    """
+    return partial_order(fitness_array(population), count, ordered)
+
+
+def worst_positions(population, count, ordered=False):
+    """
+    Posiciones de los count individuos con peor fitness.
+
+    :param population: lista de individuos o población basada en arrays
+    :param count: número de individuos
+    :param ordered: si es True, las posiciones se devuelven de peor a mejor fitness
+    :return: array con las posiciones
+    """
+    return partial_order(-fitness_array(population), count, ordered)
+
+
+def partial_order(keys, count, ordered):
+    """
+    Posiciones de los count menores valores de un array mediante selección parcial.
+
+    Los empates se resuelven a favor de la posición más baja, igual que con una ordenación estable.
+
+    :param keys: array de valores
+    :param count: número de posiciones
+    :param ordered: si es True, las posiciones se ordenan por valor
+    :return: array con las posiciones
+    """
+    n = len(keys)
+    count = max(0, min(count, n))
+    if count == n:
+        positions = np.arange(n)
+    elif count == 0:
+        return np.empty(0, dtype=np.intp)
+    else:
+        # Se incluyen todos los empatados con el valor límite para resolver los empates por posición
+        threshold = keys[np.argpartition(keys, count - 1)[count - 1]]
+        positions = np.flatnonzero(keys < threshold)
+        positions = np.concatenate((positions, np.flatnonzero(keys == threshold)[:count - len(positions)]))
+        positions.sort()
+    if ordered:
+        positions = positions[np.argsort(keys[positions], kind="stable")]
+    return positions
+
+
+def fitness_array(population):
+    """
+    Fitness de los individuos de una población como array de NumPy.
+
+    :param population: lista de individuos o población basada en arrays
+    :return: array con el fitness de cada individuo
+    """
+    if isinstance(population, Population):
+        return population.fitness
+    return np.fromiter((individual.fitness for individual in population), dtype=np.float64, count=len(population))
+
+
+def take(population, indices):
+    """
+    Individuos de las posiciones indicadas.
+
+    :param population: lista de individuos o población basada en arrays
+    :param indices: posiciones de los individuos
+    :return: individuos seleccionados, con la misma representación que la población
+    """
+    if isinstance(population, Population):
+        return population.take(indices)
+    return [population[i] for i in indices.tolist()]
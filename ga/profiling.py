@@ -0,0 +1,125 @@
+import time
+
+
+class Profiler(object):
+
+    def __init__(self, enabled=False):
+        """
+        Instrumentación de las fases de la búsqueda.
+
+        Acumula el tiempo de cada fase de cada generación (en nanosegundos, con perf_counter_ns) y contadores como el
+        número de individuos inválidos o de wraps realizados durante la decodificación. Al terminar cada generación, los
+        totales de la generación se suman a los de la ejecución y se entregan a las funciones registradas con
+        subscribe.
+
+        Las fases se miden encadenando marcas de tiempo:
+
+            mark = profiler.clock()
+            ...
+            mark = profiler.lap("selection", mark)
+
+        Cuando está desactivado, clock y lap devuelven 0 sin leer el reloj, de forma que el coste es una llamada y una
+        comprobación por fase.
+
+        :param enabled: activar la instrumentación
+        """
+        self.enabled = enabled
+        self.generation = {}
+        self.run = {}
+        self.callbacks = []
+
+    def clock(self):
+        """
+        Marca de tiempo inicial de una fase.
+
+        :return: instante actual en nanosegundos o 0 si la instrumentación está desactivada
+        """
+        if self.enabled:
+            return time.perf_counter_ns()
+        return 0
+
+    def lap(self, phase, mark):
+        """
+        Acumulación del tiempo transcurrido desde una marca en una fase.
+
+        :param phase: nombre de la fase
+        :param mark: marca de tiempo devuelta por clock o lap
+        :return: nueva marca de tiempo, para medir la fase siguiente
+        """
+        if self.enabled:
+            now = time.perf_counter_ns()
+            self.generation[phase + "_ns"] = self.generation.get(phase + "_ns", 0) + now - mark
+            return now
+        return 0
+
+    def count(self, counter, value=1):
+        """
+        Incremento de un contador de la generación actual.
+
+        :param counter: nombre del contador
+        :param value: incremento
+        """
+        if self.enabled:
+            self.generation[counter] = self.generation.get(counter, 0) + value
+
+    def subscribe(self, callback):
+        """
+        Registro de una función que recibe los totales de cada generación.
+
+        :param callback: función callback(generation, totals), donde totals es un diccionario con el tiempo de cada fase
+                         (claves terminadas en "_ns") y los contadores de la generación
+        """
+        self.callbacks.append(callback)
+
+    def unsubscribe(self, callback):
+        """
+        Eliminación de una función registrada con subscribe.
+
+        :param callback: función registrada
+        """
+        self.callbacks.remove(callback)
+
+    def start_run(self, enabled):
+        """
+        Comienzo de una ejecución: se activa o desactiva la instrumentación y se reinician los totales.
+
+        :param enabled: activar la instrumentación
+        """
+        self.enabled = enabled
+        self.generation = {}
+        self.run = {}
+
+    def end_generation(self, generation):
+        """
+        Cierre de una generación: sus totales se suman a los de la ejecución y se entregan a las funciones registradas.
+
+        :param generation: número de la generación
+        """
+        if not self.enabled:
+            return
+        totals, self.generation = self.generation, {}
+        for name, value in totals.items():
+            self.run[name] = self.run.get(name, 0) + value
+        for callback in self.callbacks:
+            callback(generation, totals)
+
+    def totals(self):
+        """
+        Totales de la ejecución actual o de la última ejecución.
+
+        :return: diccionario con el tiempo de cada fase en nanosegundos y los contadores
+        """
+        return dict(self.run)
+
+    def __str__(self):
+        phases = sorted((name for name in self.run if name.endswith("_ns")), key=self.run.get, reverse=True)
+        total = sum(self.run[name] for name in phases) or 1
+        lines = ["{:<24}{:>12.3f} ms{:>8.1f} %".format(name[:-3], self.run[name] / 1e6, 100 * self.run[name] / total)
+                 for name in phases]
+        lines.extend("{:<24}{:>12}".format(name, self.run[name]) for name in sorted(self.run)
+                     if not name.endswith("_ns"))
+        return "\n".join(lines)
+
+
+# Instrumentación compartida por la búsqueda del proceso
+profiler = Profiler()
@@ -1,9 +1,10 @@
 import random
+import numpy as np
 from ga.individual import Individual
-from ga.params import CROSSOVER_RATE, MAX_GENOME_LENGTH, GENERATIONS, DETERMINISTIC_BASIC1, DETERMINISTIC_BASIC2
+from ga.population import Population
 
 
-def select_crossover_rate(generation):
+def select_crossover_rate(generation, config):
     """
     Selección de la probabilidad de cruce según el esquema utilizado.
 
@@ -12,19 +13,20 @@ def select_crossover_rate(generation):
     Modelo estático: se utiliza siempre la probabilidad de cruce predefinida.
 
     :param generation: generación actual
+    :param config: configuración de la ejecución
     :return: probabilidad de cruce a utilizar
     """
-    if DETERMINISTIC_BASIC1:
-        pc = 1 - (generation/GENERATIONS)
-    elif DETERMINISTIC_BASIC2:
-        pc = generation/GENERATIONS
+    if config.DETERMINISTIC_BASIC1:
+        pc = 1 - (generation/config.GENERATIONS)
+    elif config.DETERMINISTIC_BASIC2:
+        pc = generation/config.GENERATIONS
     else:
-        pc = CROSSOVER_RATE
+        pc = config.CROSSOVER_RATE
 
     return pc
 
 
-def one_point_crossover(parent1, parent2, generation):
+def one_point_crossover(parent1, parent2, generation, config):
     """
     Recombinación realizada utilizando el método "One-point crossover".
 
@@ -34,10 +36,11 @@ def one_point_crossover(parent1, parent2, generation):
     :param parent1: individuo que actúa como primer padre
     :param parent2: individuo que actúa como segundo padre
     :param generation: generación actual
+    :param config: configuración de la ejecución
     :return: dos nuevos individuos (hijos)
     """
 
-    pc = select_crossover_rate(generation)
+    pc = select_crossover_rate(generation, config)
 
     parent1_genome = parent1.genome
     parent2_genome = parent2.genome
@@ -50,7 +53,7 @@ def one_point_crossover(parent1, parent2, generation):
             child1_genome = parent1_genome[:r1] + parent2_genome[r2:]
             child2_genome = parent2_genome[:r2] + parent1_genome[r1:]
             # Si alguno de los hijos excede la longitud máxima permitida, se vuelve a realizar el cruce
-            if len(child1_genome) <= MAX_GENOME_LENGTH and len(child2_genome) <= MAX_GENOME_LENGTH:
+            if len(child1_genome) <= config.MAX_GENOME_LENGTH and len(child2_genome) <= config.MAX_GENOME_LENGTH:
                 break
     # En caso de que el número aleatorio sea mayor que la probabilidad de cruce, los hijos se generan como copias de los
     # padres
@@ -58,10 +61,11 @@ def one_point_crossover(parent1, parent2, generation):
         child1_genome = parent1_genome[:]
         child2_genome = parent2_genome[:]
 
-    return [Individual(child1_genome, len(child1_genome)), Individual(child2_genome, len(child2_genome))]
+    return [Individual(child1_genome, len(child1_genome), config),
+            Individual(child2_genome, len(child2_genome), config)]
 
 
-def uniform_crossover(parent1, parent2, generation):
+def uniform_crossover(parent1, parent2, generation, config):
     """
     Recombinación realizada utilizando el método de cruce "uniforme".
 
@@ -75,9 +79,10 @@ def uniform_crossover(parent1, parent2, generation):
     :param parent1: individuo que actúa como primer padre
     :param parent2: individuo que actúa como segundo padre
     :param generation: generación actual
+    :param config: configuración de la ejecución
     :return: dos nuevos individuos (hijos)
     """
-    pc = select_crossover_rate(generation)
+    pc = select_crossover_rate(generation, config)
 
     child1_genome = []
     child2_genome = []
@@ -104,4 +109,135 @@ def uniform_crossover(parent1, parent2, generation):
         child1_genome = parent1.genome[:]
         child2_genome = parent2.genome[:]
 
-    return [Individual(child1_genome, len(child1_genome)), Individual(child2_genome, len(child2_genome))]
+    return [Individual(child1_genome, len(child1_genome), config),
+            Individual(child2_genome, len(child2_genome), config)]
+
+
+def sample_pairs(size, pairs):
+    """
+    Sorteo de las parejas de padres, cada una formada por dos posiciones distintas de la población.
+
+    :param size: número de individuos de la población
+    :param pairs: número de parejas
+    :return: posiciones del primer y del segundo padre de cada pareja
+    """
+    first = np.random.randint(0, size, size=pairs)
+    second = (first + np.random.randint(1, size, size=pairs)) % size
+
+    return first, second
+
+
+def batch_one_point_crossover(mating_pool, pairs, generation, config):
+    """
+    Recombinación "One-point crossover" aplicada a la vez a un conjunto de parejas de padres.
+
+    En lugar de repetir el cruce hasta que ambos hijos respeten MAX_GENOME_LENGTH, los puntos de corte se sortean
+    directamente entre los válidos, con la misma distribución (uniforme sobre los pares de puntos válidos). Para cada
+    primer punto r1 los segundos puntos válidos forman un intervalo, por lo que se sortea r1 según el tamaño de su
+    intervalo y después r2 dentro de él.
+
+    :param mating_pool: población basada en arrays con los padres seleccionados
+    :param pairs: número de parejas de padres
+    :param generation: generación actual
+    :param config: configuración de la ejecución
+    :return: población con los dos hijos de cada pareja
+    """
+    max_length = config.MAX_GENOME_LENGTH
+    first, second = sample_pairs(len(mating_pool), pairs)
+    genomes1, genomes2 = mating_pool.genomes[first], mating_pool.genomes[second]
+    lengths1, lengths2 = mating_pool.lengths[first], mating_pool.lengths[second]
+
+    # Intervalo de segundos puntos válidos para cada primer punto: r1 + (l2 - r2) <= MAX y r2 + (l1 - r1) <= MAX
+    r1 = np.arange(1, max_length + 1)
+    low = np.maximum(1, r1 - (max_length - lengths2[:, None]))
+    high = np.minimum(lengths2[:, None], r1 + (max_length - lengths1[:, None]))
+    counts = np.where(r1 <= lengths1[:, None], np.maximum(high - low + 1, 0), 0)
+    cumulative = np.cumsum(counts, axis=1)
+    draw = (np.random.random(pairs) * cumulative[:, -1])[:, None]
+    cut1 = np.minimum((cumulative <= draw).sum(axis=1), lengths1 - 1)
+    rows = np.arange(pairs)
+    cut2 = low[rows, cut1] + (np.random.random(pairs) * counts[rows, cut1]).astype(np.int64)
+    cut1 = cut1 + 1
+
+    # En caso de que el número aleatorio sea mayor que la probabilidad de cruce, los hijos son copias de los padres
+    cross = np.random.random(pairs) < select_crossover_rate(generation, config)
+    cut1 = np.where(cross, cut1, lengths1)
+    cut2 = np.where(cross, cut2, lengths2)
+
+    # Cada hijo toma los codones de su primer padre hasta el corte y los del otro padre a partir de su corte
+    positions = np.arange(max_length)
+    child1 = np.where(positions < cut1[:, None], genomes1,
+                      np.take_along_axis(genomes2, np.clip(positions - cut1[:, None] + cut2[:, None], 0, max_length - 1), axis=1))
+    child2 = np.where(positions < cut2[:, None], genomes2,
+                      np.take_along_axis(genomes1, np.clip(positions - cut2[:, None] + cut1[:, None], 0, max_length - 1), axis=1))
+    child_lengths1 = cut1 + lengths2 - cut2
+    child_lengths2 = cut2 + lengths1 - cut1
+
+    return children(child1, child2, child_lengths1, child_lengths2, config)
+
+
+def batch_uniform_crossover(mating_pool, pairs, generation, config):
+    """
+    Recombinación "uniforme" aplicada a la vez a un conjunto de parejas de padres.
+
+    Igual que en uniform_crossover, los codones que corresponden a un padre cuyo genoma se ha agotado se saltan, por lo
+    que los codones elegidos de cada hijo se compactan al principio de su fila.
+
+    :param mating_pool: población basada en arrays con los padres seleccionados
+    :param pairs: número de parejas de padres
+    :param generation: generación actual
+    :param config: configuración de la ejecución
+    :return: población con los dos hijos de cada pareja
+    """
+    max_length = config.MAX_GENOME_LENGTH
+    first, second = sample_pairs(len(mating_pool), pairs)
+    genomes1, genomes2 = mating_pool.genomes[first], mating_pool.genomes[second]
+    positions = np.arange(max_length)
+    valid1 = positions < mating_pool.lengths[first][:, None]
+    valid2 = positions < mating_pool.lengths[second][:, None]
+
+    # Con probabilidad 1 - pc se toma siempre el codón del propio padre, lo que genera copias de los padres
+    swap = np.random.random((pairs, max_length)) >= 0.5
+    swap &= (np.random.random(pairs) < select_crossover_rate(generation, config))[:, None]
+
+    child1, child_lengths1 = compact(np.where(swap, genomes2, genomes1), np.where(swap, valid2, valid1))
+    child2, child_lengths2 = compact(np.where(swap, genomes1, genomes2), np.where(swap, valid1, valid2))
+
+    return children(child1, child2, child_lengths1, child_lengths2, config)
+
+
+def compact(genomes, valid):
+    """
+    Desplazamiento de los codones válidos de cada fila al principio de la fila, manteniendo su orden.
+
+    :param genomes: matriz de codones
+    :param valid: máscara con los codones válidos
+    :return: matriz de codones compactada (rellena con ceros),
+            número de codones válidos de cada fila
+    """
+    order = np.argsort(~valid, axis=1, kind="stable")
+    lengths = valid.sum(axis=1)
+    genomes = np.take_along_axis(genomes, order, axis=1)
+    genomes[np.arange(genomes.shape[1]) >= lengths[:, None]] = 0
+
+    return genomes, lengths.astype(np.int64)
+
+
+def children(child1, child2, lengths1, lengths2, config):
+    """
+    Población con los hijos de cada pareja, colocados de forma consecutiva como en la recombinación individual.
+
+    :param child1: matriz de codones de los primeros hijos
+    :param child2: matriz de codones de los segundos hijos
+    :param lengths1: longitudes de los primeros hijos
+    :param lengths2: longitudes de los segundos hijos
+    :param config: configuración de la ejecución
+    :return: población de hijos
+    """
+    max_length = child1.shape[1]
+    genomes = np.stack((child1, child2), axis=1).reshape(-1, max_length)
+    lengths = np.stack((lengths1, lengths2), axis=1).reshape(-1)
+    # Los codones posteriores a la longitud de cada genoma se mantienen a cero
+    genomes[np.arange(max_length) >= lengths[:, None]] = 0
+
+    return Population(genomes, lengths.astype(np.int64), config=config)
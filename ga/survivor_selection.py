@@ -1,7 +1,7 @@
-from ga.params import POPULATION_SIZE
+from ga.population import Population, best, best_positions, worst_positions, take
 
 
-def age_based_replacement(offspring, population):
+def age_based_replacement(offspring, population, config):
     """
     Selección de supervivientes generacional con elitismo.
 
@@ -11,33 +11,40 @@ def age_based_replacement(offspring, population):
 
     :param offspring: individuos que forman la descendencia
     :param population: población actual
+    :param config: configuración de la ejecución
     :return: nueva población
     """
-    offspring.sort(reverse=True)
-    offspring[-1] = max(max(population), offspring[0])
+    elite = max(best(population), best(offspring))
+    offspring[int(worst_positions(offspring, 1)[0])] = elite
 
     return offspring
 
 
-def fitness_based_replacement(offspring, population):
+def fitness_based_replacement(offspring, population, config):
     """
     Selección de supervivientes basada en su valor de adaptación.
 
     Se genera un menor número de descendientes que el tamaño de la población y estos sustituyen a los individuos con
     peor fitness de la población.
+    Con tamaño de población variable la población puede ser menor que la descendencia; en ese caso, igual que al cortar
+    la población ordenada con population[:len(population)-len(offspring)], se conservan los mejores individuos salvo
+    los len(offspring)-len(population) peores.
 
     :param offspring: individuos que forman la descendencia
     :param population: población actual
+    :param config: configuración de la ejecución
     :return: nueva población
     """
-    population.sort(reverse=True)
-    population = population[:len(population)-len(offspring)]
+    keep = len(population) - len(offspring)
+    if keep < 0:
+        keep += len(population)
+    population = take(population, best_positions(population, keep))
     population.extend(offspring)
 
     return population
 
 
-def mu_lambda_selection(offspring, population):
+def mu_lambda_selection(offspring, population, config):
     """
     Esquema de selección de supervivientes (mu, lambda).
 
@@ -45,12 +52,10 @@ def mu_lambda_selection(offspring, population):
 
     :param offspring: individuos que forman la descendencia.
     :param population: población actual
+    :param config: configuración de la ejecución
     :return: nueva población
     """
-    offspring.sort(reverse=True)
-    offspring = offspring[:POPULATION_SIZE]
-
-    return offspring
+    return take(offspring, best_positions(offspring, config.POPULATION_SIZE))
 
 
 def check_lifetime(population):
@@ -63,9 +68,7 @@ def check_lifetime(population):
     :param population: población actual
     :return: nueva población
     """
-    for index, individual in enumerate(population):
-        if individual.lifetime <= 0.:
-            population.pop(index)
-    population.sort(reverse=True)
+    if isinstance(population, Population):
+        return population.take(population.lifetime > 0.)
 
-    return population
+    return [individual for individual in population if individual.lifetime > 0.]
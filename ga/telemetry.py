@@ -0,0 +1,171 @@
+import csv
+import json
+import math
+import numpy as np
+from ga.population import fitness_array
+
+# Columnas de los ficheros CSV: las de los registros de cada generación seguidas de las del resumen de cada ejecución
+FIELDS = ["type", "config", "problem", "run", "seed", "generation", "best", "mean", "worst", "hits", "invalid",
+          "evaluations", "local_evaluations", "cache_hits", "time", "elapsed",
+          "function", "a", "b", "sol", "fitness", "phenotype", "gens_to_sol", "real_evaluations", "population_size",
+          "offspring_size", "self_adaptation", "aes_real_evaluations"]
+# Columnas de texto, que no se convierten a números al leer los ficheros CSV
+TEXT_FIELDS = {"type", "config", "function", "sol", "phenotype"}
+
+
+class TelemetrySink(object):
+
+    def __init__(self, path, buffer_size=50, **fields):
+        """
+        Registro en streaming de la evolución de una ejecución.
+
+        Cada registro se añade al final de un fichero JSONL (una línea JSON por registro) o CSV, según la extensión del
+        fichero. Los registros se acumulan en memoria y se escriben en bloques de buffer_size, de forma que el bucle de
+        generaciones no escribe en disco en cada generación.
+
+        :param path: nombre del fichero (.jsonl o .csv)
+        :param buffer_size: número de registros que se acumulan antes de escribirlos
+        :param fields: campos constantes que se añaden a todos los registros (por ejemplo, problema y ejecución)
+        """
+        self.path = path
+        self.csv = path.endswith(".csv")
+        self.buffer_size = buffer_size
+        self.fields = fields
+        self.buffer = []
+
+    def write(self, record):
+        """
+        Incorporación de un registro.
+
+        :param record: diccionario con los valores del registro
+        """
+        self.buffer.append(dict(self.fields, **record))
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Escritura de los registros acumulados al final del fichero.
+
+        """
+        if not self.buffer:
+            return
+        with open(self.path, "a", newline="") as file:
+            if self.csv:
+                writer = csv.DictWriter(file, FIELDS, extrasaction="ignore")
+                if file.tell() == 0:
+                    writer.writeheader()
+                writer.writerows(self.buffer)
+            else:
+                file.writelines(json.dumps(record) + "\n" for record in self.buffer)
+        self.buffer = []
+
+    def close(self):
+        """
+        Escritura de los registros pendientes.
+
+        """
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def finite(value):
+    """
+    Conversión de un valor a float, sustituyendo los valores infinitos o NaN por None (no representables en JSON).
+
+    :param value: valor numérico
+    :return: valor como float o None
+    """
+    value = float(value)
+    return value if math.isfinite(value) else None
+
+
+def generation_record(generation, population, best_individual, evaluations, local_evaluations, cache_hits, time,
+                      elapsed):
+    """
+    Registro de una generación.
+
+    La media y el peor fitness se calculan sobre los individuos válidos; el número de individuos inválidos se registra
+    aparte.
+
+    :param generation: número de la generación
+    :param population: población al terminar la generación
+    :param best_individual: mejor individuo de la población
+    :param evaluations: evaluaciones reales de fitness realizadas desde el comienzo de la búsqueda
+    :param local_evaluations: evaluaciones realizadas durante la búsqueda local en la generación
+    :param cache_hits: evaluaciones resueltas con la caché desde el comienzo de la búsqueda
+    :param time: duración de la generación en segundos
+    :param elapsed: tiempo transcurrido desde el comienzo de la búsqueda en segundos
+    :return: diccionario con los valores del registro
+    """
+    fitness = fitness_array(population)
+    valid = fitness[np.isfinite(fitness)]
+    return {"type": "generation", "generation": generation, "best": finite(best_individual.fitness),
+            "mean": finite(np.mean(valid)) if len(valid) else None,
+            "worst": finite(np.max(valid)) if len(valid) else None, "hits": int(best_individual.hits),
+            "invalid": int(len(fitness) - len(valid)), "evaluations": int(evaluations),
+            "local_evaluations": int(local_evaluations), "cache_hits": int(cache_hits), "time": time,
+            "elapsed": elapsed}
+
+
+def run_record(config, solution, gens_to_sol, local_evaluations, real_evaluations, time):
+    """
+    Registro con el resumen de una ejecución.
+
+    Contiene el problema y los parámetros necesarios para calcular SR, MBF y AES sin la configuración original.
+
+    :param config: configuración de la ejecución, con el problema que se resuelve
+    :param solution: individuo con mejor fitness al finalizar la búsqueda
+    :param gens_to_sol: número de generaciones necesarias hasta encontrar una solución
+    :param local_evaluations: número de evaluaciones de fitness realizadas durante la búsqueda local
+    :param real_evaluations: número de evaluaciones de fitness reales hasta encontrar una solución
+    :param time: tiempo de ejecución en segundos
+    :return: diccionario con los valores del registro
+    """
+    return {"type": "run", "function": config.FUNCTION, "a": config.A, "b": config.B, "sol": config.SOL,
+            "fitness": finite(solution.fitness), "hits": int(solution.hits), "phenotype": solution.phenotype,
+            "gens_to_sol": int(gens_to_sol), "local_evaluations": int(local_evaluations),
+            "real_evaluations": int(real_evaluations), "time": time, "population_size": config.POPULATION_SIZE,
+            "offspring_size": config.OFFSPRING_SIZE, "self_adaptation": bool(config.SELF_ADAPTATION),
+            "aes_real_evaluations": bool(config.AES_REAL_EVALUATIONS)}
+
+
+def read_stream(path):
+    """
+    Lectura de los registros de un fichero JSONL o CSV.
+
+    En los ficheros CSV los valores vacíos se leen como None y los de las columnas que no son de texto se convierten a
+    su tipo.
+
+    :param path: nombre del fichero
+    :return: lista de registros
+    """
+    with open(path, newline="") as file:
+        if not path.endswith(".csv"):
+            return [json.loads(line) for line in file if line.strip()]
+        return [{name: value if name in TEXT_FIELDS and value != "" else parse(value) for name, value in row.items()}
+                for row in csv.DictReader(file)]
+
+
+def parse(value):
+    """
+    Conversión de un valor leído de un fichero CSV.
+
+    :param value: cadena de texto
+    :return: None, bool, int, float o la propia cadena
+    """
+    if value == "":
+        return None
+    if value in ("True", "False"):
+        return value == "True"
+    for kind in (int, float):
+        try:
+            return kind(value)
+        except ValueError:
+            pass
+    return value
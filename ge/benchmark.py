@@ -0,0 +1,339 @@
+import gc
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import platform
+import numpy as np
+from ga.config import default_config
+from ga.population import Population
+from ga.fitness import fitness_function, phenotypeToExpression
+from ga.fitness_cache import fitness_cache
+from ga.interpreter import compile_program, batch_fitness_function
+from ga.parent_selection import select_parents
+from ga.recombination import one_point_crossover, uniform_crossover, batch_one_point_crossover, batch_uniform_crossover
+from ga.mutation import random_resetting, batch_random_resetting
+from ga.duplication import duplication, batch_duplication
+from ga.survivor_selection import age_based_replacement, fitness_based_replacement, mu_lambda_selection
+from ga.local_search import local_search
+from ga.genetic_algorithm import initialization, search, evaluate_fitness
+from ge.grammar import Grammar
+
+GRAMMAR_FILE = "grammars/derivada.bnf"
+# Semilla fija de todas las pruebas
+BENCHMARK_SEED = 0
+# Número de genotipos aleatorios decodificados en las pruebas de decodificación
+DECODE_SAMPLES = 2000
+# Número de fenotipos evaluados en las pruebas de fitness
+FITNESS_SAMPLES = 200
+# Número de poblaciones distintas sobre las que se aplica la búsqueda local
+LOCAL_SEARCH_SAMPLES = 10
+# Duración mínima en segundos de cada repetición de una micro-prueba
+MIN_TIME = 0.05
+
+
+def benchmark_config(**overrides):
+    """
+    Configuración de las pruebas: la de ga.params sin paralelismo, checkpoints, telemetría ni instrumentación, para que
+    solo se mida el código del proceso actual, y sin terminación anticipada, para que cada búsqueda ejecute siempre
+    GENERATIONS generaciones.
+
+    :param overrides: parámetros cuyo valor se sustituye
+    :return: configuración de las pruebas
+    """
+    values = dict(PARALLEL_EVALUATION=False, CHECKPOINT_INTERVAL=0, TELEMETRY_FILE=None, PROFILING=False,
+                  STOP_ON_SOLUTION=False, STAGNATION_GENERATIONS=0, MAX_EVALUATIONS=0, MAX_TIME=0)
+    values.update(overrides)
+    return default_config().replace(**values)
+
+
+def seed(value=BENCHMARK_SEED):
+    """
+    Reinicio de las semillas de random y NumPy.
+
+    :param value: semilla
+    """
+    random.seed(value)
+    np.random.seed(value)
+
+
+def measure(run, setup=None, operations=1, repeats=5):
+    """
+    Medición del tiempo de una operación.
+
+    Cada repetición llama a run las veces necesarias para durar al menos MIN_TIME segundos. Antes de cada repetición
+    se reinician las semillas y la caché de fitness y se preparan los argumentos de cada llamada con setup, fuera de la
+    medición, con el recolector de basura desactivado. Se toma el menor tiempo de todas las repeticiones, el menos afectado por el resto de procesos.
+
+    :param run: función que se mide, llamada con los argumentos devueltos por setup
+    :param setup: función opcional que prepara los argumentos de run
+    :param operations: número de operaciones que realiza cada llamada a run
+    :param repeats: número de repeticiones
+    :return: diccionario con los segundos por operación y las operaciones por segundo
+    """
+    def repetition(loops):
+        seed()
+        fitness_cache.clear()
+        arguments = [setup() if setup is not None else () for _ in range(loops)]
+        # Como en timeit, el recolector de basura se desactiva durante la medición
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            for call_arguments in arguments:
+                run(*call_arguments)
+            return time.perf_counter() - start
+        finally:
+            gc.enable()
+
+    loops = max(1, math.ceil(MIN_TIME / max(repetition(1), 1e-9)))
+    seconds = min(repetition(loops) for _ in range(repeats)) / (loops * operations)
+
+    return {"seconds_per_operation": seconds, "operations_per_second": 1 / seconds if seconds > 0 else float("inf")}
+
+
+class MicroContext(object):
+
+    def __init__(self, config):
+        """
+        Datos comunes de las micro-pruebas, generados con la semilla fija.
+
+        :param config: configuración de las pruebas, con el problema que se evalúa
+        """
+        seed()
+        self.config = config
+        self.grammar = Grammar(GRAMMAR_FILE, config)
+        self.uncached_grammar = Grammar(GRAMMAR_FILE, config.replace(DECODE_CACHE_SIZE=0))
+        self.genomes = [[random.randint(0, config.CODON_SIZE) for _ in range(random.randint(1, config.MAX_GENOME_LENGTH))]
+                        for _ in range(DECODE_SAMPLES)]
+        phenotypes = [self.grammar.decode(genome) for genome in self.genomes]
+        self.phenotypes = [phenotype for phenotype in phenotypes if phenotype is not None][:FITNESS_SAMPLES]
+        self.expressions = [phenotypeToExpression(phenotype) for phenotype in self.phenotypes]
+        programs = [compile_program(phenotype) for phenotype in self.phenotypes]
+        self.programs = [program for program in programs if program is not None]
+
+        # Población evaluada sobre la que se aplican los operadores
+        self.population = initialization(config)
+        evaluate_fitness(self.population, self.grammar, config=config)
+        self.array_population = Population.from_individuals(self.population, config)
+        self.local_populations = []
+        for _ in range(LOCAL_SEARCH_SAMPLES):
+            population = initialization(config)
+            evaluate_fitness(population, self.grammar, config=config)
+            self.local_populations.append(population)
+
+    def individuals(self):
+        """
+        Copia de la población, para los operadores que modifican los individuos.
+
+        :return: lista de individuos
+        """
+        return [individual.clone() for individual in self.population]
+
+    def pairs(self):
+        """
+        Parejas de padres escogidas aleatoriamente de una copia de la población.
+
+        :return: lista de parejas de individuos
+        """
+        pool = self.individuals()
+        return [tuple(random.sample(pool, 2)) for _ in range(self.config.OFFSPRING_SIZE // 2)]
+
+
+def micro_benchmarks(config, repeats):
+    """
+    Micro-pruebas de la decodificación, el fitness y cada operador.
+
+    :param config: configuración de las pruebas, con el problema que se evalúa
+    :param repeats: número de repeticiones de cada prueba
+    :return: diccionario con el resultado de cada prueba
+    """
+    context = MicroContext(config)
+    size = len(context.population)
+    offspring_size = config.OFFSPRING_SIZE
+    duplicating = config.replace(DUPLICATION_RATE=1.0)
+    vectorized = config.replace(VECTORIZED_FITNESS=True)
+    scalar = config.replace(VECTORIZED_FITNESS=False)
+    rank = config.replace(PARENT_SELECTION="rank")
+    truncation = config.replace(PARENT_SELECTION="truncation")
+
+    def decode(grammar):
+        for genome in context.genomes:
+            grammar.decode(genome)
+
+    def fitness(expressions, fitness_config):
+        for expression in expressions:
+            fitness_function(expression, fitness_config)
+
+    benchmarks = {
+        "decode": (lambda: decode(context.uncached_grammar), None, len(context.genomes)),
+        "decode_cached": (lambda: decode(context.grammar), None, len(context.genomes)),
+        "phenotype_to_expression": (lambda: [phenotypeToExpression(p) for p in context.phenotypes], None,
+                                    len(context.phenotypes)),
+        "fitness_function": (lambda: fitness(context.expressions, vectorized), None, len(context.expressions)),
+        "fitness_function_scalar": (lambda: fitness(context.expressions, scalar), None, len(context.expressions)),
+        "batch_fitness_function": (lambda: batch_fitness_function(context.programs, config), None,
+                                   len(context.programs)),
+        "tournament_selection": (lambda: select_parents(context.population, config), None, offspring_size),
+        "rank_selection": (lambda: select_parents(context.population, rank), None, offspring_size),
+        "truncation_selection": (lambda: select_parents(context.population, truncation), None, offspring_size),
+        "one_point_crossover": (lambda pairs: [one_point_crossover(p1, p2, 0, config) for p1, p2 in pairs],
+                                lambda: (context.pairs(),), offspring_size // 2),
+        "uniform_crossover": (lambda pairs: [uniform_crossover(p1, p2, 0, config) for p1, p2 in pairs],
+                              lambda: (context.pairs(),), offspring_size // 2),
+        "random_resetting": (lambda individuals: [random_resetting(i, 0, config) for i in individuals],
+                             lambda: (context.individuals(),), size),
+        "duplication": (lambda individuals: [duplication(i, duplicating) for i in individuals],
+                        lambda: (context.individuals(),), size),
+        "age_based_replacement": (lambda offspring, population: age_based_replacement(offspring, population, config),
+                                  lambda: (context.individuals(), context.population), size),
+        "fitness_based_replacement": (lambda offspring, population: fitness_based_replacement(
+            offspring[:size // 2], population, config), lambda: (context.individuals(), context.individuals()), size),
+        "mu_lambda_selection": (lambda offspring, population: mu_lambda_selection(offspring, population, config),
+                                lambda: (context.individuals(), context.population), size),
+        "local_search": (lambda populations: [local_search(offspring, context.uncached_grammar, config)
+                                              for offspring in populations],
+                         lambda: ([[individual.clone() for individual in population]
+                                   for population in context.local_populations],), LOCAL_SEARCH_SAMPLES),
+        "batch_one_point_crossover": (lambda: batch_one_point_crossover(context.array_population, offspring_size // 2,
+                                                                        0, config), None, offspring_size // 2),
+        "batch_uniform_crossover": (lambda: batch_uniform_crossover(context.array_population, offspring_size // 2, 0,
+                                                                    config), None, offspring_size // 2),
+        "batch_random_resetting": (lambda population: batch_random_resetting(population, 0, config),
+                                   lambda: (context.array_population.take(np.arange(size)),), size),
+        "batch_duplication": (lambda population: batch_duplication(population, duplicating),
+                              lambda: (context.array_population.take(np.arange(size)),), size),
+    }
+
+    results = {}
+    for name, (run, setup, operations) in benchmarks.items():
+        results["micro/" + name] = measure(run, setup, operations, repeats)
+
+    return results
+
+
+def macro_benchmarks(config, problems, repeats):
+    """
+    Macro-pruebas: búsquedas completas sobre cada problema con la semilla fija.
+
+    :param config: configuración de las pruebas (GENERATIONS indica la duración de cada búsqueda)
+    :param problems: índices de los problemas de PROBLEMS
+    :param repeats: número de repeticiones de cada búsqueda
+    :return: diccionario con el resultado de cada problema
+    """
+    results = {}
+    for problem in problems:
+        problem_config = config.with_problem(config.PROBLEMS[problem])
+        times = []
+        for _ in range(repeats):
+            seed()
+            fitness_cache.clear()
+            grammar = Grammar(GRAMMAR_FILE, problem_config)
+            start = time.perf_counter()
+            solution = search(initialization(problem_config, grammar), grammar, config=problem_config)[0]
+            times.append(time.perf_counter() - start)
+        seconds = min(times)
+        results["macro/problem_{}".format(problem)] = {
+            "seconds": seconds,
+            "generations_per_second": problem_config.GENERATIONS / seconds,
+            "evaluations_per_second": fitness_cache.evaluations / seconds,
+            "real_evaluations_per_second": fitness_cache.misses / seconds,
+            # Resultado de la búsqueda, para detectar cambios de comportamiento además de rendimiento
+            "fitness": float(solution.fitness),
+            "hits": int(solution.hits),
+        }
+
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Comparación de los resultados con una referencia.
+
+    Una prueba empeora si alguna de sus tasas (valores terminados en "_per_second") es menor que la de la referencia
+    en más de la fracción threshold. En las macro-pruebas también se indica si ha cambiado el resultado de la búsqueda.
+
+    :param results: resultados actuales
+    :param baseline: resultados de referencia
+    :param threshold: fracción de empeoramiento permitida
+    :return: lista de pruebas que han empeorado,
+            lista de líneas con la comparación de cada prueba
+    """
+    regressions = []
+    lines = []
+    for name, values in sorted(results.items()):
+        reference = baseline.get(name)
+        if reference is None:
+            lines.append("{:<40} nueva".format(name))
+            continue
+        for metric in sorted(metric for metric in values if metric.endswith("_per_second") and metric in reference):
+            ratio = values[metric] / reference[metric] if reference[metric] else float("inf")
+            regressed = ratio < 1 - threshold
+            lines.append("{:<40}{:<30}{:>8.2f}x{}".format(name, metric, ratio, "  EMPEORA" if regressed else ""))
+            if regressed and name not in regressions:
+                regressions.append(name)
+        if (values.get("fitness"), values.get("hits")) != (reference.get("fitness"), reference.get("hits")):
+            lines.append("{:<40} resultado distinto: {} / {} hits (referencia {} / {} hits)".format(
+                name, values.get("fitness"), values.get("hits"), reference.get("fitness"), reference.get("hits")))
+
+    return regressions, lines
+
+
+def run_benchmarks(suite="all", problems=None, generations=50, repeats=5, problem=0):
+    """
+    Ejecución de la batería de pruebas de rendimiento.
+
+    :param suite: "micro", "macro" o "all"
+    :param problems: índices de los problemas de las macro-pruebas (por defecto, todos los de PROBLEMS)
+    :param generations: generaciones de cada búsqueda de las macro-pruebas
+    :param repeats: número de repeticiones de cada prueba
+    :param problem: problema sobre el que se evalúa el fitness en las micro-pruebas
+    :return: diccionario con el entorno, la configuración y los resultados
+    """
+    config = benchmark_config(GENERATIONS=generations)
+    problems = range(len(config.PROBLEMS)) if problems is None else problems
+    results = {}
+    if suite in ("micro", "all"):
+        results.update(micro_benchmarks(config.with_problem(config.PROBLEMS[problem]), repeats))
+    if suite in ("macro", "all"):
+        results.update(macro_benchmarks(config, problems, max(1, repeats // 2)))
+
+    return {"environment": {"python": platform.python_version(), "numpy": np.__version__,
+                            "machine": platform.machine(), "system": platform.system()},
+            "config": config.identifier(), "seed": BENCHMARK_SEED, "results": results}
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Pruebas de rendimiento con semillas fijas")
+    parser.add_argument("--suite", choices=["micro", "macro", "all"], default="all")
+    parser.add_argument("--problems", type=int, nargs="+", help="problemas de las macro-pruebas (por defecto, todos)")
+    parser.add_argument("--generations", type=int, default=50, help="generaciones de cada búsqueda")
+    parser.add_argument("--repeats", type=int, default=5, help="repeticiones de cada prueba")
+    parser.add_argument("--save", help="fichero JSON en el que se guardan los resultados como referencia")
+    parser.add_argument("--baseline", help="fichero JSON de referencia con el que se comparan los resultados")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="fracción de empeoramiento permitida respecto a la referencia")
+    arguments = parser.parse_args()
+
+    report = run_benchmarks(arguments.suite, arguments.problems, arguments.generations, arguments.repeats)
+    for name, values in sorted(report["results"].items()):
+        rates = ", ".join("{}: {:.1f}".format(metric, value) for metric, value in values.items()
+                          if metric.endswith("_per_second"))
+        print("{:<40} {}".format(name, rates))
+
+    if arguments.save:
+        with open(arguments.save, "w") as file:
+            json.dump(report, file, indent=2)
+
+    if arguments.baseline:
+        with open(arguments.baseline) as file:
+            baseline = json.load(file)
+        if baseline.get("config") != report["config"]:
+            print("Aviso: la configuración de la referencia es distinta de la actual")
+        regressions, lines = compare(report["results"], baseline["results"], arguments.threshold)
+        print("\n".join(lines))
+        if regressions:
+            print("Pruebas que empeoran más de un {:.0%}: {}".format(arguments.threshold, ", ".join(regressions)))
+            sys.exit(1)
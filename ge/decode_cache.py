@@ -0,0 +1,136 @@
+from collections import OrderedDict
+
+# Valor devuelto por la caché cuando el genotipo no se ha decodificado previamente
+MISS = object()
+
+
+class DecodeCache(object):
+
+    def __init__(self, max_size):
+        """
+        Inicialización de la caché de decodificación.
+
+        La decodificación de un genotipo solo depende de los codones que realmente consume, y de cada uno de ellos solo
+        importa su resto módulo el número de producciones de la regla en la que se utiliza. Los genotipos que se
+        decodifican sin llegar al final de la cadena se almacenan en un árbol de prefijos indexado por esos restos, de
+        forma que cualquier genotipo que comparta el prefijo efectivo reutiliza el fenotipo ya calculado. Los genotipos
+        que necesitan wrapping dependen también de su longitud y se almacenan por su secuencia completa de codones.
+
+        Cuando el número de entradas supera el tamaño máximo, la caché se vacía.
+
+        :param max_size: número máximo de nodos y entradas almacenados (0 desactiva la caché)
+        """
+        self.max_size = max_size
+        # Cada nodo del árbol es una lista [aridad, hijos]; las hojas tienen aridad 0 y almacenan el fenotipo
+        self.root = None
+        self.exact = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, genome):
+        """
+        Búsqueda del fenotipo de un genotipo en la caché.
+
+        :param genome: genotipo del individuo
+        :return: fenotipo almacenado o MISS si el genotipo no se ha decodificado previamente
+        """
+        node = self.root
+        depth = 0
+        while node is not None:
+            arity, value = node
+            if arity == 0:
+                # El prefijo solo es válido si el genotipo no se agota durante la decodificación
+                if len(genome) > depth:
+                    self.hits += 1
+                    return value
+                break
+            if depth >= len(genome):
+                break
+            node = value.get(genome[depth] % arity)
+            depth += 1
+
+        key = tuple(genome)
+        if key in self.exact:
+            self.exact.move_to_end(key)
+            self.hits += 1
+            return self.exact[key]
+
+        self.misses += 1
+        return MISS
+
+    def store(self, genome, arities, phenotype):
+        """
+        Almacenamiento del fenotipo obtenido al decodificar un genotipo.
+
+        :param genome: genotipo del individuo
+        :param arities: número de producciones de la regla en la que se ha utilizado cada codón consumido
+        :param phenotype: fenotipo del individuo
+        """
+        if self.max_size <= 0:
+            return
+        if self.size >= self.max_size:
+            self.root = None
+            self.exact.clear()
+            self.size = 0
+
+        if len(arities) >= len(genome):
+            self.exact[tuple(genome)] = phenotype
+            self.size += 1
+            return
+
+        if self.root is None:
+            self.root = self._new_branch(genome, arities, 0, phenotype)
+            return
+        node = self.root
+        for depth in range(len(arities)):
+            children = node[1]
+            key = genome[depth] % arities[depth]
+            child = children.get(key)
+            if child is None:
+                children[key] = self._new_branch(genome, arities, depth + 1, phenotype)
+                return
+            node = child
+
+    def _new_branch(self, genome, arities, depth, phenotype):
+        """
+        Creación de la rama del árbol de prefijos que cuelga de la posición depth.
+
+        :param genome: genotipo del individuo
+        :param arities: número de producciones de la regla en la que se ha utilizado cada codón consumido
+        :param depth: número de codones consumidos hasta el primer nodo de la rama
+        :param phenotype: fenotipo almacenado en la hoja
+        :return: primer nodo de la rama
+        """
+        node = [0, phenotype]
+        self.size += 1
+        for i in range(len(arities) - 1, depth - 1, -1):
+            node = [arities[i], {genome[i] % arities[i]: node}]
+            self.size += 1
+
+        return node
+
+    def hit_rate(self):
+        """
+        Proporción de decodificaciones resueltas con la caché.
+
+        :return: tasa de aciertos de la caché
+        """
+        if self.hits + self.misses == 0:
+            return 0.
+        return self.hits / (self.hits + self.misses)
+
+    def clear(self):
+        """
+        Eliminación de las entradas almacenadas y reinicio de los contadores.
+
+        """
+        self.root = None
+        self.exact.clear()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __str__(self):
+        return "Decode cache: {} hits; {} misses; {:.2%} hit rate; {} entries".format(self.hits, self.misses,
+                                                                                       self.hit_rate(), self.size)
@@ -1,13 +1,17 @@
 import numpy as np
-import math
-from matplotlib import pyplot as plt
-from ga.params import A, B, SOL, RUNS, POPULATION_SIZE, OFFSPRING_SIZE, SELF_ADAPTATION
-import ga.params as params
+from ga.config import default_config
+from ga.fitness import phenotypeToExpression
 
 
 class Evaluation:
 
-    def __init__(self):
+    def __init__(self, config=None):
+        """
+        Evaluación de las ejecuciones de un problema.
+
+        :param config: configuración de las ejecuciones, con el problema que se resuelve
+        """
+        self.config = config or default_config()
         self.successful_runs = 0
         self.aes = 0
         self.sr = 0
@@ -15,8 +19,37 @@ class Evaluation:
         self.fitness_sum = 0
         self.gens_to_sol = []
         self.local_evaluations = 0
+        self.real_evaluations = 0
         self.phen_solution = None
-        self.fitness_values = None
+        self.fitness_values = []
+
+    def add_run(self, solution, gens_to_sol, best_individuals, local_evaluations, real_evaluations):
+        """
+        Incorporación del resultado de una ejecución a la evaluación.
+
+        :param solution: individuo con mejor fitness al finalizar la búsqueda
+        :param gens_to_sol: número de generaciones necesarias hasta encontrar una solución
+        :param best_individuals: lista con los fitness de los mejores individuos de cada generación
+        :param local_evaluations: número de evaluaciones de fitness realizadas durante la búsqueda local
+        :param real_evaluations: número de evaluaciones de fitness reales hasta encontrar una solución
+        """
+        # Almacenamiento de los mejores valores de fitness de cada generación en cada ejecución
+        self.fitness_values.append(best_individuals)
+        # Suma de los mejores valores de fitness obtenidos tras cada ejecución
+        self.fitness_sum += solution.fitness
+
+        if solution.hits == 51:
+            if self.phen_solution is None:
+                # Almacenamiento del fenotipo de la primera solución obtenida
+                self.phen_solution = phenotypeToExpression(solution.phenotype)
+            # Contador de ejecuciones exitosas
+            self.successful_runs += 1
+            # Contador de evaluaciones de fitness realizadas durante la búsqueda local
+            self.local_evaluations += local_evaluations
+            # Contador de evaluaciones de fitness reales realizadas hasta obtener una solución
+            self.real_evaluations += real_evaluations
+            # Contador de número de generaciones necesarias hasta obtener una solución
+            self.gens_to_sol.append(gens_to_sol)
 
     def computeSR(self):
         """
@@ -24,7 +57,7 @@ class Evaluation:
 
         :return: tasa de éxito
         """
-        self.sr = self.successful_runs / RUNS
+        self.sr = self.successful_runs / self.config.RUNS
 
     def computeMBF(self):
         """
@@ -32,7 +65,7 @@ class Evaluation:
 
         :return: mejor fitness medio
         """
-        self.mbf = self.fitness_sum/RUNS
+        self.mbf = self.fitness_sum/self.config.RUNS
 
     def computeAES(self):
         """
@@ -42,63 +75,53 @@ class Evaluation:
         cada individuo se realizan sobre el conjunto de la descendencia, por lo que se utiliza este valor para calcular
         el AES.
         Se tienen en cuenta las evaluaciones realizadas durante el proceso de búsqueda local.
+        Si AES_REAL_EVALUATIONS está activado, se utilizan en su lugar las evaluaciones reales de la función de fitness,
+        descontando las resueltas mediante la caché.
 
         :return: número medio de evaluaciones hasta encontrar una solución
         """
+        config = self.config
+        if config.AES_REAL_EVALUATIONS:
+            self.aes = self.real_evaluations / self.successful_runs
+            return
         # En caso de autoadaptación se usa un esquema (mu,lambda) por lo que el número de evaluaciones de
         # fitness se calcula sobre el tamaño de la descendencia
-        if SELF_ADAPTATION:
-            self.aes = (sum(np.asarray(self.gens_to_sol, dtype=np.float32)) * OFFSPRING_SIZE + self.local_evaluations) / self.successful_runs
+        if config.SELF_ADAPTATION:
+            self.aes = (sum(np.asarray(self.gens_to_sol, dtype=np.float32)) * config.OFFSPRING_SIZE + self.local_evaluations) / self.successful_runs
         else:
             self.aes = (sum(np.asarray(self.gens_to_sol,
-                                       dtype=np.float32)) * POPULATION_SIZE + self.local_evaluations) / self.successful_runs
-
-    def plot_g_vs_gHat(self):
-        """
-        Representación gráfica de la solución encontrada y la solución real al problema.
-
-        """
-        x = np.arange(params.A, params.B, 0.1)
-        y = []
-        y_sol = []
-        for value in x:
-            y.append(eval(params.SOL.replace('X', str(value))))
-            y_sol.append(eval(self.phen_solution.replace('X', str(value))))
-
-        plt.plot(x, y, 'b', x, y_sol, 'r')
-        plt.legend(['g(x)', r'$\hat{g}(x)$'])
-        plt.show()
+                                       dtype=np.float32)) * config.POPULATION_SIZE + self.local_evaluations) / self.successful_runs
 
-    def plot_progress_curve(self):
+    def progress_curve(self):
         """
-        Representación gráfica de la evolución del mejor fitness de cada generación.
+        Evolución del mejor fitness medio de cada generación.
 
         El valor de fitness se calcula realizando una media entre los mejores valores de fitness de cada generación
-        obtenidos en cada ejecución.
+        obtenidos en cada ejecución. Las ejecuciones más cortas (terminadas anticipadamente) mantienen su último valor.
 
+        :return: vector con el mejor fitness medio de cada generación
         """
-        fitness_values = np.asarray(self.fitness_values)
-
-        y = np.mean(fitness_values, axis=0)
-
-        x = np.arange(0, len(y), 1)
-        plt.ylabel("Valor de adaptación")
-        plt.xlabel("Número de generaciones")
-        plt.yscale("log")
-        plt.plot(x, y)
-        plt.show()
+        return np.mean(np.asarray(pad_curves(self.fitness_values)), axis=0)
 
     def perform_evaluation(self):
         """
-        Evaluación de la ejecución realizada.
+        Evaluación de la ejecución realizada: cálculo de SR, MBF y, si hay alguna ejecución exitosa, AES.
+
+        Las gráficas de la evaluación se generan aparte, con el módulo ge.plotting.
 
         """
         self.computeSR()
         self.computeMBF()
         if self.successful_runs > 0:
             self.computeAES()
-            self.plot_g_vs_gHat()
-        self.plot_progress_curve()
+
+    def summary(self):
+        """
+        Valores de SR, MBF y AES de una evaluación ya realizada.
+
+        :return: cadena de texto con los valores de SR, MBF y AES
+        """
+        return "SR: {}; MBF: {}; AES: {}".format(int(self.sr*100), self.mbf, self.aes)
 
     def __str__(self):
         """
@@ -107,5 +130,15 @@ class Evaluation:
         :return: cadena de texto con los valores de SR, MBF y AES
         """
         self.perform_evaluation()
-        return "SR: {}; MBF: {}; AES: {}".format(int(self.sr*100), self.mbf, self.aes)
+        return self.summary()
+
+
+def pad_curves(curves):
+    """
+    Extensión de las curvas de progreso más cortas con su último valor, hasta la longitud de la más larga.
 
+    :param curves: lista con la curva de progreso de cada ejecución
+    :return: lista de curvas de la misma longitud
+    """
+    length = max((len(curve) for curve in curves), default=0)
+    return [list(curve) + [curve[-1]] * (length - len(curve)) if curve else [] for curve in curves]
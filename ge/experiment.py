@@ -0,0 +1,175 @@
+import os
+import time
+import random
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from ga.config import default_config
+from ga.genetic_algorithm import initialization, search, resume
+from ga.fitness_cache import fitness_cache
+from ga.telemetry import TelemetrySink, run_record
+from ge.grammar import Grammar
+
+
+class RunResult(object):
+
+    def __init__(self, config, problem, run, seed, solution, gens_to_sol, best_individuals, local_evaluations,
+                 real_evaluations, time, cache_hits, cache_misses):
+        """
+        Resultado de una ejecución independiente del algoritmo sobre un problema.
+
+        :param config: configuración de la ejecución, sin el problema
+        :param problem: índice del problema en PROBLEMS
+        :param run: número de la ejecución
+        :param seed: semilla utilizada en la ejecución
+        :param solution: individuo con mejor fitness al finalizar la búsqueda
+        :param gens_to_sol: número de generaciones necesarias hasta encontrar una solución
+        :param best_individuals: lista con los fitness de los mejores individuos de cada generación
+        :param local_evaluations: número de evaluaciones de fitness realizadas durante la búsqueda local
+        :param real_evaluations: número de evaluaciones de fitness reales hasta encontrar una solución
+        :param time: tiempo de ejecución en segundos
+        :param cache_hits: número de evaluaciones resueltas con la caché de fitness
+        :param cache_misses: número de evaluaciones reales de la función de fitness
+        """
+        self.config = config
+        self.problem = problem
+        self.run = run
+        self.seed = seed
+        self.solution = solution
+        self.gens_to_sol = gens_to_sol
+        self.best_individuals = best_individuals
+        self.local_evaluations = local_evaluations
+        self.real_evaluations = real_evaluations
+        self.time = time
+        self.cache_hits = cache_hits
+        self.cache_misses = cache_misses
+
+
+def task_seed(seed, problem, run, runs):
+    """
+    Semilla determinista de cada ejecución, independiente del proceso en el que se ejecute.
+
+    :param seed: semilla base del experimento
+    :param problem: índice del problema
+    :param run: número de la ejecución
+    :param runs: número de ejecuciones de cada problema
+    :return: semilla de la ejecución
+    """
+    return seed + problem * runs + run
+
+
+def run_file(path, config, problem, run):
+    """
+    Fichero propio de una ejecución de un experimento (checkpoint o telemetría).
+
+    Se añade al nombre un identificador de la configuración, el problema y el número de ejecución, de forma que
+    las ejecuciones de un experimento o de un barrido no sobrescriben sus ficheros.
+
+    :param path: nombre del fichero indicado en la configuración
+    :param config: configuración de la ejecución, sin el problema
+    :param problem: índice del problema
+    :param run: número de la ejecución
+    :return: nombre del fichero
+    """
+    root, extension = os.path.splitext(path)
+    return "{}_{}_{}_{}{}".format(root, config.identifier(), problem, run, extension)
+
+
+def run_task(task):
+    """
+    Ejecución independiente del algoritmo sobre un problema.
+
+    Se reinician las semillas y las cachés al comenzar, de forma que el resultado no depende de las ejecuciones que
+    haya realizado antes el mismo proceso. Si RESUME está activado, se guardan checkpoints y existe el de la ejecución
+    (es decir, la ejecución se interrumpió), esta se reanuda desde él.
+
+    :param task: tupla (configuración, índice del problema, número de ejecución, semilla, fichero de la gramática)
+    :return: resultado de la ejecución
+    """
+    config, problem, run, seed, grammar_file = task
+    problem_config = config.with_problem(config.PROBLEMS[problem])
+    if config.CHECKPOINT_INTERVAL > 0:
+        problem_config = problem_config.replace(CHECKPOINT_FILE=run_file(config.CHECKPOINT_FILE, config, problem, run))
+    telemetry = None
+    if config.TELEMETRY_FILE:
+        telemetry = TelemetrySink(run_file(config.TELEMETRY_FILE, config, problem, run), config.TELEMETRY_BUFFER,
+                                  config=config.identifier(), problem=problem, run=run, seed=seed)
+    random.seed(seed)
+    np.random.seed(seed)
+    fitness_cache.clear()
+
+    start_time = time.time()
+    # Lectura del fichero que contiene la gramática
+    grammar = Grammar(grammar_file, problem_config)
+    if problem_config.RESUME and problem_config.CHECKPOINT_INTERVAL > 0 and \
+            os.path.exists(problem_config.CHECKPOINT_FILE):
+        # Reanudación de la búsqueda desde el último checkpoint de una ejecución interrumpida
+        solution, gens_to_sol, best_individuals, local_evaluations, real_evaluations = resume(
+            problem_config.CHECKPOINT_FILE, grammar, config=problem_config, telemetry=telemetry)
+    else:
+        # Inicialización de la población
+        population = initialization(problem_config, grammar)
+        # Ejecución del algoritmo de búsqueda
+        solution, gens_to_sol, best_individuals, local_evaluations, real_evaluations = search(population, grammar,
+                                                                                              config=problem_config,
+                                                                                              telemetry=telemetry)
+
+    elapsed = time.time() - start_time
+    if telemetry is not None:
+        telemetry.write(run_record(problem_config, solution, gens_to_sol, local_evaluations, real_evaluations, elapsed))
+        telemetry.close()
+
+    return RunResult(config, problem, run, seed, solution, gens_to_sol, best_individuals, local_evaluations,
+                     real_evaluations, elapsed, fitness_cache.hits, fitness_cache.misses)
+
+
+def run_experiments(problems, runs, grammar_file, workers=1, seed=0, config=None):
+    """
+    Ejecución de RUNS ejecuciones independientes de cada problema.
+
+    Los pares (problema, ejecución) se reparten entre workers procesos; con un único proceso se ejecutan en serie en
+    el proceso actual. Cada ejecución utiliza su propia semilla, por lo que los resultados son los mismos en ambos casos.
+
+    :param problems: índices de los problemas de PROBLEMS que se desean resolver
+    :param runs: número de ejecuciones de cada problema
+    :param grammar_file: nombre del archivo que contiene la gramática
+    :param workers: número de procesos
+    :param seed: semilla base del experimento
+    :param config: configuración de las ejecuciones (por defecto, la de ga.params)
+    :return: diccionario con la lista de resultados de cada problema, ordenados por número de ejecución
+    """
+    config = config or default_config()
+    return run_sweep([config], problems, runs, grammar_file, workers, seed)[0]
+
+
+def run_sweep(configs, problems, runs, grammar_file, workers=1, seed=0):
+    """
+    Ejecución de un barrido de configuraciones.
+
+    Todas las ejecuciones (configuración, problema, ejecución) se reparten entre un único conjunto de workers procesos,
+    que se mantiene durante todo el barrido en lugar de crearse para cada configuración. La semilla de cada ejecución
+    depende solo del problema y del número de ejecución, por lo que todas las configuraciones se comparan sobre las
+    mismas semillas.
+
+    :param configs: lista de configuraciones (por ejemplo, generada con config_grid)
+    :param problems: índices de los problemas de PROBLEMS que se desean resolver
+    :param runs: número de ejecuciones de cada problema
+    :param grammar_file: nombre del archivo que contiene la gramática
+    :param workers: número de procesos
+    :param seed: semilla base del experimento
+    :return: lista con el diccionario de resultados de cada problema de cada configuración, en el mismo orden que
+            configs
+    """
+    tasks = [(config, problem, run, task_seed(seed, problem, run, runs), grammar_file)
+             for config in configs for problem in problems for run in range(runs)]
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(run_task, tasks))
+    else:
+        results = list(map(run_task, tasks))
+
+    sweep = [{problem: [] for problem in problems} for _ in configs]
+    for index, config_results in enumerate(sweep):
+        for result in results[index * len(problems) * runs:(index + 1) * len(problems) * runs]:
+            config_results[result.problem].append(result)
+
+    return sweep
@@ -1,18 +1,58 @@
 import re
-from ga.params import MAX_WRAPS, REPAIR
+import random
+from ga.config import default_config
+from ge.decode_cache import DecodeCache, MISS
+from ga.interpreter import compile_program
 
+# Valor devuelto al decodificar un vecino cuyo codón modificado no cambia el fenotipo
+NEUTRAL = object()
 
 class Grammar(object):
 
     NT = "NT"
     T = "T"
 
-    def __init__(self, file_name):
+    def __init__(self, file_name, config=None):
+        """
+        Lectura y compilación de una gramática BNF.
+
+        :param file_name: nombre del archivo que contiene la gramática
+        :param config: configuración de la ejecución (número máximo de wraps, reparación y tamaño de la caché de
+                       decodificación)
+        """
+        self.config = config or default_config()
         self.rules = {}
         self.non_terminals, self.terminals = set(), set()
         self.start_rule = None
+        self.decode_cache = DecodeCache(self.config.DECODE_CACHE_SIZE)
+        # Contadores de derivaciones realizadas (sin contar las resueltas con la caché), de veces que se ha vuelto a
+        # leer el genotipo desde el principio (wraps), de reparaciones y de derivaciones inválidas
+        self.derivations = 0
+        self.wraps = 0
+        self.repairs = 0
+        self.invalid = 0
+
+        # Tablas de enteros utilizadas en la decodificación
+        self.symbols = []
+        self.symbol_names = []
+        self.symbol_ids = {}
+        self.n_non_terminals = 0
+        self.rule_arities = []
+        self.rule_offsets = []
+        self.production_table = []
+        self.production_strings = []
+        self.start_id = None
+
+        # Metadatos de cada no terminal, indexados por su identificador
+        self.min_depths = []
+        self.min_codons = []
+        self.recursive = []
+        self.terminating_productions = []
+        self.repair_positions = []
 
         self.read_bnf_file(file_name)
+        self.compile_tables()
+        self.analyse()
 
     def read_bnf_file(self, file_name):
         """
@@ -70,124 +110,384 @@ class Grammar(object):
                 else:
                     raise ValueError("Each rule must be on one line")
 
+    def compile_tables(self):
+        """
+        Compilación de las reglas de la gramática en tablas indexadas por enteros.
+
+        Cada símbolo recibe un identificador entero: los no terminales ocupan los identificadores 0..n-1, en el orden
+        en que se definen sus reglas, y los terminales los siguientes, en el orden en que aparecen. Para cada regla se
+        almacena su número de producciones (aridad) y la posición de su primera producción en la tabla de producciones,
+        donde cada producción se guarda como una tupla de identificadores en orden inverso para apilarla directamente.
+        """
+        for lhs in self.rules:
+            self.symbol_ids[(lhs, self.NT)] = len(self.symbols)
+            self.symbols.append((lhs, self.NT))
+        self.n_non_terminals = len(self.symbols)
+
+        for lhs, productions in self.rules.items():
+            self.rule_arities.append(len(productions))
+            self.rule_offsets.append(len(self.production_table))
+            for production in productions:
+                ids = []
+                for symbol in production:
+                    if symbol not in self.symbol_ids:
+                        if symbol[1] == self.NT:
+                            raise ValueError("NT without rule:", symbol[0])
+                        self.symbol_ids[symbol] = len(self.symbols)
+                        self.symbols.append(symbol)
+                    ids.append(self.symbol_ids[symbol])
+                self.production_table.append(tuple(reversed(ids)))
+
+        self.symbol_names = [symbol[0] for symbol in self.symbols]
+        # Cadena de texto de las producciones formadas solo por terminales (None si contienen algún no terminal)
+        for production in self.production_table:
+            if len(production) > 0 and min(production) >= self.n_non_terminals:
+                self.production_strings.append("".join(self.symbol_names[symbol] for symbol in reversed(production)))
+            else:
+                self.production_strings.append(None)
+        self.start_id = self.symbol_ids[self.start_rule]
+
+    def analyse(self):
+        """
+        Análisis estático de la gramática compilada.
+
+        Para cada no terminal se calcula:
+        - La profundidad mínima de sus derivaciones (número de niveles del árbol de derivación más bajo que termina en
+        terminales).
+        - El número mínimo de codones que consumen sus derivaciones (solo consumen codón las reglas con más de una
+        producción).
+        - Si es recursivo, es decir, si puede derivar una cadena que lo contiene.
+        - Sus producciones terminantes: las que alcanzan la profundidad mínima.
+
+        Además, cada no terminal que aparece en alguna producción recibe, en el orden en que se definen las reglas, la
+        posición del primer codón que se utiliza al repararlo (repair_individual).
+        """
+        n_non_terminals = self.n_non_terminals
+        productions = [[self.production_table[self.rule_offsets[symbol] + choice]
+                        for choice in range(self.rule_arities[symbol])] for symbol in range(n_non_terminals)]
+
+        # Profundidad mínima y número mínimo de codones por iteración de punto fijo (los terminales valen 0)
+        min_depths = [float("inf")] * n_non_terminals
+        min_codons = [float("inf")] * n_non_terminals
+        changed = True
+        while changed:
+            changed = False
+            for symbol in range(n_non_terminals):
+                choice_codons = 1 if self.rule_arities[symbol] > 1 else 0
+                for production in productions[symbol]:
+                    depth = 1 + max((min_depths[s] for s in production if s < n_non_terminals), default=0)
+                    codons = choice_codons + sum(min_codons[s] for s in production if s < n_non_terminals)
+                    if depth < min_depths[symbol]:
+                        min_depths[symbol], changed = depth, True
+                    if codons < min_codons[symbol]:
+                        min_codons[symbol], changed = codons, True
+        for symbol in range(n_non_terminals):
+            if min_depths[symbol] == float("inf"):
+                raise ValueError("NT without terminating derivation:", self.symbol_names[symbol])
+        self.min_depths = min_depths
+        self.min_codons = min_codons
+
+        # Un no terminal es recursivo si es alcanzable desde alguno de los no terminales de sus producciones
+        children = [{s for production in productions[symbol] for s in production if s < n_non_terminals}
+                    for symbol in range(n_non_terminals)]
+        for symbol in range(n_non_terminals):
+            reachable, pending = set(), list(children[symbol])
+            while pending:
+                current = pending.pop()
+                if current not in reachable:
+                    reachable.add(current)
+                    pending.extend(children[current])
+            self.recursive.append(symbol in reachable)
+
+        for symbol in range(n_non_terminals):
+            self.terminating_productions.append(tuple(
+                choice for choice, production in enumerate(productions[symbol])
+                if 1 + max((min_depths[s] for s in production if s < n_non_terminals), default=0) == min_depths[symbol]))
+
+        used = {s for production in self.production_table for s in production if s < n_non_terminals}
+        codon_positions = {symbol: position for position, symbol in enumerate(sorted(used))}
+        self.repair_positions = [codon_positions.get(symbol, 0) for symbol in range(n_non_terminals)]
+
+    def generate_genome(self, length):
+        """
+        Generación de un genoma que codifica directamente una derivación válida de tamaño controlado (similar a PTC2).
+
+        La derivación se construye expandiendo siempre el no terminal situado más a la izquierda, igual que en la
+        decodificación. Mientras quedan codones disponibles se escoge al azar una de las producciones recursivas que
+        permiten completar la derivación sin superar length codones; cuando no hay ninguna, se escoge entre las que
+        caben. Para cada regla con varias producciones se añade un codón aleatorio cuyo resto módulo el número de
+        producciones selecciona la producción escogida, y el genoma se completa hasta length con codones aleatorios
+        que no se llegan a utilizar. De esta forma el individuo se decodifica sin wrapping ni reparación.
+
+        La derivación deja siempre al menos un codón sin utilizar: al consumir el último codón, la decodificación
+        cuenta como wraps los símbolos que quedan en la pila.
+
+        :param length: longitud del genoma (mayor que el número mínimo de codones de la regla de inicio)
+        :return: genoma como bytearray
+        """
+        n_non_terminals = self.n_non_terminals
+        codon_size = self.config.CODON_SIZE
+        if length <= self.min_codons[self.start_id]:
+            raise ValueError("Genome length too short for the grammar:", length)
+
+        genome = bytearray()
+        stack = [self.start_id]
+        # Codones necesarios para terminar los no terminales de la pila con sus derivaciones mínimas
+        pending = self.min_codons[self.start_id]
+        while stack:
+            symbol = stack.pop()
+            if symbol >= n_non_terminals:
+                continue
+            pending -= self.min_codons[symbol]
+            arity = self.rule_arities[symbol]
+            choice_codons = 1 if arity > 1 else 0
+            available = length - 1 - len(genome) - choice_codons - pending
+            fitting, growing = [], []
+            for choice in range(arity):
+                production = self.production_table[self.rule_offsets[symbol] + choice]
+                codons = sum(self.min_codons[s] for s in production if s < n_non_terminals)
+                if codons <= available:
+                    fitting.append((choice, codons))
+                    if any(self.recursive[s] for s in production if s < n_non_terminals):
+                        growing.append((choice, codons))
+            choice, codons = random.choice(growing or fitting)
+            if arity > 1:
+                genome.append(choice + arity * random.randint(0, (codon_size - choice) // arity))
+            pending += codons
+            stack.extend(self.production_table[self.rule_offsets[symbol] + choice])
+
+        genome.extend(random.randint(0, codon_size) for _ in range(length - len(genome)))
+        return genome
+
     def __str__(self):
         return "%s %s %s %s" % (self.terminals, self.non_terminals,
                                 self.rules, self.start_rule)
 
+    def counters(self):
+        """
+        Contadores de la decodificación.
+
+        :return: diccionario con el número de derivaciones, wraps, reparaciones y derivaciones inválidas
+        """
+        return {"derivations": self.derivations, "wraps": self.wraps, "repairs": self.repairs,
+                "invalid_derivations": self.invalid}
+
     def decode(self, _input):
         """
         Función utilizada para el mapeo entre genotipo y fenotipo de cada individuo.
 
+        Si el genotipo comparte los codones consumidos con otro ya decodificado, se reutiliza el fenotipo almacenado en
+        la caché de decodificación.
+
         :param _input: genotipo de un individuo
         :return: fenotipo del individuo
         """
-        # Contador de codones utilizados
-        used_input = 0
+        phenotype = self.decode_cache.lookup(_input)
+        if phenotype is MISS:
+            phenotype, arities = self.derive(_input)
+            self.decode_cache.store(_input, arities, phenotype)
+
+        return phenotype
+
+    def decode_program(self, _input):
+        """
+        Mapeo entre el genotipo de un individuo y su programa en notación postfija.
+
+        El programa se obtiene a partir de la secuencia de terminales decodificada y puede evaluarse sobre un conjunto
+        de puntos con el intérprete por lotes de ga.interpreter.
+
+        :param _input: genotipo de un individuo
+        :return: programa del individuo (códigos de operación y profundidad máxima de la pila) o None si es inválido
+        """
+        phenotype = self.decode(_input)
+        if phenotype is None:
+            return None
+        return compile_program(phenotype)
+
+    def derivation_trace(self, _input):
+        """
+        Derivación de un genotipo guardando un punto de control antes de consumir cada codón.
+
+        Los puntos de control permiten decodificar los vecinos que solo difieren en un codón reanudando la derivación
+        desde ese codón con decode_neighbour.
+
+        :param _input: genotipo de un individuo
+        :return: número de producciones de la regla en la que se ha utilizado cada codón consumido,
+                puntos de control de la derivación
+        """
+        checkpoints = []
+        phenotype, arities = self.derive(_input, checkpoints=checkpoints)
+        return arities, checkpoints
+
+    def decode_neighbour(self, _input, arities, checkpoints, position):
+        """
+        Mapeo entre genotipo y fenotipo de un vecino que solo difiere en un codón del genotipo trazado.
+
+        Si la derivación del genotipo original no ha necesitado wrapping, todo lo derivado antes de consumir el codón
+        modificado es común a ambos, por lo que la derivación se reanuda desde el punto de control de ese codón. Si el
+        codón no se llega a consumir, o selecciona la misma producción que en el original, el vecino tiene el mismo
+        fenotipo y se devuelve NEUTRAL sin decodificarlo.
+
+        :param _input: genotipo del vecino
+        :param arities: aridades devueltas por derivation_trace para el genotipo original
+        :param checkpoints: puntos de control devueltos por derivation_trace para el genotipo original
+        :param position: posición del codón modificado
+        :return: fenotipo del vecino o NEUTRAL
+        """
+        # Con wrapping el codón puede consumirse varias veces y se decodifica el genotipo completo
+        if len(arities) >= len(_input):
+            return self.decode(_input)
+        if position >= len(arities) or _input[position] % arities[position] == checkpoints[position][3]:
+            return NEUTRAL
+
+        phenotype = self.decode_cache.lookup(_input)
+        if phenotype is MISS:
+            phen_output, length, stack, _ = checkpoints[position]
+            state = (phen_output[:length], list(stack), position, arities[:position])
+            phenotype, neighbour_arities = self.derive(_input, state)
+            self.decode_cache.store(_input, neighbour_arities, phenotype)
+
+        return phenotype
+
+    def derive(self, _input, state=None, checkpoints=None):
+        """
+        Derivación completa del fenotipo de un individuo a partir de su genotipo.
+
+        :param _input: genotipo de un individuo
+        :param state: estado desde el que se reanuda la derivación (fenotipo parcial, pila, codones consumidos y
+                      aridades), tomado de un punto de control de un genotipo con los mismos codones anteriores
+        :param checkpoints: lista opcional en la que se añade, antes de consumir cada codón sin wrapping, el fenotipo
+                            parcial y su longitud, la pila y la producción seleccionada
+        :return: fenotipo del individuo,
+                número de producciones de la regla en la que se ha utilizado cada codón consumido
+        """
+        # Tablas de la gramática compilada
+        n_non_terminals = self.n_non_terminals
+        rule_arities = self.rule_arities
+        rule_offsets = self.rule_offsets
+        production_table = self.production_table
+        production_strings = self.production_strings
+        symbol_names = self.symbol_names
+        max_wraps = self.config.MAX_WRAPS
+        n_input = len(_input)
         # Contador de wrapping realizado
         wraps = 0
-        # Lista con los símbolos terminales decodificados
-        phen_output = []
-        # Lista con las posibles producciones
-        production_choices = []
-        # Símbolos por utilizar
-        unexpanded_symbols = [self.start_rule]
-        # Se realiza la decodificación mientras queden símbolos no utilizados en la lista y no se haya realizado el
+        # Indica si se ha agotado la secuencia de codones tras expandir una regla con varias producciones
+        wrapping = False
+        if state is None:
+            # Lista con los símbolos terminales decodificados
+            phen_output = []
+            # Pila con los identificadores de los símbolos por utilizar (el siguiente símbolo está en la cima)
+            stack = [self.start_id]
+            # Contador de codones utilizados
+            used_input = 0
+            # Número de producciones de cada regla en la que se ha consumido un codón
+            arities = []
+        else:
+            phen_output, stack, used_input, arities = state
+        pop = stack.pop
+        extend = stack.extend
+        append = phen_output.append
+        # Se realiza la decodificación mientras queden símbolos no utilizados en la pila y no se haya realizado el
         # número máximo de wraps.
-        while wraps <= MAX_WRAPS and len(unexpanded_symbols) > 0:
-            if used_input % len(_input) == 0 and used_input > 0 and len(production_choices) > 1:
+        while wraps <= max_wraps and stack:
+            if wrapping:
                 wraps += 1
-            # Se extrae el símbolo actual de la lista
-            current_symbol = unexpanded_symbols.pop(0)
+            # Se extrae el símbolo actual de la pila
+            current_symbol = pop()
             # Si es terminal, se añade al fenotipo
-            if current_symbol[1] != self.NT:
-                phen_output.append(current_symbol[0])
-            # Si es no terminal se guardan las opciones de producción de la regla y se utiliza un codón de la secuencia
-            # para escoger entre ellas
+            if current_symbol >= n_non_terminals:
+                append(symbol_names[current_symbol])
+            # Si es no terminal se utiliza un codón de la secuencia para escoger entre las producciones de la regla
             else:
-                production_choices = self.rules[current_symbol[0]]
-                current_production = _input[used_input % len(_input)] % len(production_choices)
+                arity = rule_arities[current_symbol]
+                current_production = _input[used_input % n_input] % arity
 
-                if len(production_choices) > 1:
+                if arity > 1:
+                    if checkpoints is not None and used_input < n_input:
+                        checkpoints.append((phen_output, len(phen_output), stack + [current_symbol], current_production))
                     used_input += 1
-                # Se añade el símbolo seleccionado a la lista
-                unexpanded_symbols = production_choices[current_production] + unexpanded_symbols
+                    arities.append(arity)
+                    wrapping = used_input % n_input == 0
+                else:
+                    wrapping = False
+                production = rule_offsets[current_symbol] + current_production
+                # Las producciones formadas solo por terminales se añaden directamente al fenotipo, salvo que se esté
+                # haciendo wrapping o se haya alcanzado el número máximo de wraps, en cuyo caso cada símbolo extraído
+                # de la pila cuenta para el número de wraps
+                if not wrapping and wraps <= max_wraps and production_strings[production] is not None:
+                    append(production_strings[production])
+                # Se apilan los símbolos de la producción seleccionada
+                else:
+                    extend(production_table[production])
 
+        self.derivations += 1
+        if used_input > n_input:
+            self.wraps += (used_input - 1) // n_input
         # Si tras terminar el bucle de decodificación, esta no se ha completado, se repara el individuo
         # o se devuelve vacío el fenotipo
-        if len(unexpanded_symbols) > 0:
-            if REPAIR:
-                return self.repair_individual(phen_output, unexpanded_symbols, _input)
+        if stack:
+            if self.config.REPAIR:
+                self.repairs += 1
+                return self.repair_individual(phen_output, stack, _input), arities
             else:
-                return None
+                self.invalid += 1
+                return None, arities
         # La decodificación se ha completado correctamente y se transforma el fenotipo en una cadena de texto
         phen_output = "".join(phen_output)
 
-        return phen_output
+        return phen_output, arities
 
-    def repair_individual(self, phen_output, unexpanded_symbols, _input):
+    def repair_individual(self, phen_output, stack, _input):
         """
         Reparación de individuos inválidos.
 
         Un individuo se considera inválido en caso de que, tras aplicar el número de wrapps predefinido, no se haya podido
         completar su decodificación.
-        La reparación de cada individuo se realiza de forma determinista, reutilizando sus codones de la siguiente forma:
+        La reparación de cada individuo se realiza de forma determinista, reutilizando sus codones: cada no terminal
+        pendiente se deriva utilizando solo sus producciones terminantes (las de profundidad mínima, calculadas en
+        analyse). Cada elección entre varias producciones terminantes consume un codón, empezando por la posición
+        asociada al no terminal pendiente (repair_positions) y avanzando uno por elección. Con derivada.bnf:
         - Los símbolos no terminales '<expr>' se sustituyen por '<var>' y se utiliza el primer codón de la cadena para
         seleccionar el símbolo terminal correspondiente a esta última regla de producción.
-        - Los símbolos no terminales '<op>' se sustituyen por el símbolo terminal correspondiente utilizando el segundo
-        codón de la cadena.
-        - Los símbolos no terminales '<pre-op>' se sustituyen por el símbolo terminal correspondiente utilizando el
-        tercer codón de la cadena.
-        - Los símbolos no terminales '<var>' se sustituyen por el símbolo terminal correspondiente utilizando el cuarto
-        codón de la cadena.
+        - Los símbolos no terminales '<op>', '<pre-op>' y '<var>' se sustituyen por el símbolo terminal correspondiente
+        utilizando el segundo, tercer y cuarto codón de la cadena, respectivamente.
 
-        En caso de que la longitud del genoma no sea suficiente se utiliza el codón anterior en cada uno de los casos.
+        En caso de que la longitud del genoma no sea suficiente se utiliza el último codón.
 
         De esta forma se mantiene la restricción de que con la misma secuencia de codones se obtenga siempre el mismo
         fenotipo.
 
         :param phen_output: fenotipo incompleto del individuo
-        :param unexpanded_symbols: símbolos no terminales que no se han decodificado
+        :param stack: pila con los identificadores de los símbolos que no se han decodificado
         :param _input: genotipo del individuo
         :return: fenotipo del individuo
         """
-        while len(unexpanded_symbols) > 0:
-            current_symbol = unexpanded_symbols.pop(0)
-            if current_symbol[1] != self.NT:
-                phen_output.append(current_symbol[0])
-            else:
-                if current_symbol[0] == '<expr>':
-                    production_choices = self.rules['<var>']
-                    current_production = _input[0] % len(production_choices)
-
-                if current_symbol[0] == '<op>':
-                    production_choices = self.rules[current_symbol[0]]
-                    if len(_input) == 1:
-                        current_production = _input[0] % len(production_choices)
-                    elif len(_input) > 1:
-                        current_production = _input[1] % len(production_choices)
-
-                if current_symbol[0] == '<pre-op>':
-                    production_choices = self.rules[current_symbol[0]]
-                    if len(_input) == 1:
-                        current_production = _input[0] % len(production_choices)
-                    elif len(_input) == 2 :
-                        current_production = _input[1] % len(production_choices)
-                    elif len(_input) > 2:
-                        current_production = _input[2] % len(production_choices)
-
-                if current_symbol[0] == '<var>':
-                    production_choices = self.rules[current_symbol[0]]
-                    if len(_input) == 1:
-                        current_production = _input[0] % len(production_choices)
-                    elif len(_input) == 2:
-                        current_production = _input[1] % len(production_choices)
-                    elif len(_input) == 3:
-                        current_production = _input[2] % len(production_choices)
-                    elif len(_input) > 3:
-                        current_production = _input[3] % len(production_choices)
-
-                current_symbol = production_choices[current_production][0]
-                phen_output.append(current_symbol[0])
+        n_non_terminals = self.n_non_terminals
+        symbol_names = self.symbol_names
+        last_codon = len(_input) - 1
+        for current_symbol in reversed(stack):
+            if current_symbol >= n_non_terminals:
+                phen_output.append(symbol_names[current_symbol])
+                continue
+            codon_position = self.repair_positions[current_symbol]
+            pending = [current_symbol]
+            while pending:
+                symbol = pending.pop()
+                if symbol >= n_non_terminals:
+                    phen_output.append(symbol_names[symbol])
+                    continue
+                choices = self.terminating_productions[symbol]
+                if len(choices) > 1:
+                    choice = choices[_input[min(codon_position, last_codon)] % len(choices)]
+                    codon_position += 1
+                else:
+                    choice = choices[0]
+                production = self.rule_offsets[symbol] + choice
+                if self.production_strings[production] is not None:
+                    phen_output.append(self.production_strings[production])
+                else:
+                    pending.extend(self.production_table[production])
 
         phen_output = "".join(phen_output)
         return phen_output
@@ -0,0 +1,94 @@
+import os
+import numpy as np
+from ga.fitness import NUMPY_MATH
+
+# Separación entre los puntos en los que se representan las funciones
+STEP = 0.1
+
+
+def pyplot():
+    """
+    Importación de matplotlib con un backend no interactivo.
+
+    matplotlib solo se importa al generar la primera gráfica, de forma que las ejecuciones que no generan gráficas no
+    pagan su importación. Las gráficas se guardan en ficheros, sin abrir ventanas.
+
+    :return: módulo matplotlib.pyplot
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+    from matplotlib import pyplot
+    return pyplot
+
+
+def sample(expression, x):
+    """
+    Evaluación vectorizada de una expresión sobre un conjunto de puntos para representarla.
+
+    Los puntos en los que la expresión no puede evaluarse toman el valor NaN y quedan sin representar.
+
+    :param expression: expresión matemática con la variable X y funciones del módulo math
+    :param x: vector de puntos en los que se evalúa la expresión
+    :return: vector con el valor de la expresión en cada punto
+    """
+    try:
+        with np.errstate(all="ignore"):
+            y = eval(compile(expression, "<expression>", "eval"), {"math": NUMPY_MATH}, {"X": x})
+    # Las subexpresiones constantes se evalúan con floats de Python, que sí lanzan excepciones propias
+    except (ValueError, ZeroDivisionError, OverflowError):
+        return np.full(x.shape, np.nan)
+    return np.broadcast_to(np.asarray(y, dtype=np.float64), x.shape)
+
+
+def plot_g_vs_gHat(evaluation, file_name):
+    """
+    Representación gráfica de la solución encontrada y la solución real al problema.
+
+    :param evaluation: evaluación con al menos una ejecución exitosa
+    :param file_name: fichero de imagen en el que se guarda la gráfica
+    """
+    plt = pyplot()
+    config = evaluation.config
+    x = np.arange(config.A, config.B, STEP)
+
+    plt.plot(x, sample(config.SOL, x), 'b', x, sample(evaluation.phen_solution, x), 'r')
+    plt.legend(['g(x)', r'$\hat{g}(x)$'])
+    plt.savefig(file_name)
+    plt.close()
+
+
+def plot_progress_curve(evaluation, file_name):
+    """
+    Representación gráfica de la evolución del mejor fitness medio de cada generación.
+
+    :param evaluation: evaluación de las ejecuciones
+    :param file_name: fichero de imagen en el que se guarda la gráfica
+    """
+    plt = pyplot()
+    y = evaluation.progress_curve()
+
+    x = np.arange(0, len(y), 1)
+    plt.ylabel("Valor de adaptación")
+    plt.xlabel("Número de generaciones")
+    plt.yscale("log")
+    plt.plot(x, y)
+    plt.savefig(file_name)
+    plt.close()
+
+
+def plot_evaluation(evaluation, prefix):
+    """
+    Generación de las gráficas de una evaluación.
+
+    Se guardan la curva de progreso y, si hay alguna ejecución exitosa, la comparación entre la primera solución
+    encontrada y la real.
+
+    :param evaluation: evaluación de las ejecuciones
+    :param prefix: prefijo de los ficheros de imagen; se crea su directorio si no existe
+    """
+    directory = os.path.dirname(prefix)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if evaluation.successful_runs > 0:
+        plot_g_vs_gHat(evaluation, prefix + "_g_vs_gHat.png")
+    plot_progress_curve(evaluation, prefix + "_progress.png")
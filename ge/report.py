@@ -0,0 +1,119 @@
+import os
+import argparse
+from ga.config import RunConfig
+from ga.individual import Individual
+from ga.telemetry import read_stream
+from ge.evaluation import Evaluation
+from ge.plotting import plot_evaluation
+
+
+def stream_files(paths):
+    """
+    Ficheros de telemetría indicados, buscando en los directorios los ficheros .jsonl y .csv que contienen.
+
+    :param paths: ficheros o directorios
+    :return: lista ordenada de ficheros
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(os.path.join(path, name) for name in os.listdir(path) if name.endswith((".jsonl", ".csv")))
+        else:
+            files.append(path)
+
+    return sorted(files)
+
+
+def load_runs(files):
+    """
+    Agrupación de los registros de telemetría por configuración, problema y ejecución.
+
+    Si una ejecución se ha reanudado desde un checkpoint, las generaciones repetidas se sustituyen por el último
+    registro de cada una.
+
+    :param files: ficheros de telemetría
+    :return: diccionario {(configuración, problema): {ejecución: (registros de cada generación, resumen)}}
+    """
+    runs = {}
+    for file in files:
+        for record in read_stream(file):
+            group = runs.setdefault((record.get("config"), record.get("problem")), {})
+            generations, summary = group.get(record.get("run"), ({}, None))
+            if record["type"] == "generation":
+                generations[record["generation"]] = record
+            else:
+                summary = record
+            group[record.get("run")] = (generations, summary)
+
+    return runs
+
+
+def evaluate_group(runs):
+    """
+    Evaluación de las ejecuciones de un problema a partir de sus registros.
+
+    Solo se tienen en cuenta las ejecuciones completas, es decir, las que tienen un registro de resumen.
+
+    :param runs: diccionario {ejecución: (registros de cada generación, resumen)}
+    :return: evaluación de las ejecuciones completas o None si no hay ninguna
+    """
+    complete = [runs[run] for run in sorted(runs, key=str) if runs[run][1] is not None]
+    if not complete:
+        return None
+
+    first = complete[0][1]
+    config = RunConfig(FUNCTION=first["function"], A=first["a"], B=first["b"], SOL=first["sol"], RUNS=len(complete),
+                       POPULATION_SIZE=first["population_size"], OFFSPRING_SIZE=first["offspring_size"],
+                       SELF_ADAPTATION=first["self_adaptation"], AES_REAL_EVALUATIONS=first["aes_real_evaluations"])
+    evaluation = Evaluation(config)
+    for generations, summary in complete:
+        solution = Individual.__new__(Individual)
+        solution.fitness = finite_or_inf(summary["fitness"])
+        solution.hits = summary["hits"]
+        solution.phenotype = summary["phenotype"]
+        curve = [finite_or_inf(generations[generation]["best"]) for generation in sorted(generations)]
+        evaluation.add_run(solution, summary["gens_to_sol"], curve, summary["local_evaluations"],
+                           summary["real_evaluations"])
+
+    return evaluation
+
+
+def finite_or_inf(value):
+    """
+    Conversión de los valores de fitness no finitos, registrados como None, a infinito.
+
+    :param value: valor registrado
+    :return: valor de fitness
+    """
+    return float("inf") if value is None else value
+
+
+def report(paths, output):
+    """
+    Reconstrucción de los resultados de los experimentos a partir de sus ficheros de telemetría.
+
+    Para cada configuración y problema se muestran SR, MBF y AES y se guardan en output la curva de progreso y la
+    comparación entre la solución encontrada y la real.
+
+    :param paths: ficheros o directorios de telemetría
+    :param output: directorio en el que se guardan las gráficas
+    """
+    os.makedirs(output, exist_ok=True)
+    for (config, problem), runs in sorted(load_runs(stream_files(paths)).items(), key=lambda item: str(item[0])):
+        evaluation = evaluate_group(runs)
+        if evaluation is None:
+            print("Configuración {}, problema {}: sin ejecuciones completas".format(config, problem))
+            continue
+        print("Configuración {}; Función: {}".format(config, evaluation.config.FUNCTION))
+        evaluation.perform_evaluation()
+        plot_evaluation(evaluation, os.path.join(output, "{}_{}".format(config, problem)))
+        print(evaluation.summary())
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Informe de resultados a partir de ficheros de telemetría")
+    parser.add_argument("paths", nargs="+", help="ficheros .jsonl o .csv, o directorios que los contienen")
+    parser.add_argument("--output", default="report", help="directorio en el que se guardan las gráficas")
+    arguments = parser.parse_args()
+    report(arguments.paths, arguments.output)
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Las pruebas importan los módulos ga y ge desde la raíz del repositorio
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+GRAMMAR_FILE = os.path.join(ROOT, "grammars", "derivada.bnf")
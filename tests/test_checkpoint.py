@@ -0,0 +1,90 @@
+import os
+import random
+import numpy as np
+import pytest
+from conftest import GRAMMAR_FILE
+from ga.config import RunConfig
+from ga.fitness_cache import fitness_cache
+from ga.checkpoint import SearchState, save_checkpoint, load_checkpoint
+from ga.genetic_algorithm import initialization, search, resume
+from ge.experiment import run_task
+from ge.grammar import Grammar
+
+PROBLEM = ("X ** 3 + 8", 0, 5, "3 * (X ** 2)")
+
+
+class Interruption(Exception):
+    pass
+
+
+def start(config, seed=1):
+    random.seed(seed)
+    np.random.seed(seed)
+    fitness_cache.clear()
+    grammar = Grammar(GRAMMAR_FILE, config)
+    return initialization(config, grammar), grammar
+
+
+def outcome(result):
+    solution, gens_to_sol, best_individuals, local_evaluations, _ = result
+    return solution.fitness, solution.hits, solution.phenotype, gens_to_sol, best_individuals, local_evaluations
+
+
+def recorder(records, stop=None):
+    def migrate(generation, population):
+        if generation == stop:
+            raise Interruption()
+        lifetimes = [float(lifetime) for lifetime in population.lifetime] if hasattr(population, "lifetime") else \
+            [individual.lifetime for individual in population]
+        records.append((generation, len(population), lifetimes))
+        return population
+    return migrate
+
+
+@pytest.mark.parametrize("overrides", [{}, {"VARIABLE_POPULATION_SIZE": True}, {"ARRAY_POPULATION": True},
+                                       {"SELF_ADAPTATION": True}])
+def test_resumed_search_matches_uninterrupted(tmp_path, overrides):
+    path = str(tmp_path / "checkpoint.npz")
+    # Con VARIABLE_POPULATION_SIZE, el elitismo deja el mismo individuo dos veces en la población de la generación 3
+    config = RunConfig(GENERATIONS=12, CHECKPOINT_INTERVAL=4, CHECKPOINT_FILE=path,
+                       **overrides).with_problem(PROBLEM)
+    expected_records = []
+    population, grammar = start(config)
+    expected = outcome(search(population, grammar, recorder(expected_records), config))
+    assert not os.path.exists(path)
+
+    population, grammar = start(config)
+    with pytest.raises(Interruption):
+        search(population, grammar, recorder([], stop=6), config)
+    assert os.path.exists(path)
+
+    records = []
+    fitness_cache.clear()
+    assert outcome(resume(path, Grammar(GRAMMAR_FILE, config), recorder(records), config)) == expected
+    assert records == expected_records[4:]
+    assert not os.path.exists(path)
+
+
+def test_completed_run_is_not_resumed(tmp_path):
+    config = RunConfig(GENERATIONS=10, CHECKPOINT_INTERVAL=5, CHECKPOINT_FILE=str(tmp_path / "checkpoint.npz"))
+    first = run_task((config, 0, 0, 0, GRAMMAR_FILE))
+    second = run_task((config, 0, 0, 0, GRAMMAR_FILE))
+    assert second.cache_misses == first.cache_misses > 0
+    assert second.real_evaluations == first.real_evaluations
+    assert os.listdir(str(tmp_path)) == []
+
+
+def test_checkpoint_preserves_shared_individuals(tmp_path):
+    path = str(tmp_path / "checkpoint.npz")
+    config = RunConfig().with_problem(PROBLEM)
+    population, grammar = start(config)
+    population[7] = population[3]
+    state = SearchState(5, population, population[3], [1.0] * 5, 0, 0, 0, 10, False)
+    save_checkpoint(path, state, config)
+
+    restored = load_checkpoint(path)
+    assert restored.population[7] is restored.population[3]
+    assert restored.best_individual is restored.population[3]
+    assert len({id(individual) for individual in restored.population}) == len(population) - 1
+    assert [bytes(individual.genome) for individual in restored.population] == \
+        [bytes(individual.genome) for individual in population]
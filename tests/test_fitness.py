@@ -0,0 +1,65 @@
+import math
+import random
+import pytest
+from conftest import GRAMMAR_FILE
+from ga.config import RunConfig
+from ga.fitness import fitness_function, phenotypeToExpression, PENALTY
+from ga.interpreter import compile_program, batch_fitness_function
+from ge.grammar import Grammar
+
+# Fenotipos bien condicionados: la evaluación con NumPy solo puede diferir de eval() en el orden de la suma
+PHENOTYPES = ["X", "1.0", "X * X", "X * X * X + 1.0", "1.0 / X", "X / (X + 1.0)", "exp(X) - X", "sin(X) * cos(X)",
+              "ln(X + 1.0)", "ln(X)", "exp(X * X) / (1.0 + X)", "X * sin(X) + cos(X * X)"]
+TOLERANCE = 1e-9
+
+
+def test_scalar_fitness_is_the_default():
+    assert not RunConfig().VECTORIZED_FITNESS
+
+
+@pytest.mark.parametrize("problem", RunConfig().PROBLEMS, ids=lambda problem: problem[0])
+def test_vectorized_fitness_matches_scalar(problem):
+    config = RunConfig().with_problem(problem)
+    scalar = config.replace(VECTORIZED_FITNESS=False)
+    vectorized = config.replace(VECTORIZED_FITNESS=True)
+    for expression in map(phenotypeToExpression, PHENOTYPES):
+        expected_fitness, expected_hits = fitness_function(expression, scalar)
+        fitness, hits = fitness_function(expression, vectorized)
+        assert hits == expected_hits, expression
+        assert math.isclose(fitness, expected_fitness, rel_tol=TOLERANCE), expression
+        assert (fitness == PENALTY) == (expected_fitness == PENALTY), expression
+
+
+def decoded_phenotypes(grammar, config, size=200):
+    generator = random.Random(2024)
+    phenotypes = []
+    while len(phenotypes) < size:
+        genome = bytes(generator.randint(0, config.CODON_SIZE) for _ in range(config.MAX_GENOME_LENGTH))
+        phenotype = grammar.decode(genome)
+        if phenotype is not None:
+            phenotypes.append(phenotype)
+    return phenotypes
+
+
+@pytest.mark.parametrize("problem", RunConfig().PROBLEMS, ids=lambda problem: problem[0])
+def test_interpreter_fitness_matches_eval(problem):
+    config = RunConfig().with_problem(problem)
+    grammar = Grammar(GRAMMAR_FILE, config)
+
+    # El intérprete utiliza las mismas funciones de NumPy que la evaluación vectorizada con eval()
+    phenotypes = decoded_phenotypes(grammar, config)
+    programs = [compile_program(phenotype) for phenotype in phenotypes]
+    assert None not in programs
+    vectorized = config.replace(VECTORIZED_FITNESS=True)
+    for phenotype, (fitness, hits) in zip(phenotypes, batch_fitness_function(programs, config)):
+        expected_fitness, expected_hits = fitness_function(phenotypeToExpression(phenotype), vectorized)
+        assert hits == expected_hits, phenotype
+        assert math.isclose(fitness, expected_fitness, rel_tol=TOLERANCE), phenotype
+
+    # Con fenotipos bien condicionados también coincide con la evaluación escalar
+    programs = [compile_program(phenotype) for phenotype in PHENOTYPES]
+    scalar = config.replace(VECTORIZED_FITNESS=False)
+    for phenotype, (fitness, hits) in zip(PHENOTYPES, batch_fitness_function(programs, config)):
+        expected_fitness, expected_hits = fitness_function(phenotypeToExpression(phenotype), scalar)
+        assert hits == expected_hits, phenotype
+        assert math.isclose(fitness, expected_fitness, rel_tol=TOLERANCE), phenotype
@@ -0,0 +1,109 @@
+import hashlib
+import random
+import pytest
+from conftest import GRAMMAR_FILE
+from ga.config import RunConfig
+from ge.grammar import Grammar
+
+# Fenotipos obtenidos con el decodificador original (lista de símbolos) sobre derivada.bnf, con MAX_WRAPS = 2
+KNOWN_PHENOTYPES = [
+    (b"\x00", "X + X + X + X + X"),
+    (b"\x03", "1.0"),
+    (b"\x07\x00\x00\x03", "X"),
+    (b"\x02\x01\x03\x01\x00\x01", "cos(1.0)"),
+    (b"\x00\x01\x02\x03\x04\x05\x06\x07", "(ln((ln(X - X) - X) - X) - X) - X"),
+    (b"\x01\x02\x03\x01\x04\x05\x0a\x01\x01",
+     "(ln(((cos(((ln(((cos((1.0 * 1.0)) * 1.0) * 1.0 * 1.0)) * 1.0) * 1.0)) * 1.0) * 1.0 * 1.0)) * 1.0)"),
+    (b"\xff\x11\x2a\x09\x80\x40", "1.0"),
+]
+
+# Resumen MD5 de repr() de la lista de fenotipos de reference_genomes() con el decodificador original, con y sin
+# reparación (número de individuos inválidos sin reparación: 11822)
+REFERENCE_DIGESTS = {True: "06341384293eebdeff828e78cfc3ad41", False: "253c828b0dccde3b803f7314227ef452"}
+
+
+def reference_genomes():
+    generator = random.Random(2024)
+    return [bytearray(generator.randint(0, 255) for _ in range(generator.randint(1, 20))) for _ in range(20000)]
+
+
+@pytest.mark.parametrize("genome, phenotype", KNOWN_PHENOTYPES)
+def test_decode_known_phenotypes(genome, phenotype):
+    assert Grammar(GRAMMAR_FILE, RunConfig(MAX_WRAPS=2, REPAIR=True)).decode(bytearray(genome)) == phenotype
+
+
+@pytest.mark.parametrize("repair", [True, False])
+def test_decode_matches_original_decoder(repair):
+    grammar = Grammar(GRAMMAR_FILE, RunConfig(MAX_WRAPS=2, REPAIR=repair))
+    phenotypes = [grammar.decode(genome) for genome in reference_genomes()]
+    assert hashlib.md5(repr(phenotypes).encode()).hexdigest() == REFERENCE_DIGESTS[repair]
+    # La caché de decodificación devuelve los mismos fenotipos
+    assert [grammar.decode(genome) for genome in reference_genomes()] == phenotypes
+
+
+def write_grammar(tmp_path, text):
+    path = tmp_path / "grammar.bnf"
+    path.write_text(text)
+    return str(path)
+
+
+def test_analyse_derivada():
+    grammar = Grammar(GRAMMAR_FILE, RunConfig())
+    names = grammar.symbol_names[:grammar.n_non_terminals]
+    assert names == ["<prog>", "<expr>", "<op>", "<pre-op>", "<var>"]
+    assert grammar.min_depths == [3, 2, 1, 1, 1]
+    assert grammar.min_codons == [2, 2, 1, 1, 1]
+    assert grammar.recursive == [False, True, False, False, False]
+    assert grammar.terminating_productions == [(0,), (3,), (0, 1, 2, 3), (0, 1, 2, 3), (0, 1)]
+    assert grammar.repair_positions == [0, 0, 1, 2, 3]
+
+
+def test_analyse_rejects_non_terminating_grammar(tmp_path):
+    with pytest.raises(ValueError):
+        Grammar(write_grammar(tmp_path, "<a> ::= <a>x | <b>\n<b> ::= (<a>)\n"), RunConfig())
+
+
+def test_repair_spends_one_codon_per_choice(tmp_path):
+    # Las derivaciones mínimas de <num> son 10 ** 6 cadenas distintas: se derivan al reparar en lugar de enumerarse
+    grammar = Grammar(write_grammar(tmp_path, "<e> ::= <e>+<e> | <num>\n<num> ::= <d><d><d><d><d><d>\n"
+                                              "<d> ::= 0 | 1 | 2 | 3 | 4 | 5 | 6 | 7 | 8 | 9\n"),
+                      RunConfig(MAX_WRAPS=0, REPAIR=True))
+    # Al agotar los codones queda pendiente el segundo <e>, que se repara desde su posición (0): <num> es su única
+    # producción terminante y cada <d> consume uno de los codones siguientes
+    assert grammar.decode(bytearray([0, 11, 22, 33, 44, 55, 66, 77])) == "234567+012345"
+    # Quedan pendientes <num> (posición 1) y <e>; a partir del último codón se repite este
+    assert grammar.decode(bytearray([0, 1])) == "111111+011111"
+    assert grammar.counters()["repairs"] == 2
+
+
+@pytest.mark.parametrize("grammar_text", [None, "<e> ::= <e><o><t> | <t>\n<t> ::= <f> | (<e>) | <n><d>\n"
+                                                 "<o> ::= + | *\n<f> ::= <n><d> | x\n<n> ::= 1 | 2 | 3\n<d> ::= 0 | 5\n"])
+def test_generate_genome_decodes_without_wraps_or_repairs(tmp_path, grammar_text):
+    file_name = GRAMMAR_FILE if grammar_text is None else write_grammar(tmp_path, grammar_text)
+    grammar = Grammar(file_name, RunConfig(MAX_WRAPS=2, REPAIR=True))
+    minimum = grammar.min_codons[grammar.start_id] + 1
+    random.seed(0)
+    for length in list(range(minimum, 31)) * 50:
+        genome = grammar.generate_genome(length)
+        assert len(genome) == length
+        assert grammar.decode(genome) is not None
+    counters = grammar.counters()
+    assert counters["wraps"] == counters["repairs"] == counters["invalid_derivations"] == 0
+    with pytest.raises(ValueError):
+        grammar.generate_genome(minimum - 1)
+
+
+def test_sensible_initialization():
+    from ga.genetic_algorithm import initialization
+    config = RunConfig(SENSIBLE_INITIALIZATION=True, POPULATION_SIZE=300, MAX_WRAPS=2, REPAIR=True)
+    grammar = Grammar(GRAMMAR_FILE, config)
+    random.seed(0)
+    population = initialization(config, grammar)
+    assert len(population) == 300
+    assert all(3 <= len(individual.genome) <= config.MAX_GENOME_LENGTH for individual in population)
+    assert all(grammar.decode(individual.genome) is not None for individual in population)
+    assert grammar.counters()["repairs"] == grammar.counters()["wraps"] == 0
+
+    short = config.replace(MAX_GENOME_LENGTH=2)
+    with pytest.raises(ValueError):
+        initialization(short, Grammar(GRAMMAR_FILE, short))
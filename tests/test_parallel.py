@@ -0,0 +1,98 @@
+import random
+import pytest
+from conftest import GRAMMAR_FILE
+from ga.config import RunConfig
+from ga.fitness_cache import FitnessCache, fitness_cache
+from ga.individual import Individual
+import ga.local_search as local_search_module
+from ga.parallel import ParallelEvaluator
+from ga.population import Population
+from ge.grammar import Grammar
+
+PROBLEM = ("X ** 3 + 8", 0, 5, "3 * (X ** 2)")
+
+
+@pytest.mark.parametrize("array_population", [False, True])
+def test_parallel_evaluation_matches_serial_with_long_genomes(array_population):
+    config = RunConfig(MAX_GENOME_LENGTH=300, PARALLEL_EVALUATION=True, PARALLEL_WORKERS=2,
+                       PARALLEL_MIN_SIZE=1).with_problem(PROBLEM)
+    grammar = Grammar(GRAMMAR_FILE, config)
+    # Los codones 0 y 3 solo eligen <expr> <op> <expr>, <var>, '+', '/', 'X' y '1.0', de forma que los fenotipos son
+    # expresiones sin paréntesis que dependen de todos los codones del genoma
+    generator = random.Random(0)
+    genomes = [bytes(generator.choice((0, 3)) for _ in range(generator.randint(256, 300))) for _ in range(40)]
+    # Con la longitud almacenada en un byte, los genomas se decodificarían truncados a length % 256 codones
+    expected = [grammar.decode(genome) for genome in genomes]
+    assert expected != [grammar.decode(genome[:len(genome) % 256]) if len(genome) % 256 else None
+                        for genome in genomes]
+
+    population = [Individual(genome, None, config) for genome in genomes]
+    if array_population:
+        population = Population.from_individuals(population, config)
+    evaluator = ParallelEvaluator()
+    try:
+        evaluator.evaluate(population, grammar, config)
+    finally:
+        evaluator.close()
+        fitness_cache.clear()
+
+    phenotypes = list(population.phenotypes) if array_population else \
+        [individual.phenotype for individual in population]
+    assert phenotypes == expected
+
+
+def test_parallel_settings_are_read_from_config():
+    config = RunConfig(PARALLEL_EVALUATION=True, PARALLEL_MIN_SIZE=10, PARALLEL_WORKERS=1,
+                       PARALLEL_CHUNK_SIZE=3).with_problem(PROBLEM)
+    evaluator = ParallelEvaluator()
+    assert not evaluator.accepts(9, config)
+    assert evaluator.accepts(10, config)
+    assert not evaluator.accepts(10, config.replace(PARALLEL_MIN_SIZE=11))
+
+    grammar = Grammar(GRAMMAR_FILE, config)
+    generator = random.Random(0)
+    population = [Individual(bytes(generator.choice((0, 3)) for _ in range(20)), None, config) for _ in range(10)]
+    try:
+        evaluator.evaluate(population, grammar, config)
+        pool = evaluator.pool
+        evaluator.evaluate(population, grammar, config)
+        assert evaluator.pool is pool
+        evaluator.evaluate(population, grammar, config.replace(PARALLEL_WORKERS=2))
+        assert evaluator.pool is not pool and evaluator.workers == 2
+    finally:
+        evaluator.close()
+        fitness_cache.clear()
+
+
+def test_fitness_cache_size_is_read_from_config():
+    config = RunConfig(FITNESS_CACHE_SIZE=3).with_problem(PROBLEM)
+    cache = FitnessCache(100)
+    phenotypes = ["X + {}.0".format(i) for i in range(5)]
+    for phenotype in phenotypes:
+        cache.evaluate(phenotype, config=config)
+    assert cache.max_size == 3
+    assert [key[0] for key in cache.entries] == phenotypes[2:]
+
+    cache.evaluate_batch(phenotypes, config.replace(FITNESS_CACHE_SIZE=1))
+    assert len(cache.entries) == 1
+    cache.evaluate(phenotypes[0], config=config.replace(FITNESS_CACHE_SIZE=0))
+    assert len(cache.entries) == 0
+
+
+@pytest.mark.parametrize("threshold, expected", [(20, True), (21, False)])
+def test_first_improvement_parallel_gate_uses_neighbourhood_size(monkeypatch, threshold, expected):
+    config = RunConfig(PARALLEL_EVALUATION=True, BEST_IMPROVEMENT=False, MAX_GENOME_LENGTH=20,
+                       PARALLEL_NEIGHBOURHOOD_SIZE=threshold).with_problem(PROBLEM)
+    grammar = Grammar(GRAMMAR_FILE, config)
+    best = Individual(bytes([0, 3] * 10), None, config)
+    best.phenotype = grammar.decode(best.genome)
+    best.fitness, best.hits = fitness_cache.evaluate(best.phenotype, config=config)
+
+    calls = []
+    monkeypatch.setattr(local_search_module, "parallel_local_search",
+                        lambda offspring, *args: calls.append(len(offspring)) or (offspring, 0))
+    try:
+        local_search_module.local_search([best], grammar, config)
+    finally:
+        fitness_cache.clear()
+    assert bool(calls) == expected
@@ -0,0 +1,46 @@
+import random
+import pytest
+from ga.config import RunConfig
+from ga.individual import Individual
+from ga.population import Population, fitness_array
+from ga.survivor_selection import fitness_based_replacement
+
+CONFIG = RunConfig()
+
+
+def individuals(fitness_values):
+    result = []
+    for fitness in fitness_values:
+        individual = Individual(b"\x00", None, CONFIG)
+        individual.fitness = fitness
+        result.append(individual)
+    return result
+
+
+def reference(offspring, population):
+    # Implementación original: ordenación de la población de mejor a peor fitness y corte con len(population) -
+    # len(offspring), que con un valor negativo descarta los peores
+    population = sorted(population, reverse=True)
+    population = population[:len(population) - len(offspring)]
+    return population + offspring
+
+
+@pytest.mark.parametrize("array_population", [False, True])
+@pytest.mark.parametrize("population_size, offspring_size", [(200, 100), (99, 100), (60, 100), (30, 100), (100, 100)])
+def test_fitness_based_replacement_matches_slice(array_population, population_size, offspring_size):
+    generator = random.Random(population_size * offspring_size)
+    parents = [float(generator.randint(1, 50)) for _ in range(population_size - 1)] + [0.]
+    generator.shuffle(parents)
+    children = [1000. + generator.randint(0, 50) for _ in range(offspring_size)]
+
+    expected = sorted(individual.fitness for individual in reference(individuals(children), individuals(parents)))
+    population, offspring = individuals(parents), individuals(children)
+    if array_population:
+        population = Population.from_individuals(population, CONFIG)
+        offspring = Population.from_individuals(offspring, CONFIG)
+
+    survivors = fitness_based_replacement(offspring, population, CONFIG)
+    assert sorted(fitness_array(survivors).tolist()) == expected
+    if population_size < offspring_size < 2 * population_size:
+        # La población es menor que la descendencia, pero se conserva su mejor individuo
+        assert min(fitness_array(survivors)) == 0.
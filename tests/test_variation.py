@@ -0,0 +1,118 @@
+import itertools
+from collections import Counter
+import numpy as np
+import pytest
+from ga.config import RunConfig
+from ga.duplication import batch_duplication
+from ga.individual import Individual
+from ga.mutation import select_mutation_rate, select_mutation_rates
+from ga.population import Population
+from ga.recombination import batch_one_point_crossover, batch_uniform_crossover
+
+# Los codones de cada padre son distintos, de forma que cada par de hijos identifica el sorteo que lo ha generado
+PARENT1 = [1, 2, 3, 4, 5]
+PARENT2 = [101, 102, 103]
+MAX_LENGTH = 6
+SAMPLES = 40000
+# Distancia de variación total máxima entre la distribución observada y la exacta
+TOLERANCE = 0.02
+
+
+def one_point_outcomes(parent1, parent2):
+    """Distribución de los hijos de one_point_crossover, que repite el cruce hasta que ambos hijos son válidos."""
+    valid = [(r1, r2) for r1 in range(1, len(parent1) + 1) for r2 in range(1, len(parent2) + 1)
+             if r1 + len(parent2) - r2 <= MAX_LENGTH and r2 + len(parent1) - r1 <= MAX_LENGTH]
+    return Counter({(tuple(parent1[:r1] + parent2[r2:]), tuple(parent2[:r2] + parent1[r1:])): 1 / len(valid)
+                    for r1, r2 in valid})
+
+
+def uniform_outcomes(parent1, parent2):
+    """Distribución de los hijos de uniform_crossover, con una máscara equiprobable de intercambios."""
+    limit = max(len(parent1), len(parent2))
+    outcomes = Counter()
+    for swap in itertools.product((False, True), repeat=limit):
+        sources = [(parent2, parent1) if s else (parent1, parent2) for s in swap]
+        child1 = tuple(first[i] for i, (first, _) in enumerate(sources) if i < len(first))
+        child2 = tuple(second[i] for i, (_, second) in enumerate(sources) if i < len(second))
+        outcomes[(child1, child2)] += 1 / 2 ** limit
+    return outcomes
+
+
+def duplication_outcomes(genome):
+    """Distribución de los genomas obtenidos con duplication cuando siempre se aplica."""
+    outcomes = Counter()
+    for k in range(1, len(genome) + 1):
+        for start in range(len(genome) - k + 1):
+            output = np.insert(genome, -1, genome[start:start + k]).tolist()
+            outcomes[tuple(output if len(output) <= MAX_LENGTH else genome)] += 1 / len(genome) / (len(genome) - k + 1)
+    return outcomes
+
+
+def mix(first, second):
+    """Distribución de los hijos cuando cada padre actúa como primero con probabilidad 1/2."""
+    outcomes = Counter()
+    for distribution in (first, second):
+        for outcome, probability in distribution.items():
+            outcomes[outcome] += probability / 2
+    return outcomes
+
+
+def total_variation(observed, expected):
+    total = sum(observed.values())
+    return sum(abs(observed[outcome] / total - expected[outcome]) for outcome in set(observed) | set(expected)) / 2
+
+
+def mating_pool(config):
+    return Population.from_individuals([Individual(PARENT1, None, config), Individual(PARENT2, None, config)], config)
+
+
+def observed_children(offspring):
+    genomes = [tuple(offspring.genome(i)) for i in range(len(offspring))]
+    return Counter(zip(genomes[0::2], genomes[1::2]))
+
+
+@pytest.mark.parametrize("operator, outcomes", [(batch_one_point_crossover, one_point_outcomes),
+                                                (batch_uniform_crossover, uniform_outcomes)])
+def test_batch_crossover_matches_individual_distribution(operator, outcomes):
+    config = RunConfig(MAX_GENOME_LENGTH=MAX_LENGTH, CROSSOVER_RATE=1)
+    np.random.seed(0)
+    observed = observed_children(operator(mating_pool(config), SAMPLES, 0, config))
+    expected = mix(outcomes(PARENT1, PARENT2), outcomes(PARENT2, PARENT1))
+
+    assert set(observed) == set(expected)
+    assert total_variation(observed, expected) < TOLERANCE
+
+
+@pytest.mark.parametrize("operator", [batch_one_point_crossover, batch_uniform_crossover])
+def test_batch_crossover_copies_parents_without_crossover(operator):
+    config = RunConfig(MAX_GENOME_LENGTH=MAX_LENGTH, CROSSOVER_RATE=0)
+    np.random.seed(0)
+    observed = observed_children(operator(mating_pool(config), 100, 0, config))
+
+    assert set(observed) <= {(tuple(PARENT1), tuple(PARENT2)), (tuple(PARENT2), tuple(PARENT1))}
+
+
+def test_batch_duplication_matches_individual_distribution():
+    config = RunConfig(MAX_GENOME_LENGTH=MAX_LENGTH, DUPLICATION_RATE=1)
+    np.random.seed(0)
+    population = Population.from_individuals([Individual(PARENT2, None, config)] * SAMPLES, config)
+    offspring = batch_duplication(population, config)
+    observed = Counter(tuple(offspring.genome(i)) for i in range(len(offspring)))
+    expected = duplication_outcomes(PARENT2)
+
+    assert set(observed) == set(expected)
+    assert total_variation(observed, expected) < TOLERANCE
+
+
+@pytest.mark.parametrize("scheme", ["DETERMINISTIC", "DETERMINISTIC_BASIC1", "DETERMINISTIC_BASIC2", None])
+def test_batch_mutation_rates_match_individual_rates(scheme):
+    config = RunConfig(MAX_GENOME_LENGTH=MAX_LENGTH, SELF_ADAPTATION=False, DETERMINISTIC=False,
+                       DETERMINISTIC_BASIC1=False, DETERMINISTIC_BASIC2=False)
+    if scheme is not None:
+        config = config.replace(**{scheme: True})
+    individuals = [Individual(PARENT1, None, config), Individual(PARENT2, None, config)]
+    generation = config.GENERATIONS // 3
+
+    expected = [select_mutation_rate(individual, generation, config) for individual in individuals]
+    rates = select_mutation_rates(Population.from_individuals(individuals, config), generation, config)
+    assert rates.tolist() == pytest.approx(expected)